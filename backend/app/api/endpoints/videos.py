@@ -1,12 +1,19 @@
 from fastapi import APIRouter, HTTPException, Depends, Query, Body, BackgroundTasks
 from typing import Dict, Any, Optional, List
-from ...schemas.video import VideoLinkCreate, VideoLinkResponse, Platform, VideoProcessRequest, VideoURL, VideoUpdate
-from ...core.database import supabase
+from ...schemas.video import VideoLinkCreate, VideoLinkResponse, Platform, VideoProcessRequest, VideoURL, VideoUpdate, VideoBulkCreate, VideoBulkResult, VideoBulkResponse
+from ...core.database import admin_db, get_supabase
+from ...database import PostgrestClient
 from ...utils.url_parser import URLParser
 from ...services.visual_analysis import visual_analysis_service
 from ...services.audio_transcription import audio_transcription_service
 from ...services.auth import auth_service
 from ...services.video_management import video_management_service
+from ...services.search_indexer import search_indexer
+from ...services.segment_index import segment_index
+from ...services.document_embedding import document_embedder, summary_text
+from ...services.video_storage import store_video_embeddings
+from ...services.keyword_extractor import keyword_extractor
+from ...core.config import settings
 from ..auth import get_current_user
 import uuid
 import logging
@@ -16,9 +23,7 @@ import os
 from dotenv import load_dotenv
 import datetime
 from ...services.cache_service import cache_service
-from supabase import create_client
 from ...services.browser_service import browser_service
-from ...core.database import get_supabase
 from ...models.video import VideoCreate, VideoResponse
 from ...services.video import video_service
 import asyncio
@@ -32,12 +37,6 @@ logger = logging.getLogger(__name__)
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
 
-# Initialize Supabase client with service role key for admin operations
-admin_supabase = create_client(
-    os.getenv("SUPABASE_URL"),
-    os.getenv("SUPABASE_SERVICE_KEY")
-)
-
 async def get_video_metadata(video_id: str) -> Dict[str, Any]:
     """Get video metadata using YouTube Data API with caching"""
     try:
@@ -99,7 +98,7 @@ async def process_video_background(video_id: str, url: str, youtube_id: str):
         # Step 2: Update video record with basic info
         try:
             logging.info("Step 2: Updating video record with metadata...")
-            admin_supabase.table("videos").update({
+            await admin_db.table("videos").update({
                 "title": metadata['title'],
                 "thumbnail_url": metadata['thumbnail_url'],
                 "duration": metadata['duration'],
@@ -141,29 +140,82 @@ async def process_video_background(video_id: str, url: str, youtube_id: str):
             logging.error(error_msg)
             raise Exception(error_msg)
         
+        # Step 4b: Embed the whole summary and transcript (optional)
+        document = None
+        try:
+            logging.info("Step 4b: Embedding video document...")
+            document = await document_embedder.embed_video(
+                summary_text(metadata['title'], metadata),
+                transcription,
+                metadata.get("duration")
+            )
+            logging.info(f"Successfully embedded {len(document['windows']) if document else 0} document windows")
+        except Exception as e:
+            # The video stays searchable by text without an embedding
+            logging.error(f"Failed to embed video document: {str(e)}")
+        
         # Step 5: Create analysis record
         try:
             logging.info("Step 5: Creating analysis record...")
+            transcript_text = transcription.get("text", "") if isinstance(transcription, dict) else str(transcription or "")
+            keywords = await asyncio.to_thread(
+                keyword_extractor.extract,
+                f"{metadata['title']}. {metadata.get('description', '')} {transcript_text}"
+            )
             analysis_data = {
                 "video_id": video_id,
                 "visual_summary": analysis_results.get("summary"),
                 "audio_transcription": transcription,
+                "keywords": keywords,
                 "metadata": metadata,
                 "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat()
             }
             
             # Insert analysis data
-            admin_supabase.table("video_analysis").insert(analysis_data).execute()
+            await admin_db.table("video_analysis").insert(analysis_data).execute()
             logging.info("Successfully created analysis record")
         except Exception as e:
             error_msg = f"Failed to create analysis record: {str(e)}"
             logging.error(error_msg)
             raise Exception(error_msg)
         
+        # Step 5a: Store the document embedding under every model tag in use (optional)
+        if document:
+            try:
+                logging.info("Step 5a: Storing document embeddings...")
+                embeddings = await store_video_embeddings(
+                    video_id,
+                    summary_text(metadata['title'], metadata),
+                    transcription,
+                    metadata.get("duration"),
+                    document
+                )
+                # The index updater picks the vectors up from index_outbox
+                logging.info(f"Successfully stored document embeddings for {', '.join(embeddings)}")
+            except Exception as e:
+                logging.error(f"Failed to store document embedding: {str(e)}")
+        
+        # Step 5b: Store timestamped frame and transcript segments (optional)
+        try:
+            logging.info("Step 5b: Indexing video segments...")
+            reuse_windows = document is not None and settings.DOCUMENT_WINDOW_SEGMENTS
+            segment_count = await segment_index.ingest(
+                video_id,
+                analysis_results.get("frame_analysis", []),
+                transcription,
+                metadata.get("duration"),
+                windows=document["windows"] if reuse_windows else None,
+                window_embeddings=document["vectors"] if reuse_windows else None
+            )
+            logging.info(f"Successfully stored {segment_count} video segments")
+        except Exception as e:
+            # Search still works at video level without segments
+            logging.error(f"Failed to index video segments: {str(e)}")
+        
         # Step 6: Update video status to completed
         try:
             logging.info("Step 6: Updating video status to completed...")
-            admin_supabase.table("videos").update({
+            await admin_db.table("videos").update({
                 "status": "completed",
                 "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat()
             }).eq("id", video_id).execute()
@@ -173,12 +225,15 @@ async def process_video_background(video_id: str, url: str, youtube_id: str):
             logging.error(error_msg)
             raise Exception(error_msg)
 
+        # Step 7: Make the video and its segments searchable right away
+        await search_indexer.index_video(video_id)
+
     except Exception as e:
         error_msg = str(e)
         logging.error(f"Error processing video {video_id}: {error_msg}")
         # Update video record with error status
         try:
-            admin_supabase.table("videos").update({
+            await admin_db.table("videos").update({
                 "status": "error",
                 "error": error_msg,
                 "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat()
@@ -261,7 +316,7 @@ async def add_video(
         
         # First, verify we can connect to the database
         try:
-            test_result = admin_supabase.table("videos").select("id").limit(1).execute()
+            test_result = await admin_db.table("videos").select("id").limit(1).execute()
             logging.info(f"Database connection test successful. Found {len(test_result.data)} videos")
         except Exception as e:
             logging.error(f"Database connection test failed: {str(e)}")
@@ -269,7 +324,7 @@ async def add_video(
         
         # Try to create the video record using admin client
         try:
-            result = admin_supabase.table("videos").insert(data).execute()
+            result = await admin_db.table("videos").insert(data).execute()
             logging.info(f"Insert response: {result}")
             
             if not result.data:
@@ -277,12 +332,13 @@ async def add_video(
                 raise HTTPException(status_code=500, detail="Failed to create video record in database")
                 
             # Verify the record was created
-            verify_result = admin_supabase.table("videos").select("*").eq("id", record_id).execute()
+            verify_result = await admin_db.table("videos").select("*").eq("id", record_id).execute()
             if not verify_result.data:
                 logging.error(f"Video record not found after creation. ID: {record_id}")
                 raise HTTPException(status_code=500, detail="Video record not found after creation")
                 
             logging.info(f"Successfully created and verified video record with ID: {record_id}")
+            video_management_service.invalidate_totals(user_id)
                 
         except Exception as db_error:
             logging.error(f"Database error creating video: {str(db_error)}")
@@ -305,6 +361,159 @@ async def add_video(
         logging.error(f"Unexpected error in add_video: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def process_videos_background(jobs: List[tuple]):
+    """Background task processing the videos of one import a few at a time"""
+    semaphore = asyncio.Semaphore(max(1, settings.BULK_IMPORT_CONCURRENCY))
+
+    async def run(record_id: str, url: str, platform_video_id: str):
+        async with semaphore:
+            await process_video_background(record_id, url, platform_video_id)
+
+    await asyncio.gather(*(run(*job) for job in jobs))
+
+async def _existing_video_keys(user_id: str, keys: Dict[tuple, str]) -> Dict[tuple, str]:
+    """
+    Find which (platform, platform video ID) keys the user already saved.
+
+    URLs of one video differ (youtu.be vs youtube.com/watch), so rows are
+    matched on the video ID inside the URL and confirmed by parsing it.
+    Returns key -> existing record ID.
+    """
+    chunk_size = 100  # keeps the request URL short
+    video_ids = sorted({video_id for _, video_id in keys})
+    chunks = [video_ids[i:i + chunk_size] for i in range(0, len(video_ids), chunk_size)]
+    results = await asyncio.gather(*(
+        admin_db.table("videos")
+        .select("id,url,platform")
+        .eq("user_id", user_id)
+        .is_("deleted_at", "null")
+        .or_(",".join(f"url.like.*{video_id}*" for video_id in chunk))
+        .execute()
+        for chunk in chunks
+    ))
+    existing = {}
+    for result in results:
+        for row in result.data or []:
+            try:
+                platform = Platform(row["platform"])
+            except ValueError:
+                continue
+            key = (platform, URLParser.extract_video_id(row["url"], platform))
+            if key in keys:
+                existing.setdefault(key, str(row["id"]))
+    return existing
+
+@router.post("/bulk", response_model=VideoBulkResponse)
+async def add_videos_bulk(
+    videos: VideoBulkCreate,
+    background_tasks: BackgroundTasks,
+    user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Add many video links in one request, e.g. a playlist or a share-sheet batch.
+
+    URLs are parsed and validated in one pass, de-duplicated against each
+    other and the user's saved videos, inserted with a single multi-row
+    insert and queued as one background job. Each URL gets its own result,
+    so invalid or duplicate links do not fail the rest of the batch.
+    """
+    try:
+        user_id = None
+        if isinstance(user, dict):
+            if "user" in user and isinstance(user["user"], dict):
+                user_id = user["user"].get("id")
+            elif "id" in user:
+                user_id = user["id"]
+        if not user_id:
+            logging.error(f"User ID not found in token structure: {user}")
+            raise HTTPException(status_code=401, detail="User ID not found in token")
+
+        if len(videos.urls) > settings.BULK_IMPORT_MAX_URLS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.BULK_IMPORT_MAX_URLS} URLs can be imported at once"
+            )
+
+        # Parse and validate every URL, keeping the first of each video
+        results: List[VideoBulkResult] = []
+        result_keys: List[Optional[tuple]] = []  # key of each result, None if invalid
+        keys: Dict[tuple, str] = {}  # (platform, platform video ID) -> first URL
+        for raw_url in videos.urls:
+            url = raw_url.strip()
+            platform = videos.platform
+            if platform == Platform.UNKNOWN:
+                platform = URLParser.detect_platform(url)
+            if platform == Platform.UNKNOWN or not URLParser.validate_url(url, platform):
+                results.append(VideoBulkResult(url=url, status="invalid", error="Unsupported or malformed video URL"))
+                result_keys.append(None)
+                continue
+            video_id = URLParser.extract_video_id(url, platform)
+            if not video_id:
+                results.append(VideoBulkResult(url=url, status="invalid", platform=platform, error="Could not extract video ID from URL"))
+                result_keys.append(None)
+                continue
+            key = (platform, video_id)
+            status = "duplicate" if key in keys else "pending"
+            keys.setdefault(key, url)
+            results.append(VideoBulkResult(url=url, status=status, platform=platform))
+            result_keys.append(key)
+
+        existing = await _existing_video_keys(user_id, keys) if keys else {}
+
+        # One row per new video
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        rows = []
+        jobs = []  # (record ID, URL, platform video ID) of each new video
+        record_ids: Dict[tuple, str] = dict(existing)
+        for key, url in keys.items():
+            if key in existing:
+                continue
+            record_ids[key] = str(uuid.uuid4())
+            jobs.append((record_ids[key], url, key[1]))
+            rows.append({
+                "id": record_ids[key],
+                "url": url,
+                "platform": key[0],
+                "user_id": user_id,
+                "status": "pending",
+                "created_at": now,
+                "updated_at": now
+            })
+
+        if rows:
+            try:
+                await admin_db.table("videos").insert(rows, returning=False).execute()
+                video_management_service.invalidate_totals(user_id)
+            except Exception as db_error:
+                logging.error(f"Database error importing {len(rows)} videos: {str(db_error)}")
+                raise HTTPException(status_code=500, detail=f"Database error: {str(db_error)}")
+
+        # Fill in record IDs; every URL of an already saved video is a duplicate
+        created_ids = {row["id"] for row in rows}
+        for result, key in zip(results, result_keys):
+            if key is None:
+                continue
+            result.id = record_ids[key]
+            if result.id not in created_ids:
+                result.status = "duplicate"
+
+        if jobs:
+            background_tasks.add_task(process_videos_background, jobs)
+        logging.info(f"Bulk import for {user_id}: {len(rows)} created of {len(videos.urls)} URLs")
+
+        return VideoBulkResponse(
+            results=results,
+            created=len(rows),
+            duplicates=sum(1 for result in results if result.status == "duplicate"),
+            invalid=sum(1 for result in results if result.status == "invalid")
+        )
+    except HTTPException as e:
+        logging.error(f"HTTP error in add_videos_bulk: {str(e)}")
+        raise e
+    except Exception as e:
+        logging.error(f"Unexpected error in add_videos_bulk: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/", response_model=List[VideoLinkResponse])
 async def get_videos(
     user: Dict[str, Any] = Depends(get_current_user)
@@ -317,7 +526,7 @@ async def get_videos(
             raise HTTPException(status_code=401, detail="User ID not found in token")
             
         # Query videos for the user
-        result = supabase.table("videos").select("*").eq("user_id", user_id).execute()
+        result = await admin_db.table("videos").select("*").eq("user_id", user_id).execute()
         
         if not result.data:
             return []
@@ -391,12 +600,18 @@ async def restore_video(
 async def list_videos(
     user: Dict[str, Any] = Depends(get_current_user),
     platform: Optional[str] = None,
-    limit: int = 50,
-    offset: int = 0,
-    include_deleted: bool = False
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    include_deleted: bool = False,
+    cursor: Optional[str] = None,
+    include_total: bool = True
 ):
     """
     List user's videos with optional deleted items.
+    
+    Pass the next_cursor of a page as cursor to get the following one;
+    offset paging is kept for older clients. Set include_total=false to
+    skip counting the library.
     """
     try:
         return await video_management_service.get_user_videos(
@@ -404,8 +619,14 @@ async def list_videos(
             platform=platform,
             limit=limit,
             offset=offset,
-            include_deleted=include_deleted
+            include_deleted=include_deleted,
+            cursor=cursor,
+            include_total=include_total
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -422,7 +643,7 @@ async def process_video(
     """
     try:
         # First, verify the video exists and belongs to the user
-        result = supabase.table("videos").select("*").eq("id", video.video_id).single().execute()
+        result = await admin_db.table("videos").select("*").eq("id", video.video_id).single().execute()
         if not result.data:
             raise HTTPException(status_code=404, detail="Video not found")
             
@@ -439,7 +660,7 @@ async def process_video(
         metadata = await get_video_metadata(youtube_id)
         
         # Update video with metadata immediately (excluding description)
-        update_result = supabase.table("videos").update({
+        update_result = await admin_db.table("videos").update({
             "title": metadata['title'],
             "thumbnail_url": metadata['thumbnail_url'],
             "duration": metadata['duration'],
@@ -470,7 +691,7 @@ async def process_video(
         logging.error(f"Error in process_video: {str(e)}")
         # Update video status to indicate error
         try:
-            supabase.table("videos").update({
+            await admin_db.table("videos").update({
                 "status": "error",
                 "error": str(e)
             }).eq("id", video.video_id).execute()
@@ -535,7 +756,7 @@ async def create_video(
     video: VideoCreate,
     background_tasks: BackgroundTasks,
     current_user = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: PostgrestClient = Depends(get_supabase)
 ):
     """Create a new video entry"""
     try:
@@ -564,9 +785,10 @@ async def create_video(
             "status": "processing"
         }
         
-        result = supabase.table("videos").insert(video_data).execute()
+        result = await supabase.table("videos").insert(video_data).execute()
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to create video entry")
+        video_management_service.invalidate_totals(current_user.id)
             
         video_id = result.data[0]["id"]
         
@@ -586,11 +808,11 @@ async def create_video(
         await video_service.clear_processing_status(video.url)
         raise HTTPException(status_code=500, detail=str(e))
 
-async def process_video(video_id: str, url: str, user_id: str, supabase: Client):
+async def process_video(video_id: str, url: str, user_id: str, supabase: PostgrestClient):
     """Process video in the background"""
     try:
         # Update video status
-        supabase.table("videos").update({"status": "processing"}).eq("id", video_id).execute()
+        await supabase.table("videos").update({"status": "processing"}).eq("id", video_id).execute()
         
         # Capture frames
         frames = await video_service.browser_service.capture_video_frames(
@@ -620,14 +842,14 @@ async def process_video(video_id: str, url: str, user_id: str, supabase: Client)
             }
         }
         
-        supabase.table("video_analysis").insert(analysis_data).execute()
+        await supabase.table("video_analysis").insert(analysis_data).execute()
         
         # Update video status
-        supabase.table("videos").update({"status": "completed"}).eq("id", video_id).execute()
+        await supabase.table("videos").update({"status": "completed"}).eq("id", video_id).execute()
         
     except Exception as e:
         logger.error(f"Error processing video: {str(e)}")
-        supabase.table("videos").update({
+        await supabase.table("videos").update({
             "status": "failed",
             "error": str(e)
         }).eq("id", video_id).execute()
@@ -639,11 +861,11 @@ async def process_video(video_id: str, url: str, user_id: str, supabase: Client)
 @router.get("/", response_model=List[VideoResponse])
 async def get_videos(
     current_user = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: PostgrestClient = Depends(get_supabase)
 ):
     """Get all videos for the current user"""
     try:
-        result = supabase.table("videos").select("*").eq("user_id", current_user.id).execute()
+        result = await supabase.table("videos").select("*").eq("user_id", current_user.id).execute()
         return [VideoResponse(**video) for video in result.data]
     except Exception as e:
         logger.error(f"Error getting videos: {str(e)}")
@@ -653,11 +875,11 @@ async def get_videos(
 async def get_video(
     video_id: str,
     current_user = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: PostgrestClient = Depends(get_supabase)
 ):
     """Get a specific video by ID"""
     try:
-        result = supabase.table("videos").select("*").eq("id", video_id).eq("user_id", current_user.id).execute()
+        result = await supabase.table("videos").select("*").eq("id", video_id).eq("user_id", current_user.id).execute()
         if not result.data:
             raise HTTPException(status_code=404, detail="Video not found")
         return VideoResponse(**result.data[0])
@@ -670,11 +892,11 @@ async def update_video(
     video_id: str,
     video: VideoUpdate,
     current_user = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: PostgrestClient = Depends(get_supabase)
 ):
     """Update a video"""
     try:
-        result = supabase.table("videos").update(video.dict(exclude_unset=True)).eq("id", video_id).eq("user_id", current_user.id).execute()
+        result = await supabase.table("videos").update(video.dict(exclude_unset=True)).eq("id", video_id).eq("user_id", current_user.id).execute()
         if not result.data:
             raise HTTPException(status_code=404, detail="Video not found")
         return VideoResponse(**result.data[0])
@@ -686,13 +908,14 @@ async def update_video(
 async def delete_video(
     video_id: str,
     current_user = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    supabase: PostgrestClient = Depends(get_supabase)
 ):
     """Delete a video"""
     try:
-        result = supabase.table("videos").delete().eq("id", video_id).eq("user_id", current_user.id).execute()
+        result = await supabase.table("videos").delete().eq("id", video_id).eq("user_id", current_user.id).execute()
         if not result.data:
             raise HTTPException(status_code=404, detail="Video not found")
+        video_management_service.invalidate_totals(current_user.id)
         return {"message": "Video deleted successfully"}
     except Exception as e:
         logger.error(f"Error deleting video: {str(e)}")
@@ -1,11 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
+import json
 from ..services.auth import auth_service
 from ..services.search import search_service
+from ..services.search_budget import SearchBudget
+from ..services.search_cache import search_cache
+from ..services.autocomplete import autocomplete_index
+from ..services.query_embedding import query_embedding_service
+from ..utils.embedding_cache import embedding_cache
 
 router = APIRouter()
 
+class Moment(BaseModel):
+    start_seconds: float
+    kind: str  # frame or transcript
+    text: str
+    score: float
+
 class SearchResponse(BaseModel):
     id: str
     title: str
@@ -13,34 +26,145 @@ class SearchResponse(BaseModel):
     thumbnail_url: str
     platform: str
     relevance_score: float
+    moments: List[Moment] = []
+
+class SearchPage(BaseModel):
+    results: List[SearchResponse]
+    next_cursor: Optional[str] = None
 
 @router.get("/videos/search", response_model=List[SearchResponse])
 async def search_videos(
+    response: Response,
     query: str = Query(..., min_length=1),
     platform: str = Query(None),
+    stream: bool = Query(False),
+    deadline_ms: float = Query(None, gt=0),
     token: str = Depends(auth_service.get_user)
 ) -> List[Dict[str, Any]]:
     """
     Search for videos using natural language query.
     
     Args:
+        response: Carries the stage report headers
         query: Search query string
         platform: Optional platform filter (YouTube, Instagram, etc.)
+        stream: Stream NDJSON events (preview, results, done) as stages finish
+        deadline_ms: Time budget; optional stages (wide index probing, exact
+            re-ranking, database enrichment) are skipped when it runs short
+            (defaults to SEARCH_DEADLINE_MS)
         token: JWT token for authentication
         
     Returns:
-        List of matching videos with relevance scores
+        List of matching videos with relevance scores, or an NDJSON stream.
+        The X-Search-Stages and X-Search-Skipped headers (or the stream's done
+        event) report which stages ran.
     """
     try:
         if not token:
             raise HTTPException(status_code=401, detail="Not authenticated")
             
+        budget = SearchBudget(deadline_ms)
+        if stream:
+            events = search_service.stream_search(
+                user_id=token["user_id"],
+                query=query,
+                platform=platform,
+                budget=budget
+            )
+            return StreamingResponse(
+                (json.dumps(event, default=str) + "\n" async for event in events),
+                media_type="application/x-ndjson"
+            )
+            
         results = await search_service.search_videos(
             user_id=token["user_id"],
             query=query,
-            platform=platform
+            platform=platform,
+            budget=budget
         )
+        response.headers["X-Search-Stages"] = ",".join(budget.ran)
+        response.headers["X-Search-Skipped"] = ",".join(budget.skipped)
         return results
         
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/videos/search/page", response_model=SearchPage)
+async def search_videos_page(
+    query: str = Query(..., min_length=1),
+    platform: str = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = Query(None),
+    token: str = Depends(auth_service.get_user)
+) -> Dict[str, Any]:
+    """
+    Page through search results with a cursor.
+    
+    Args:
+        query: Search query string
+        platform: Optional platform filter (YouTube, Instagram, etc.)
+        limit: Page size
+        cursor: next_cursor from the previous page; omit for the first page
+        token: JWT token for authentication
+        
+    Returns:
+        One page of results and the cursor for the next one (null on the last page)
+    """
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+        
+    try:
+        return await search_service.search_page(
+            user_id=token["user_id"],
+            query=query,
+            platform=platform,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+
+@router.get("/videos/search/suggest", response_model=List[str])
+async def suggest(
+    prefix: str = Query(..., min_length=1),
+    limit: int = Query(8, ge=1, le=20),
+    token: str = Depends(auth_service.get_user)
+) -> List[str]:
+    """
+    Search-as-you-type completions from the user's own library.
+    
+    Served from memory; does not touch the database or the embedding model.
+    
+    Args:
+        prefix: Text typed so far
+        limit: Maximum number of suggestions
+        token: JWT token for authentication
+        
+    Returns:
+        Suggested queries, most frequent first
+    """
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+        
+    return autocomplete_index.suggest(token["user_id"], prefix, limit)
+
+@router.get("/videos/search/stats")
+async def search_stats(
+    token: str = Depends(auth_service.get_user)
+) -> Dict[str, Any]:
+    """
+    Report cache effectiveness for this worker's search path.
+    
+    Returns:
+        Result cache, query embedding cache and text embedding cache statistics
+    """
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+        
+    return {
+        "results": search_cache.stats(),
+        "query_embeddings": query_embedding_service.stats(),
+        "text_embeddings": embedding_cache.stats()
+    }
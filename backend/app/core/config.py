@@ -16,6 +16,15 @@ class Settings(BaseSettings):
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
     SUPABASE_SERVICE_KEY: str = os.getenv("SUPABASE_SERVICE_KEY", "")
     SUPABASE_JWT_SECRET: str = os.getenv("SUPABASE_JWT_SECRET", "")
+    POSTGREST_URL: str = os.getenv("POSTGREST_URL", "")  # defaults to SUPABASE_URL/rest/v1; set for a local PostgREST
+    DB_TIMEOUT_SECONDS: float = float(os.getenv("DB_TIMEOUT_SECONDS", "10"))  # per PostgREST request
+    DB_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "5"))
+    DB_MAX_CONNECTIONS: int = int(os.getenv("DB_MAX_CONNECTIONS", "50"))  # pooled connections per process
+    DB_HTTP2: bool = os.getenv("DB_HTTP2", "true").lower() == "true"  # multiplex requests over HTTP/2
+    BULK_IMPORT_MAX_URLS: int = int(os.getenv("BULK_IMPORT_MAX_URLS", "500"))  # URLs accepted per bulk import request
+    BULK_IMPORT_CONCURRENCY: int = int(os.getenv("BULK_IMPORT_CONCURRENCY", "2"))  # videos of one import processed at a time
+    VIDEO_LIST_COUNT: str = os.getenv("VIDEO_LIST_COUNT", "estimated")  # PostgREST count mode for video list totals: exact, planned or estimated
+    VIDEO_LIST_COUNT_TTL_SECONDS: float = float(os.getenv("VIDEO_LIST_COUNT_TTL_SECONDS", "60"))  # how long a counted total is reused
     
     # OpenAI Configuration
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -30,6 +39,49 @@ class Settings(BaseSettings):
     # YouTube API Configuration
     YOUTUBE_API_KEY: str = os.getenv("YOUTUBE_API_KEY", "")
     
+    # Vector Search Configuration
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "faiss")  # faiss (in-process index) or pgvector (match_videos RPC)
+    PGVECTOR_PROBES: int = int(os.getenv("PGVECTOR_PROBES", "10"))
+    QUERY_EMBEDDING_CACHE_SIZE: int = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "10000"))
+    QUERY_EMBEDDING_BATCH_WINDOW_MS: float = float(os.getenv("QUERY_EMBEDDING_BATCH_WINDOW_MS", "2"))
+    SEARCH_CACHE_SIZE: int = int(os.getenv("SEARCH_CACHE_SIZE", "5000"))
+    SEARCH_CACHE_TTL_SECONDS: float = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300"))
+    SEGMENTS_PER_VIDEO: int = int(os.getenv("SEGMENTS_PER_VIDEO", "48"))  # cap on frame + transcript segments indexed per video
+    SEARCH_DEADLINE_MS: float = float(os.getenv("SEARCH_DEADLINE_MS", "0"))  # default per-search time budget, 0 for none
+    SEARCH_DEGRADED_NPROBE: int = int(os.getenv("SEARCH_DEGRADED_NPROBE", "2"))  # index lists scanned when the budget is short
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")  # sentence-transformers model of new embeddings
+    EMBEDDING_VERSION: str = os.getenv("EMBEDDING_VERSION", "1")  # bump when the document embedding pipeline changes
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")  # torch (sentence-transformers fp32) or onnx (int8 ONNX Runtime)
+    EMBEDDING_THREADS: int = int(os.getenv("EMBEDDING_THREADS", "0"))  # ONNX Runtime intra-op threads, 0 for all cores
+    EMBEDDING_ONNX_DIR: str = os.getenv("EMBEDDING_ONNX_DIR", "data/embedding_model")
+    EMBEDDING_ONNX_MIN_COSINE: float = float(os.getenv("EMBEDDING_ONNX_MIN_COSINE", "0.98"))  # parity required of a fresh export
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", "data/embedding_cache.sqlite3")
+    EMBEDDING_CACHE_MAX_MB: float = float(os.getenv("EMBEDDING_CACHE_MAX_MB", "512"))  # size limit of the text embedding cache, 0 disables it
+    SERVICE_PRELOAD: str = os.getenv("SERVICE_PRELOAD", "embedding_model")  # comma-separated registry services built at startup
+    SEARCH_CURSOR_SECRET: str = os.getenv("SEARCH_CURSOR_SECRET", "")  # signs search and video list page cursors; required
+    EMBEDDING_MIGRATION_TARGET: str = os.getenv("EMBEDDING_MIGRATION_TARGET", "")  # model tag (e.g. all-mpnet-base-v2@v1) the index builder re-embeds the corpus with
+    EMBEDDING_MIGRATION_RATE: float = float(os.getenv("EMBEDDING_MIGRATION_RATE", "5"))  # videos re-embedded per second
+    EMBEDDING_MIGRATION_BATCH: int = int(os.getenv("EMBEDDING_MIGRATION_BATCH", "50"))  # videos per page and checkpoint
+    EMBEDDING_MIGRATION_MAX_SWEEPS: int = int(os.getenv("EMBEDDING_MIGRATION_MAX_SWEEPS", "5"))  # retry sweeps over missed videos before the job gives up
+    EMBEDDING_ACTIVE_REFRESH_SECONDS: float = float(os.getenv("EMBEDDING_ACTIVE_REFRESH_SECONDS", "30"))  # how often the active model tag is re-read
+    KEYWORDS_PER_VIDEO: int = int(os.getenv("KEYWORDS_PER_VIDEO", "20"))  # TF-IDF keywords kept per video
+    KEYWORD_STATS_PATH: str = os.getenv("KEYWORD_STATS_PATH", "data/keyword_stats.sqlite3")  # corpus document frequencies
+    DOCUMENT_WINDOW_WORDS: int = int(os.getenv("DOCUMENT_WINDOW_WORDS", "160"))  # words per embedded window, under the model's 256 word-piece limit
+    DOCUMENT_WINDOW_OVERLAP: int = int(os.getenv("DOCUMENT_WINDOW_OVERLAP", "32"))  # words shared by consecutive windows
+    DOCUMENT_MAX_WINDOWS: int = int(os.getenv("DOCUMENT_MAX_WINDOWS", "32"))  # cap on windows encoded per video
+    DOCUMENT_POOLING: str = os.getenv("DOCUMENT_POOLING", "mean")  # mean or max pooling of window vectors
+    DOCUMENT_WINDOW_SEGMENTS: bool = os.getenv("DOCUMENT_WINDOW_SEGMENTS", "false").lower() == "true"  # reuse transcript windows as searchable segments
+    VECTOR_STORE_DIR: str = os.getenv("VECTOR_STORE_DIR", "data/vector_store")
+    VECTOR_REFINE_FACTOR: int = int(os.getenv("VECTOR_REFINE_FACTOR", "4"))  # over-fetch k*r ANN candidates for exact re-ranking, 1 disables
+    VECTOR_INDEX_ROLE: str = os.getenv("VECTOR_INDEX_ROLE", "standalone")  # standalone, writer (index builder) or reader (API workers)
+    VECTOR_SNAPSHOT_POLL_SECONDS: float = float(os.getenv("VECTOR_SNAPSHOT_POLL_SECONDS", "2"))
+    VECTOR_SNAPSHOT_PUBLISH_DELAY: float = float(os.getenv("VECTOR_SNAPSHOT_PUBLISH_DELAY", "5"))
+    VECTOR_INDEX_REBUILD_SECONDS: int = int(os.getenv("VECTOR_INDEX_REBUILD_SECONDS", "3600"))
+    INDEX_OUTBOX_POLL_SECONDS: float = float(os.getenv("INDEX_OUTBOX_POLL_SECONDS", "1"))  # how often the index owner tails index_outbox, 0 disables
+    INDEX_OUTBOX_BATCH: int = int(os.getenv("INDEX_OUTBOX_BATCH", "500"))  # outbox rows applied per FAISS update
+    INDEX_OUTBOX_GAP_SECONDS: float = float(os.getenv("INDEX_OUTBOX_GAP_SECONDS", "5"))  # wait for uncommitted outbox ids before skipping them
+    INDEX_OUTBOX_RETENTION_HOURS: float = float(os.getenv("INDEX_OUTBOX_RETENTION_HOURS", "24"))
+    
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -1,10 +1,8 @@
-from supabase import create_client
-from .config import get_settings
+from ..database import admin_db, PostgrestClient
 
-settings = get_settings()
+# Backend operations use the service role client; it shares the connection
+# pool of every other database client (app/database/postgrest.py)
 
-# Use service role key for backend operations
-supabase = create_client(
-    settings.SUPABASE_URL,
-    settings.SUPABASE_SERVICE_KEY  # Use service role key instead of anonymous key
-) 
\ No newline at end of file
+def get_supabase() -> PostgrestClient:
+    """FastAPI dependency returning the service role database client."""
+    return admin_db
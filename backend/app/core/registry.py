@@ -0,0 +1,117 @@
+"""
+Lazy service registry.
+
+Heavy services (TensorFlow models, the sentence-transformers model, Redis
+clients, the Playwright browser) are registered with a factory instead of
+being constructed when their module is imported. A process only pays for a
+service when something first uses it, or when its role preloads it with
+SERVICE_PRELOAD, so API processes that only list and search videos boot
+without them.
+"""
+import logging
+import resource
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+_process_started = time.perf_counter()
+
+class ServiceRegistry:
+    """Builds registered services on first use and records how long each took."""
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self.load_seconds: Dict[str, float] = {}
+        self.events: Dict[str, float] = {}  # milestone -> seconds since the registry was imported
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """Register a factory; it runs at most once, on the first get()."""
+        self._factories[name] = factory
+        self._locks.setdefault(name, threading.Lock())
+
+    def lazy(self, name: str, factory: Callable[[], Any]) -> "LazyService":
+        """Register a factory and return a proxy that stands in for the service."""
+        self.register(name, factory)
+        return LazyService(self, name)
+
+    def get(self, name: str) -> Any:
+        """Return the service, constructing it on first use (thread-safe)."""
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        with self._locks[name]:
+            if name not in self._instances:
+                started = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                self.load_seconds[name] = time.perf_counter() - started
+                logger.info(f"Loaded service {name} in {self.load_seconds[name]:.2f}s")
+        return self._instances[name]
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._factories
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def preload(self, names: Iterable[str]) -> List[str]:
+        """
+        Construct the named services now, e.g. in a worker role that needs them.
+
+        Unknown names and construction errors are logged and skipped.
+
+        Returns:
+            Names of the services that are loaded afterwards
+        """
+        loaded = []
+        for name in names:
+            if name not in self._factories:
+                logger.warning(f"Cannot preload unknown service {name}")
+                continue
+            try:
+                self.get(name)
+                loaded.append(name)
+            except Exception as e:
+                logger.error(f"Error preloading service {name}: {str(e)}")
+        return loaded
+
+    def mark(self, event: str):
+        """Record a startup milestone, in seconds since this module was imported."""
+        self.events[event] = time.perf_counter() - _process_started
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "events": {event: round(seconds, 3) for event, seconds in self.events.items()},
+            "loaded": {name: round(seconds, 3) for name, seconds in self.load_seconds.items()},
+            "not_loaded": sorted(set(self._factories) - set(self._instances)),
+            # ru_maxrss is in KiB on Linux
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        }
+
+class LazyService:
+    """
+    Module-level stand-in for a registered service.
+
+    Attribute access resolves the real service from the registry, so existing
+    `from ... import some_service` call sites keep working unchanged.
+    """
+    __slots__ = ("_registry", "_name")
+
+    def __init__(self, registry: ServiceRegistry, name: str):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self._registry.get(self._name), attribute)
+
+    def __setattr__(self, attribute: str, value: Any):
+        setattr(self._registry.get(self._name), attribute, value)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._registry.is_loaded(self._name) else "not loaded"
+        return f"<LazyService {self._name} ({state})>"
+
+registry = ServiceRegistry()
@@ -1,20 +1,10 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from supabase import create_client
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from ..database import admin_db
 
 logger = logging.getLogger(__name__)
 
-# Initialize Supabase client with service role key
-supabase = create_client(
-    os.getenv("SUPABASE_URL"),
-    os.getenv("SUPABASE_SERVICE_KEY")
-)
-
 async def purge_deleted_videos():
     """Purge videos that have been soft deleted for more than 1 day"""
     try:
@@ -22,7 +12,7 @@ async def purge_deleted_videos():
         cutoff_date = datetime.utcnow() - timedelta(days=1)
         
         # Find videos that have been soft deleted for more than 1 day
-        result = supabase.table("videos").select("id").eq("status", "deleted").lt("deleted_at", cutoff_date.isoformat()).execute()
+        result = await admin_db.table("videos").select("id").eq("status", "deleted").lt("deleted_at", cutoff_date.isoformat()).execute()
         
         if not result.data:
             logger.info("No videos to purge")
@@ -33,7 +23,7 @@ async def purge_deleted_videos():
         
         # Delete the videos and their associated data
         # The ON DELETE CASCADE will handle the related records
-        delete_result = supabase.table("videos").delete().in_("id", video_ids).execute()
+        delete_result = await admin_db.table("videos").delete().in_("id", video_ids).execute()
         
         logger.info(f"Successfully purged {len(video_ids)} deleted videos")
         
@@ -1,9 +1,9 @@
 """
 Database module for VidFold backend
 """
-from supabase import create_client
 import os
 from dotenv import load_dotenv
+from .postgrest import PostgrestClient, PostgrestError, APIResponse
 import logging
 
 # Load environment variables
@@ -11,19 +11,21 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-# Initialize Supabase client
+# Initialize the PostgREST clients; both share one connection pool
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise ValueError("Missing Supabase credentials. Please check your .env file.")
 
-try:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    logger.info("✅ Supabase client initialized successfully")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize Supabase client: {str(e)}")
-    raise
+# Client for the API key the services have always used
+db = PostgrestClient(SUPABASE_KEY)
 
-# Export the client
-__all__ = ['supabase'] 
\ No newline at end of file
+# Service role client for admin operations (bypasses row level security)
+admin_db = PostgrestClient(SUPABASE_SERVICE_KEY or SUPABASE_KEY)
+
+logger.info("✅ Database clients initialized")
+
+# Export the clients
+__all__ = ['db', 'admin_db', 'PostgrestClient', 'PostgrestError', 'APIResponse']
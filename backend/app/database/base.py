@@ -2,12 +2,12 @@
 Base database operations for VidFold backend
 """
 from typing import Dict, Any, List, Optional
-from . import supabase
+from . import db
 
 async def insert_one(table: str, data: Dict[str, Any]) -> Dict[str, Any]:
     """Insert a single record into a table"""
     try:
-        response = await supabase.table(table).insert(data).execute()
+        response = await db.table(table).insert(data).execute()
         return response.data[0] if response.data else {}
     except Exception as e:
         raise Exception(f"Error inserting into {table}: {str(e)}")
@@ -15,7 +15,7 @@ async def insert_one(table: str, data: Dict[str, Any]) -> Dict[str, Any]:
 async def select_by_id(table: str, id: str) -> Optional[Dict[str, Any]]:
     """Select a single record by id"""
     try:
-        response = await supabase.table(table).select("*").eq("id", id).execute()
+        response = await db.table(table).select("*").eq("id", id).execute()
         return response.data[0] if response.data else None
     except Exception as e:
         raise Exception(f"Error selecting from {table}: {str(e)}")
@@ -23,7 +23,7 @@ async def select_by_id(table: str, id: str) -> Optional[Dict[str, Any]]:
 async def select_all(table: str) -> List[Dict[str, Any]]:
     """Select all records from a table"""
     try:
-        response = await supabase.table(table).select("*").execute()
+        response = await db.table(table).select("*").execute()
         return response.data if response.data else []
     except Exception as e:
         raise Exception(f"Error selecting from {table}: {str(e)}")
@@ -31,7 +31,7 @@ async def select_all(table: str) -> List[Dict[str, Any]]:
 async def update_by_id(table: str, id: str, data: Dict[str, Any]) -> Dict[str, Any]:
     """Update a single record by id"""
     try:
-        response = await supabase.table(table).update(data).eq("id", id).execute()
+        response = await db.table(table).update(data).eq("id", id).execute()
         return response.data[0] if response.data else {}
     except Exception as e:
         raise Exception(f"Error updating {table}: {str(e)}")
@@ -39,7 +39,7 @@ async def update_by_id(table: str, id: str, data: Dict[str, Any]) -> Dict[str, A
 async def delete_by_id(table: str, id: str) -> bool:
     """Delete a single record by id"""
     try:
-        response = await supabase.table(table).delete().eq("id", id).execute()
+        response = await db.table(table).delete().eq("id", id).execute()
         return bool(response.data)
     except Exception as e:
         raise Exception(f"Error deleting from {table}: {str(e)}")
@@ -0,0 +1,312 @@
+"""
+Async PostgREST data-access layer.
+
+Every client shares one pooled HTTP/2 connection pool (httpx), so a query
+costs a request on an open connection instead of blocking the event loop for
+a full HTTPS round trip the way synchronous supabase-py calls do. Clients
+differ only in the API key they send, one per role (anon and service).
+
+The query builder follows supabase-py's fluent interface, except that
+execute() is a coroutine:
+
+    result = await db.table("videos").select("id,title").eq("user_id", user_id).execute()
+
+Point POSTGREST_URL at a local PostgREST, or pass an httpx transport
+(e.g. httpx.MockTransport over an in-memory fake) to test without Supabase.
+"""
+import json
+from typing import Dict, List, Any, Optional, Tuple, Union
+import httpx
+from ..core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PostgrestError(Exception):
+    """Error response from PostgREST."""
+    def __init__(self, status_code: int, body: Any):
+        body = body if isinstance(body, dict) else {"message": str(body)}
+        self.status_code = status_code
+        self.code = body.get("code")
+        self.message = body.get("message") or str(body)
+        self.details = body.get("details")
+        self.hint = body.get("hint")
+        super().__init__(f"{self.message} (HTTP {status_code}, code {self.code})")
+
+class APIResponse:
+    """Result of a query: the returned rows and, if requested, the total count."""
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+def _value(value: Any) -> str:
+    """Render a value for a simple filter (eq.value); PostgREST takes it verbatim."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+def _quote(value: Any) -> str:
+    """Render a value inside a list (in.(...)), quoting reserved characters."""
+    text = _value(value)
+    if any(char in text for char in ',()".:\\ '):
+        return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return text
+
+def _count(content_range: Optional[str]) -> Optional[int]:
+    """Total from a Content-Range header such as "0-24/3573" ("*" when not counted)."""
+    if not content_range or "/" not in content_range:
+        return None
+    total = content_range.rsplit("/", 1)[1]
+    return int(total) if total.isdigit() else None
+
+class QueryBuilder:
+    """One PostgREST request, built up by chained calls and sent by execute()."""
+    def __init__(self, client: "PostgrestClient", path: str):
+        self._client = client
+        self._path = path
+        self._method = "GET"
+        self._params: List[Tuple[str, str]] = []
+        self._prefer: List[str] = []
+        self._headers: Dict[str, str] = {}
+        self._json: Any = None
+        self._order: List[str] = []
+        self._negate = False
+
+    # Operations
+
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "QueryBuilder":
+        """
+        Read rows.
+
+        Args:
+            columns: PostgREST select list, including embedded resources
+            count: "exact", "planned" or "estimated" to also return the total
+        """
+        self._method = "GET"
+        self._params.append(("select", "".join(columns.split())))
+        if count:
+            self._prefer.append(f"count={count}")
+        return self
+
+    def insert(self, rows: Union[Dict[str, Any], List[Dict[str, Any]]], returning: bool = True) -> "QueryBuilder":
+        """Insert one row or many in a single request."""
+        self._method = "POST"
+        self._json = rows
+        self._prefer.append("return=representation" if returning else "return=minimal")
+        if isinstance(rows, list) and rows:
+            # Multi-row inserts need the union of keys named explicitly
+            columns = sorted({key for row in rows for key in row})
+            self._params.append(("columns", ",".join(columns)))
+        return self
+
+    def upsert(
+        self,
+        rows: Union[Dict[str, Any], List[Dict[str, Any]]],
+        on_conflict: Optional[str] = None,
+        ignore_duplicates: bool = False,
+        returning: bool = True
+    ) -> "QueryBuilder":
+        """Insert rows, merging (or skipping) those that conflict."""
+        self.insert(rows, returning)
+        self._prefer.append("resolution=ignore-duplicates" if ignore_duplicates else "resolution=merge-duplicates")
+        if on_conflict:
+            self._params.append(("on_conflict", on_conflict))
+        return self
+
+    def update(self, values: Dict[str, Any], returning: bool = True) -> "QueryBuilder":
+        self._method = "PATCH"
+        self._json = values
+        self._prefer.append("return=representation" if returning else "return=minimal")
+        return self
+
+    def delete(self, returning: bool = True) -> "QueryBuilder":
+        self._method = "DELETE"
+        self._prefer.append("return=representation" if returning else "return=minimal")
+        return self
+
+    # Filters
+
+    @property
+    def not_(self) -> "QueryBuilder":
+        """Negate the next filter."""
+        self._negate = True
+        return self
+
+    def _filter(self, column: str, operator: str, value: str) -> "QueryBuilder":
+        if self._negate:
+            operator = f"not.{operator}"
+            self._negate = False
+        self._params.append((column, f"{operator}.{value}"))
+        return self
+
+    def eq(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "eq", _value(value))
+
+    def neq(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "neq", _value(value))
+
+    def gt(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "gt", _value(value))
+
+    def gte(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "gte", _value(value))
+
+    def lt(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "lt", _value(value))
+
+    def lte(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "lte", _value(value))
+
+    def like(self, column: str, pattern: str) -> "QueryBuilder":
+        return self._filter(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str) -> "QueryBuilder":
+        return self._filter(column, "ilike", pattern)
+
+    def is_(self, column: str, value: Any) -> "QueryBuilder":
+        """IS null / true / false; value may be None or the string "null"."""
+        return self._filter(column, "is", "null" if value in (None, "null") else _value(value))
+
+    def in_(self, column: str, values: List[Any]) -> "QueryBuilder":
+        return self._filter(column, "in", "(" + ",".join(_quote(value) for value in values) + ")")
+
+    def match(self, values: Dict[str, Any]) -> "QueryBuilder":
+        """Equality filter on several columns."""
+        for column, value in values.items():
+            self.eq(column, value)
+        return self
+
+    def or_(self, filters: str) -> "QueryBuilder":
+        """Raw PostgREST disjunction, e.g. "created_at.lt.X,and(created_at.eq.X,id.lt.Y)"."""
+        self._params.append(("or", f"({filters})"))
+        return self
+
+    # Modifiers
+
+    def order(self, column: str, desc: bool = False, nullsfirst: Optional[bool] = None) -> "QueryBuilder":
+        """Sort by a column; repeated calls add tie-breakers."""
+        term = f"{column}.{'desc' if desc else 'asc'}"
+        if nullsfirst is not None:
+            term += ".nullsfirst" if nullsfirst else ".nullslast"
+        self._order.append(term)
+        return self
+
+    def limit(self, count: int) -> "QueryBuilder":
+        self._params.append(("limit", str(int(count))))
+        return self
+
+    def range(self, start: int, end: int) -> "QueryBuilder":
+        """Rows start..end inclusive, as in supabase-py."""
+        self._params.append(("offset", str(int(start))))
+        self._params.append(("limit", str(int(end) - int(start) + 1)))
+        return self
+
+    def single(self) -> "QueryBuilder":
+        """Return exactly one row as a dict (PostgREST errors otherwise)."""
+        self._headers["Accept"] = "application/vnd.pgrst.object+json"
+        return self
+
+    async def execute(self) -> APIResponse:
+        params = list(self._params)
+        if self._order:
+            params.append(("order", ",".join(self._order)))
+        headers = dict(self._headers)
+        if self._prefer:
+            headers["Prefer"] = ",".join(self._prefer)
+        return await self._client.request(self._method, self._path, params, headers, self._json)
+
+class RpcBuilder:
+    """Call of a Postgres function through /rpc."""
+    def __init__(self, client: "PostgrestClient", name: str, params: Dict[str, Any]):
+        self._client = client
+        self._name = name
+        self._params = params
+
+    async def execute(self) -> APIResponse:
+        return await self._client.request("POST", f"rpc/{self._name}", [], {}, self._params)
+
+class PostgrestClient:
+    """
+    PostgREST client for one role (API key) over the shared connection pool.
+
+    Args:
+        key: API key (anon or service role) sent as apikey and bearer token
+        url: PostgREST base URL (defaults to POSTGREST_URL, else SUPABASE_URL/rest/v1)
+        transport: httpx transport to use instead of the network, for tests
+    """
+    _pool: Optional[httpx.AsyncClient] = None  # shared by every client without a transport
+
+    def __init__(self, key: str, url: Optional[str] = None, transport: Optional[httpx.AsyncBaseTransport] = None):
+        base = url or settings.POSTGREST_URL or f"{settings.SUPABASE_URL.rstrip('/')}/rest/v1"
+        self.base_url = base.rstrip("/") + "/"
+        self.key = key
+        self._transport = transport
+        self._http: Optional[httpx.AsyncClient] = None
+
+    @staticmethod
+    def _create_http(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=settings.DB_HTTP2 and transport is None,
+            transport=transport,
+            timeout=httpx.Timeout(settings.DB_TIMEOUT_SECONDS, connect=settings.DB_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=settings.DB_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.DB_MAX_CONNECTIONS
+            )
+        )
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """The HTTP client, created on first use."""
+        if self._transport is not None:
+            if self._http is None:
+                self._http = self._create_http(self._transport)
+            return self._http
+        if PostgrestClient._pool is None or PostgrestClient._pool.is_closed:
+            PostgrestClient._pool = self._create_http()
+        return PostgrestClient._pool
+
+    def table(self, name: str) -> QueryBuilder:
+        return QueryBuilder(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> RpcBuilder:
+        return RpcBuilder(self, name, params or {})
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: List[Tuple[str, str]],
+        headers: Dict[str, str],
+        body: Any = None
+    ) -> APIResponse:
+        """Send one request and decode the PostgREST response."""
+        headers = {
+            "apikey": self.key,
+            "Authorization": f"Bearer {self.key}",
+            "Accept": "application/json",
+            **headers
+        }
+        content = None
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+            content = json.dumps(body, default=str)
+        response = await self.http.request(
+            method,
+            self.base_url + path,
+            params=params,
+            headers=headers,
+            content=content
+        )
+        payload = response.json() if response.content else None
+        if response.status_code >= 400:
+            raise PostgrestError(response.status_code, payload)
+        return APIResponse(payload, _count(response.headers.get("content-range")))
+
+    async def aclose(self):
+        """Close this client's connections (the shared pool if it uses it)."""
+        http = self._http if self._transport is not None else PostgrestClient._pool
+        if http is not None:
+            await http.aclose()
@@ -0,0 +1,50 @@
+"""
+Index builder process: the single writer of the shared vector index.
+
+Run one instance next to the API (`python -m app.index_builder`) and start the
+uvicorn workers with VECTOR_INDEX_ROLE=reader; they memory-map the generations
+published here instead of each building a private copy. With
+EMBEDDING_MIGRATION_TARGET set it also re-embeds the corpus with that model
+tag and switches the index to it once every video is covered. Between
+rebuilds it applies new and removed embeddings from the index outbox.
+"""
+import asyncio
+import logging
+from .core.config import settings
+from .services.vector_store import vector_store
+from .services.index_updater import index_updater
+from .services.embedding_migration import embedding_migration
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def run_embedding_migration(tag: str):
+    """
+    Re-embed the corpus with EMBEDDING_MIGRATION_TARGET, then publish a
+    generation built from it; readers switch models when they load it.
+    """
+    try:
+        if await embedding_migration.run(tag):
+            await index_updater.rebuild()
+            logger.info(f"Index generation {vector_store.generation} published for {tag}")
+    except Exception as e:
+        logger.error(f"Embedding migration to {tag} stopped: {str(e)}")
+
+async def run_index_builder():
+    """Build and publish the index, then rebuild it periodically."""
+    vector_store.role = "writer"
+    if settings.EMBEDDING_MIGRATION_TARGET:
+        asyncio.create_task(run_embedding_migration(settings.EMBEDDING_MIGRATION_TARGET))
+    updater_task = None
+    while True:
+        try:
+            await index_updater.rebuild()
+            if updater_task is None and index_updater.enabled:
+                updater_task = asyncio.create_task(index_updater.run())
+            logger.info(f"Index generation {vector_store.generation} published")
+        except Exception as e:
+            logger.error(f"Error building index: {str(e)}")
+        await asyncio.sleep(settings.VECTOR_INDEX_REBUILD_SECONDS)
+
+if __name__ == "__main__":
+    asyncio.run(run_index_builder())
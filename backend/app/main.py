@@ -7,6 +7,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .api.endpoints import videos, auth
 from .core.tasks import run_periodic_tasks
+from .core.config import settings
+from .utils.cursor import check_secret
 import asyncio
 
 # Add the backend directory to Python path
@@ -40,6 +42,8 @@ async def health_check():
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks on application startup."""
+    # Paging cursors are signed; refuse to serve with a key anyone could guess
+    check_secret(settings.SEARCH_CURSOR_SECRET)
     # Start the periodic tasks
     asyncio.create_task(run_periodic_tasks())
 
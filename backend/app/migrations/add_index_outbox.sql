@@ -0,0 +1,67 @@
+-- Transactional outbox of vector index changes.
+--
+-- Every write to video_embeddings and every soft delete or restore of a video
+-- appends a row here in the same transaction, so a change that commits is
+-- never missing from the outbox and a rolled back one never appears in it.
+-- The index updater (app/services/index_updater.py) tails the table by id
+-- and applies the changes to the in-memory FAISS index in batches.
+
+CREATE TABLE IF NOT EXISTS index_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    video_id UUID NOT NULL,
+    model TEXT,  -- tag of the changed vector; NULL for removals of every tag
+    op TEXT NOT NULL CHECK (op IN ('add', 'remove')),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Retention cleanup
+CREATE INDEX IF NOT EXISTS idx_index_outbox_created_at ON index_outbox (created_at);
+
+-- Only the triggers below (as the table owner) and the service key touch
+-- the outbox; with no policies, anon and authenticated clients see nothing
+-- and cannot insert or delete change rows
+ALTER TABLE index_outbox ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION index_outbox_video_embeddings()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO index_outbox (video_id, model, op) VALUES (OLD.video_id, OLD.model, 'remove');
+        RETURN OLD;
+    END IF;
+    INSERT INTO index_outbox (video_id, model, op) VALUES (NEW.video_id, NEW.model, 'add');
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_index_outbox_video_embeddings ON video_embeddings;
+CREATE TRIGGER trg_index_outbox_video_embeddings
+    AFTER INSERT OR DELETE OR UPDATE OF embedding ON video_embeddings
+    FOR EACH ROW EXECUTE FUNCTION index_outbox_video_embeddings();
+
+-- Soft deletes remove the video from the index; restores add its vectors back
+CREATE OR REPLACE FUNCTION index_outbox_videos()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF OLD.deleted_at IS NULL AND NEW.deleted_at IS NOT NULL THEN
+        INSERT INTO index_outbox (video_id, model, op) VALUES (NEW.id, NULL, 'remove');
+    ELSIF OLD.deleted_at IS NOT NULL AND NEW.deleted_at IS NULL THEN
+        INSERT INTO index_outbox (video_id, model, op)
+        SELECT video_id, model, 'add' FROM video_embeddings WHERE video_id = NEW.id;
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_index_outbox_videos ON videos;
+CREATE TRIGGER trg_index_outbox_videos
+    AFTER UPDATE OF deleted_at ON videos
+    FOR EACH ROW EXECUTE FUNCTION index_outbox_videos();
@@ -0,0 +1,29 @@
+-- k-NN search over video_analysis.embedding for VECTOR_BACKEND=pgvector.
+-- Uses the idx_embedding ivfflat index (vector_cosine_ops) and applies the
+-- user and soft-delete filters inside Postgres.
+CREATE OR REPLACE FUNCTION match_videos(
+    query_embedding vector,
+    match_count INTEGER DEFAULT 50,
+    filter_user_id UUID DEFAULT NULL,
+    probes INTEGER DEFAULT 10
+)
+RETURNS TABLE (video_id UUID, similarity DOUBLE PRECISION)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- More probes trade latency for recall; filtered rows are removed after
+    -- the index scan, so a selective user filter needs enough lists probed
+    PERFORM set_config('ivfflat.probes', probes::TEXT, true);
+
+    RETURN QUERY
+    SELECT va.video_id, 1 - (va.embedding <=> query_embedding) AS similarity
+    FROM video_analysis va
+    JOIN videos v ON v.id = va.video_id
+    WHERE va.embedding IS NOT NULL
+    AND va.deleted_at IS NULL
+    AND v.deleted_at IS NULL
+    AND (filter_user_id IS NULL OR v.user_id = filter_user_id)
+    ORDER BY va.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
@@ -0,0 +1,237 @@
+-- Versioned video embeddings.
+--
+-- Every vector is stored with the tag of the model and pipeline version that
+-- produced it ("all-MiniLM-L6-v2@v1"), so several models can live side by
+-- side while the corpus is re-embedded. embedding_models records each tag's
+-- dimension, its migration checkpoint and which tag searches use; flipping
+-- the active tag is a single transaction (activate_embedding_model).
+
+-- video_analysis.embedding was declared vector(1536) while the app embeds
+-- with a 384-d model, so no vector from it could ever be stored there
+DROP INDEX IF EXISTS idx_embedding;
+ALTER TABLE video_analysis
+    ALTER COLUMN embedding TYPE vector(384)
+    USING CASE WHEN vector_dims(embedding) = 384 THEN embedding::vector(384) END;
+
+CREATE TABLE IF NOT EXISTS embedding_models (
+    tag TEXT PRIMARY KEY,
+    dimension INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'migrating' CHECK (status IN ('migrating', 'active', 'retired')),
+    checkpoint UUID,  -- last video_analysis.id re-embedded by the migration job
+    embedded INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    activated_at TIMESTAMP WITH TIME ZONE
+);
+
+-- At most one tag serves searches
+CREATE UNIQUE INDEX IF NOT EXISTS idx_embedding_models_active
+    ON embedding_models (status) WHERE status = 'active';
+
+CREATE TABLE IF NOT EXISTS video_embeddings (
+    id BIGSERIAL PRIMARY KEY,
+    video_id UUID REFERENCES videos(id) ON DELETE CASCADE,
+    model TEXT NOT NULL REFERENCES embedding_models(tag),
+    embedding vector NOT NULL,  -- dimension varies by model, see embedding_models
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (video_id, model)
+);
+
+-- Keyset pagination of one model's vectors (index rebuilds, coverage counts)
+CREATE INDEX IF NOT EXISTS idx_video_embeddings_model_id ON video_embeddings (model, id);
+
+-- Videos a migration could not embed under a tag (no title, summary or
+-- transcript text); they count as covered so the tag can still activate
+CREATE TABLE IF NOT EXISTS embedding_skips (
+    video_id UUID REFERENCES videos(id) ON DELETE CASCADE,
+    model TEXT NOT NULL REFERENCES embedding_models(tag),
+    reason TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (video_id, model)
+);
+
+-- Vectors are written and the catalog is changed with the service key only;
+-- users can read their own vectors and the catalog
+ALTER TABLE embedding_models ENABLE ROW LEVEL SECURITY;
+ALTER TABLE video_embeddings ENABLE ROW LEVEL SECURITY;
+ALTER TABLE embedding_skips ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view embedding models" ON embedding_models;
+DROP POLICY IF EXISTS "Users can view own video embeddings" ON video_embeddings;
+
+CREATE POLICY "Users can view embedding models"
+  ON embedding_models FOR SELECT
+  TO authenticated
+  USING (true);
+
+CREATE POLICY "Users can view own video embeddings"
+  ON video_embeddings FOR SELECT
+  USING (EXISTS (
+    SELECT 1 FROM videos
+    WHERE videos.id = video_embeddings.video_id
+    AND videos.user_id = auth.uid()
+  ));
+
+-- Register a tag; existing tags are left as they are
+CREATE OR REPLACE FUNCTION register_embedding_model(
+    model_tag TEXT,
+    model_dimension INTEGER,
+    initial_status TEXT DEFAULT 'migrating'
+)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO embedding_models (tag, dimension, status)
+    VALUES (model_tag, model_dimension, initial_status)
+    ON CONFLICT (tag) DO NOTHING;
+END;
+$$;
+
+-- Build the tag's ivfflat index over its (now complete) vectors and make it
+-- the active tag in one transaction; the previous active tag is retired but
+-- its vectors are kept until deleted by hand
+CREATE OR REPLACE FUNCTION activate_embedding_model(model_tag TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    model_dimension INTEGER;
+BEGIN
+    SELECT dimension INTO model_dimension FROM embedding_models WHERE tag = model_tag FOR UPDATE;
+    IF model_dimension IS NULL THEN
+        RAISE EXCEPTION 'Unknown embedding model %', model_tag;
+    END IF;
+
+    EXECUTE format(
+        'CREATE INDEX IF NOT EXISTS %I ON video_embeddings USING ivfflat ((embedding::vector(%s)) vector_cosine_ops) WHERE model = %L',
+        'idx_video_embeddings_' || md5(model_tag), model_dimension, model_tag
+    );
+
+    UPDATE embedding_models SET status = 'retired' WHERE status = 'active' AND tag <> model_tag;
+    UPDATE embedding_models SET status = 'active', activated_at = CURRENT_TIMESTAMP WHERE tag = model_tag;
+END;
+$$;
+
+-- How much of the live corpus a tag covers: distinct analysed live videos
+-- with a vector or a recorded skip under it, out of all of them, plus a
+-- sample of the ones still missing
+CREATE OR REPLACE FUNCTION embedding_coverage(model_tag TEXT, sample_size INTEGER DEFAULT 20)
+RETURNS TABLE (covered BIGINT, total BIGINT, missing UUID[])
+LANGUAGE sql
+STABLE
+AS $$
+    WITH live AS (
+        SELECT DISTINCT va.video_id
+        FROM video_analysis va
+        JOIN videos v ON v.id = va.video_id
+        WHERE va.deleted_at IS NULL AND v.deleted_at IS NULL
+    ),
+    status AS (
+        SELECT live.video_id,
+            EXISTS (SELECT 1 FROM video_embeddings ve WHERE ve.video_id = live.video_id AND ve.model = model_tag)
+            OR EXISTS (SELECT 1 FROM embedding_skips es WHERE es.video_id = live.video_id AND es.model = model_tag)
+            AS done
+        FROM live
+    )
+    SELECT
+        COUNT(*) FILTER (WHERE done),
+        COUNT(*),
+        (ARRAY_AGG(video_id) FILTER (WHERE NOT done))[1:sample_size]
+    FROM status;
+$$;
+
+-- Catalog changes and index builds are for the backend (service role) only
+REVOKE EXECUTE ON FUNCTION register_embedding_model(TEXT, INTEGER, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION activate_embedding_model(TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION embedding_coverage(TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+
+-- Bootstrap the current model and carry over any vectors already stored
+SELECT register_embedding_model('all-MiniLM-L6-v2@v1', 384, 'migrating');
+INSERT INTO video_embeddings (video_id, model, embedding)
+SELECT video_id, 'all-MiniLM-L6-v2@v1', embedding
+FROM video_analysis
+WHERE embedding IS NOT NULL AND video_id IS NOT NULL
+ON CONFLICT (video_id, model) DO NOTHING;
+SELECT activate_embedding_model('all-MiniLM-L6-v2@v1');
+
+-- k-NN search for VECTOR_BACKEND=pgvector, now over video_embeddings.
+-- filter_model defaults to the active tag; the query has to come from the
+-- same model. max_similarity keeps only rows at or below a score, so cursor
+-- paging fetches the next window of the ranking instead of re-reading the
+-- pages before it. Replaces the version in add_match_videos.sql.
+DROP FUNCTION IF EXISTS match_videos(vector, INTEGER, UUID, INTEGER);
+DROP FUNCTION IF EXISTS match_videos(vector, INTEGER, UUID, INTEGER, TEXT);
+CREATE OR REPLACE FUNCTION match_videos(
+    query_embedding vector,
+    match_count INTEGER DEFAULT 50,
+    filter_user_id UUID DEFAULT NULL,
+    probes INTEGER DEFAULT 10,
+    filter_model TEXT DEFAULT NULL,
+    max_similarity DOUBLE PRECISION DEFAULT NULL
+)
+RETURNS TABLE (video_id UUID, similarity DOUBLE PRECISION)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    model_tag TEXT;
+    model_dimension INTEGER;
+BEGIN
+    SELECT tag, dimension INTO model_tag, model_dimension
+    FROM embedding_models
+    WHERE (filter_model IS NOT NULL AND tag = filter_model)
+    OR (filter_model IS NULL AND status = 'active');
+    IF model_tag IS NULL THEN
+        RETURN;
+    END IF;
+
+    PERFORM set_config('ivfflat.probes', probes::TEXT, true);
+
+    -- The cast to the tag's dimension matches the partial index expression
+    RETURN QUERY EXECUTE format(
+        'SELECT ve.video_id, 1 - ((ve.embedding::vector(%1$s)) <=> $1::vector(%1$s)) AS similarity
+         FROM video_embeddings ve
+         JOIN videos v ON v.id = ve.video_id
+         WHERE ve.model = $2
+         AND v.deleted_at IS NULL
+         AND ($3::UUID IS NULL OR v.user_id = $3)
+         AND ($5::DOUBLE PRECISION IS NULL OR 1 - ((ve.embedding::vector(%1$s)) <=> $1::vector(%1$s)) <= $5)
+         ORDER BY (ve.embedding::vector(%1$s)) <=> $1::vector(%1$s)
+         LIMIT $4',
+        model_dimension
+    )
+    USING query_embedding, model_tag, filter_user_id, match_count, max_similarity;
+END;
+$$;
+
+-- Exact similarity of a query to specific videos (text matches that the
+-- k-NN window did not return still need their vector score)
+CREATE OR REPLACE FUNCTION video_similarities(
+    query_embedding vector,
+    video_ids UUID[],
+    filter_model TEXT DEFAULT NULL
+)
+RETURNS TABLE (video_id UUID, similarity DOUBLE PRECISION)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    model_tag TEXT;
+    model_dimension INTEGER;
+BEGIN
+    SELECT tag, dimension INTO model_tag, model_dimension
+    FROM embedding_models
+    WHERE (filter_model IS NOT NULL AND tag = filter_model)
+    OR (filter_model IS NULL AND status = 'active');
+    IF model_tag IS NULL THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY EXECUTE format(
+        'SELECT ve.video_id, 1 - ((ve.embedding::vector(%1$s)) <=> $1::vector(%1$s)) AS similarity
+         FROM video_embeddings ve
+         WHERE ve.model = $2
+         AND ve.video_id = ANY($3)',
+        model_dimension
+    )
+    USING query_embedding, model_tag, video_ids;
+END;
+$$;
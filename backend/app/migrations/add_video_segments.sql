@@ -0,0 +1,54 @@
+-- Timestamped segments of a video (one per analysed frame and per transcript
+-- sentence window) with their own embeddings, so search can point at the
+-- moment inside a video. Rows are replaced whenever a video is re-processed.
+CREATE TABLE IF NOT EXISTS video_segments (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    video_id UUID NOT NULL REFERENCES videos(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL CHECK (kind IN ('frame', 'transcript')),
+    start_seconds REAL NOT NULL,
+    end_seconds REAL,
+    text TEXT NOT NULL,
+    embedding vector(384),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_video_segments_video_id ON video_segments(video_id);
+
+ALTER TABLE video_segments ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own video segments" ON video_segments;
+CREATE POLICY "Users can view own video segments"
+  ON video_segments FOR SELECT
+  USING (EXISTS (
+    SELECT 1 FROM videos
+    WHERE videos.id = video_segments.video_id
+    AND videos.user_id = auth.uid()
+    AND videos.deleted_at IS NULL
+  ));
+
+-- Segments are written with the service key only. A re-processed video's
+-- rows are swapped in one transaction, so a failed write never leaves the
+-- video without segments.
+CREATE OR REPLACE FUNCTION replace_video_segments(target_video_id UUID, segments JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    inserted INTEGER;
+BEGIN
+    DELETE FROM video_segments WHERE video_id = target_video_id;
+    INSERT INTO video_segments (video_id, kind, start_seconds, end_seconds, text, embedding)
+    SELECT target_video_id, s.kind, s.start_seconds, s.end_seconds, s.text, s.embedding
+    FROM jsonb_to_recordset(segments) AS s(
+        kind TEXT,
+        start_seconds REAL,
+        end_seconds REAL,
+        text TEXT,
+        embedding vector(384)
+    );
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    RETURN inserted;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION replace_video_segments(UUID, JSONB) FROM PUBLIC, anon, authenticated;
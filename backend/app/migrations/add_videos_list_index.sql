@@ -0,0 +1,9 @@
+-- Index behind the video list (GET /videos).
+--
+-- The list is ordered newest first with the id as tie-breaker and paged by
+-- keyset: each page continues after the (created_at, id) of the previous
+-- page's last video, so it is one range scan of this index whatever the
+-- page number, instead of reading and discarding every row before an offset.
+
+CREATE INDEX IF NOT EXISTS idx_videos_user_created
+    ON videos (user_id, created_at DESC, id DESC);
@@ -19,6 +19,25 @@ class VideoLinkResponse(BaseModel):
     platform: Platform
     status: str = "processing"
 
+class VideoBulkCreate(BaseModel):
+    """Schema for importing many video links at once (playlists, share-sheet batches)"""
+    urls: List[str] = Field(..., min_length=1)
+    platform: Optional[Platform] = Field(default=Platform.UNKNOWN)
+
+class VideoBulkResult(BaseModel):
+    """Outcome of one URL of a bulk import"""
+    url: str
+    status: str  # pending (created), duplicate or invalid
+    id: Optional[str] = None
+    platform: Optional[Platform] = None
+    error: Optional[str] = None
+
+class VideoBulkResponse(BaseModel):
+    results: List[VideoBulkResult]
+    created: int
+    duplicates: int
+    invalid: int
+
 class VideoProcessRequest(BaseModel):
     """Schema for video processing request"""
     video_id: str
@@ -1,6 +1,8 @@
 import os
 import sys
+import asyncio
 import logging
+from typing import Coroutine, Set
 from fastapi import FastAPI, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -25,6 +27,24 @@ if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
     logger.debug(f"Added {parent_dir} to sys.path")
 
+from app.core.registry import registry
+
+# Startup work and long-running loops; the event loop only keeps weak
+# references to tasks, so they are held here until they finish
+background_tasks: Set[asyncio.Task] = set()
+
+def _background_task_done(task: asyncio.Task):
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"❌ Background task {task.get_name()} failed", exc_info=task.exception())
+
+def start_background_task(coroutine: Coroutine) -> asyncio.Task:
+    """Run a coroutine in the background, logging it if it fails."""
+    task = asyncio.create_task(coroutine, name=coroutine.__qualname__)
+    background_tasks.add(task)
+    task.add_done_callback(_background_task_done)
+    return task
+
 try:
     logger.debug("Attempting to import FastAPI...")
     from fastapi import FastAPI
@@ -38,8 +58,12 @@ try:
     from app.api.endpoints import videos
     logger.debug("api modules imported")
     from app.services.vector_store import vector_store
+    from app.services.index_updater import index_updater
     logger.debug("vector_store imported")
-    from app.database import supabase  # Updated import
+    from app.services.query_embedding import query_embedding_service
+    from app.services.search_indexer import search_indexer
+    from app.database import db
+    from app.utils.cursor import check_secret
 
     import subprocess
 
@@ -77,6 +101,7 @@ try:
 
     app.include_router(search.router, tags=["search"])
     logger.debug("All routers included")
+    registry.mark("app_imported")
 
     def check_ffmpeg():
         try:
@@ -90,24 +115,78 @@ try:
     async def initialize_vector_store():
         """Initialize the vector store in the background."""
         try:
-            await vector_store.initialize()
+            await index_updater.rebuild()
             logger.info("✅ Vector store initialized")
         except Exception as e:
             logger.error(f"❌ Vector store initialization error: {e}")
+        if index_updater.enabled:
+            # Standalone workers own their index and apply new embeddings themselves
+            start_background_task(index_updater.run())
+
+    async def build_search_indexes():
+        """Build the in-process lexical search indexes in the background."""
+        try:
+            await search_indexer.rebuild()
+            logger.info("✅ Search indexes built")
+        except Exception as e:
+            logger.error(f"❌ Search index build error: {e}")
+
+    async def warm_up_query_embeddings():
+        """Load the query embedding model before the first search needs it."""
+        try:
+            await query_embedding_service.warm_up()
+            logger.info("✅ Query embedding model ready")
+        except Exception as e:
+            logger.error(f"❌ Query embedding warm-up error: {e}")
+
+    async def preload_services(names):
+        """Build the heavy services this process's role needs before first use."""
+        loaded = await asyncio.to_thread(registry.preload, names)
+        registry.mark("services_preloaded")
+        logger.info(f"✅ Preloaded services: {', '.join(loaded) or 'none'}")
 
     @app.on_event("startup")
     async def startup_event():
         """Initialize services on app startup."""
+        # Paging cursors are signed; refuse to serve with a key anyone could guess
+        check_secret(settings.SEARCH_CURSOR_SECRET)
         check_ffmpeg()
-        # Start vector store initialization in the background
-        background_tasks = BackgroundTasks()
-        background_tasks.add_task(initialize_vector_store)
+        preload = [name.strip() for name in settings.SERVICE_PRELOAD.split(",") if name.strip()]
+        if "embedding_model" in preload:
+            # Warming up also runs one encode, so the first query is not cold
+            preload.remove("embedding_model")
+            start_background_task(warm_up_query_embeddings())
+        if preload:
+            start_background_task(preload_services(preload))
+        # Start vector store initialization in the background; readers load
+        # the index builder's latest generation instead of building their own
+        start_background_task(initialize_vector_store())
+        start_background_task(build_search_indexes())
+        registry.mark("startup_complete")
+        stats = registry.stats()
+        logger.info(
+            f"✅ Started in {stats['events']['startup_complete']:.2f}s, "
+            f"peak RSS {stats['peak_rss_mb']} MB; lazy services: {', '.join(stats['not_loaded'])}"
+        )
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        """Stop background tasks and close the pooled database connections."""
+        for task in list(background_tasks):
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        await db.aclose()
 
     @app.get("/")
     async def root():
         """Quick health check endpoint."""
         return {"status": "healthy", "message": "Welcome to VidFold API"}
 
+    @app.get(f"{settings.API_V1_STR}/health/startup")
+    async def startup_report():
+        """Startup milestones, service load times and peak memory of this process."""
+        return registry.stats()
+
     logger.debug("Server setup completed successfully")
 
 except Exception as e:
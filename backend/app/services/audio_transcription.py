@@ -3,6 +3,7 @@ from typing import Dict, Any
 import base64
 import io
 from ..core.config import settings
+from ..core.registry import registry
 from .browser_service import browser_service
 
 logger = logging.getLogger(__name__)
@@ -96,4 +97,4 @@ class AudioTranscriptionService:
             raise
 
 # Initialize the audio transcription service
-audio_transcription_service = AudioTranscriptionService() 
\ No newline at end of file
+audio_transcription_service = registry.lazy("audio_transcription", AudioTranscriptionService) 
\ No newline at end of file
@@ -0,0 +1,110 @@
+import heapq
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, List, Any
+from .lexical_index import tokenize
+
+class _UserTerms:
+    """One user's completion vocabulary: a sorted term array plus frequencies."""
+    def __init__(self):
+        self.terms: List[str] = []  # sorted, for prefix ranges
+        self.frequency: Dict[str, int] = {}
+        self.contributions: Dict[str, Counter] = {}  # video ID -> terms it added
+
+    def add(self, video_id: str, terms: Counter):
+        self.remove(video_id)
+        self.contributions[video_id] = terms
+        for term, count in terms.items():
+            if term not in self.frequency:
+                insort(self.terms, term)
+                self.frequency[term] = 0
+            self.frequency[term] += count
+
+    def remove(self, video_id: str):
+        terms = self.contributions.pop(video_id, None)
+        if not terms:
+            return
+        for term, count in terms.items():
+            remaining = self.frequency[term] - count
+            if remaining > 0:
+                self.frequency[term] = remaining
+            else:
+                del self.frequency[term]
+                del self.terms[bisect_left(self.terms, term)]
+
+    def complete(self, prefix: str, limit: int) -> List[str]:
+        start = bisect_left(self.terms, prefix)
+        end = bisect_left(self.terms, prefix + "\uffff", start)
+        if start == end:
+            return []
+        return heapq.nlargest(limit, self.terms[start:end], key=self.frequency.__getitem__)
+
+class AutocompleteIndex:
+    """
+    Per-user prefix completion over titles, keywords and detected object labels.
+
+    Each user's vocabulary is a sorted array (prefix lookups are two binary
+    searches) with term frequencies for ranking. It is maintained
+    incrementally by SearchIndexer, so suggestions never touch Supabase or
+    the embedding model.
+    """
+    def __init__(self):
+        self.users: Dict[str, _UserTerms] = {}
+
+    @staticmethod
+    def _terms(document: Dict[str, Any]) -> Counter:
+        terms = Counter(tokenize(document["title"]))
+        # Keywords and labels are also suggested whole, e.g. "golden retriever"
+        for phrase in document["keywords"] + document["object_labels"]:
+            phrase = " ".join(tokenize(phrase))
+            if phrase:
+                terms[phrase] += 1
+                if " " in phrase:
+                    terms.update(phrase.split())
+        return terms
+
+    def add_document(self, document: Dict[str, Any]):
+        self.users.setdefault(document["user_id"], _UserTerms()).add(
+            document["id"], self._terms(document)
+        )
+
+    def remove_document(self, user_id: str, video_id: str):
+        terms = self.users.get(user_id)
+        if terms is not None:
+            terms.remove(video_id)
+            if not terms.contributions:
+                del self.users[user_id]
+
+    def clear(self):
+        self.users = {}
+
+    def suggest(self, user_id: str, prefix: str, limit: int = 8) -> List[str]:
+        """
+        Complete what the user has typed so far.
+
+        Args:
+            user_id: ID of the user typing
+            prefix: Text typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            Suggestions, most frequent first. If the whole text is not a known
+            prefix, the last word is completed and the earlier words are kept.
+        """
+        terms = self.users.get(user_id)
+        words = tokenize(prefix)
+        if terms is None or not words:
+            return []
+        typed = " ".join(words)
+        suggestions = terms.complete(typed, limit)
+        if len(suggestions) < limit and len(words) > 1:
+            head = " ".join(words[:-1])
+            for term in terms.complete(words[-1], limit):
+                suggestion = f"{head} {term}"
+                if suggestion not in suggestions:
+                    suggestions.append(suggestion)
+                    if len(suggestions) == limit:
+                        break
+        return suggestions
+
+autocomplete_index = AutocompleteIndex()
@@ -3,12 +3,15 @@ Browser service for handling browser operations
 """
 import logging
 import base64
-from typing import List, Dict, Any, Optional
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 import asyncio
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
+from ..core.registry import registry
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
 
 load_dotenv()
 
@@ -39,6 +42,8 @@ class BrowserService:
         async with self._lock:
             if self.browser is None:
                 try:
+                    # Imported on first use so processes without a browser skip Playwright
+                    from playwright.async_api import async_playwright
                     self.playwright = await async_playwright().start()
                     self.browser = await self.playwright.chromium.launch(
                         headless=True,
@@ -97,7 +102,7 @@ class BrowserService:
             except Exception as e:
                 logger.error(f"Error cleaning up browser service: {str(e)}")
 
-    async def _get_page(self) -> Page:
+    async def _get_page(self) -> "Page":
         """Get a new page and track it"""
         if not self.context:
             await self.initialize()
@@ -106,7 +111,7 @@ class BrowserService:
         self._last_activity = datetime.now()
         return page
 
-    async def _release_page(self, page: Page):
+    async def _release_page(self, page: "Page"):
         """Release a page and remove it from tracking"""
         try:
             await page.close()
@@ -356,4 +361,4 @@ class BrowserService:
                 await self._release_page(page)
 
 # Create a singleton instance
-browser_service = BrowserService() 
\ No newline at end of file
+browser_service = registry.lazy("browser", BrowserService) 
\ No newline at end of file
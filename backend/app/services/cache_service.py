@@ -1,14 +1,15 @@
-import redis
 import json
 import os
 from dotenv import load_dotenv
 from typing import Optional, Any
 import logging
+from ..core.registry import registry
 
 load_dotenv()
 
 class CacheService:
     def __init__(self):
+        import redis
         self.redis_client = redis.Redis(
             host=os.getenv('UPSTASH_REDIS_HOST'),
             port=int(os.getenv('UPSTASH_REDIS_PORT', 6379)),
@@ -63,4 +64,4 @@ class CacheService:
         return f"video_metadata:{platform}:{video_id}"
 
 # Initialize cache service
-cache_service = CacheService() 
\ No newline at end of file
+cache_service = registry.lazy("cache", CacheService) 
\ No newline at end of file
@@ -0,0 +1,185 @@
+import asyncio
+import numpy as np
+from typing import Dict, List, Any, Optional
+from ..core.config import settings
+from ..utils.embeddings import get_embeddings
+from .segment_index import transcript_segments, parse_duration
+import logging
+
+logger = logging.getLogger(__name__)
+
+POOLING = ("mean", "max")
+
+def _timed_words(transcription: Any, duration: Any) -> List[tuple]:
+    """
+    Transcript words with an estimated start and end second each.
+
+    Times are interpolated within each timed segment. A transcript stored as
+    plain text has no timing, so its words get None.
+    """
+    if isinstance(transcription, str):
+        return [(word, None, None) for word in transcription.split()]
+    words = []
+    for segment in transcript_segments(transcription, parse_duration(duration)):
+        tokens = segment["text"].split()
+        if not tokens:
+            continue
+        start = segment["start_seconds"]
+        end = segment["end_seconds"] if segment["end_seconds"] is not None else start
+        step = (end - start) / len(tokens)
+        words.extend(
+            (token, round(start + i * step, 1), round(start + (i + 1) * step, 1))
+            for i, token in enumerate(tokens)
+        )
+    return words
+
+def window_starts(count: int, size: int, overlap: int, limit: int) -> List[int]:
+    """
+    Start offsets of overlapping windows over `count` words.
+
+    Consecutive windows share `overlap` words. When that would need more than
+    `limit` windows, the starts are spread evenly over the text instead, so
+    the whole document is still sampled at a bounded cost.
+    """
+    if count <= 0 or limit <= 0:
+        return []
+    if count <= size:
+        return [0]
+    stride = max(1, size - overlap)
+    last = count - size
+    starts = list(range(0, last + 1, stride))
+    if starts[-1] != last:
+        starts.append(last)  # cover the tail
+    if len(starts) > limit:
+        starts = sorted(set(np.linspace(0, last, limit).round().astype(int).tolist()))
+    return starts
+
+def build_windows(
+    search_summary: str,
+    transcription: Any,
+    duration: Any,
+    size: int,
+    overlap: int,
+    max_windows: int
+) -> List[Dict[str, Any]]:
+    """
+    Split a video's summary and transcript into overlapping text windows.
+
+    Args:
+        search_summary: Title, description and visual summary text
+        transcription: Result of transcribe_video, or a stored plain-text transcript
+        duration: Video duration in seconds or as an ISO 8601 duration
+        size: Words per window, kept under the model's input limit
+        overlap: Words shared by consecutive windows
+        max_windows: Cap per video; the summary gets at most a quarter of it
+
+    Returns:
+        Windows with kind ("summary" or "transcript"), start_seconds,
+        end_seconds (None when untimed) and text
+    """
+    windows = []
+    summary = (search_summary or "").split()
+    for start in window_starts(len(summary), size, overlap, max(1, max_windows // 4)):
+        windows.append({
+            "kind": "summary",
+            "start_seconds": None,
+            "end_seconds": None,
+            "text": " ".join(summary[start:start + size])
+        })
+
+    words = _timed_words(transcription, duration)
+    for start in window_starts(len(words), size, overlap, max_windows - len(windows)):
+        window = words[start:start + size]
+        windows.append({
+            "kind": "transcript",
+            "start_seconds": window[0][1],
+            "end_seconds": window[-1][2],
+            "text": " ".join(word for word, _, _ in window)
+        })
+    return windows
+
+def summary_text(title: Optional[str], metadata: Optional[Dict[str, Any]]) -> str:
+    """Summary text a video is embedded with: its title and description."""
+    return f"{title or ''}. {(metadata or {}).get('description') or ''}"
+
+def pool(vectors: np.ndarray, method: str = "mean") -> np.ndarray:
+    """
+    Pool window vectors into one normalized document vector.
+
+    Args:
+        vectors: Normalized window embeddings, shape (windows, dimension)
+        method: "mean" (topic centroid) or "max" (per-dimension maximum, keeps
+            signals that appear in only one part of the video)
+
+    Returns:
+        Unit-length vector of shape (dimension,)
+    """
+    if method not in POOLING:
+        raise ValueError(f"Unknown pooling method: {method}")
+    pooled = vectors.max(axis=0) if method == "max" else vectors.mean(axis=0)
+    return (pooled / max(float(np.linalg.norm(pooled)), 1e-12)).astype(np.float32)
+
+class DocumentEmbedder:
+    """
+    Embeds a whole video document rather than its first few hundred words.
+
+    The sentence model truncates its input at 256 word pieces, so a single
+    encode of a transcript only represents its opening. The summary and the
+    transcript are instead split into overlapping windows that fit the model,
+    encoded in one batched call, and pooled into the video vector. Windows
+    per video are capped, so cost is bounded however long the video is.
+    """
+    def __init__(self):
+        self.window_words = settings.DOCUMENT_WINDOW_WORDS
+        self.overlap_words = settings.DOCUMENT_WINDOW_OVERLAP
+        self.max_windows = settings.DOCUMENT_MAX_WINDOWS
+        self.pooling = settings.DOCUMENT_POOLING
+
+    def embed(
+        self,
+        search_summary: str,
+        transcription: Any,
+        duration: Any = None,
+        model: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Window, encode and pool a video document.
+
+        Args:
+            search_summary: Title, description and visual summary text
+            transcription: Result of transcribe_video, or a stored plain-text transcript
+            duration: Video duration in seconds or as an ISO 8601 duration
+            model: Model name (defaults to EMBEDDING_MODEL)
+
+        Returns:
+            Dictionary with the pooled "embedding", the "windows" and their
+            "vectors" (one row per window), or None if there is no text
+        """
+        windows = build_windows(
+            search_summary,
+            transcription,
+            duration,
+            self.window_words,
+            self.overlap_words,
+            self.max_windows
+        )
+        if not windows:
+            return None
+        vectors = get_embeddings([window["text"] for window in windows], model).astype(np.float32)
+        return {
+            "embedding": pool(vectors, self.pooling),
+            "windows": windows,
+            "vectors": vectors
+        }
+
+    async def embed_video(
+        self,
+        search_summary: str,
+        transcription: Any,
+        duration: Any = None,
+        model: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Run embed() off the event loop."""
+        return await asyncio.to_thread(self.embed, search_summary, transcription, duration, model)
+
+document_embedder = DocumentEmbedder()
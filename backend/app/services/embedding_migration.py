@@ -0,0 +1,134 @@
+import asyncio
+import json
+import time
+from typing import Dict, Any, Optional
+from ..database import admin_db
+from ..core.config import settings
+from ..utils.embeddings import parse_tag, embedding_dimension
+from .document_embedding import document_embedder, summary_text
+from .embedding_store import embedding_store
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _transcription(value: Any) -> Any:
+    """audio_transcription as stored: a JSON object serialized to text, or plain text."""
+    if isinstance(value, str) and value.startswith("{"):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+class EmbeddingMigration:
+    """
+    Re-embeds the corpus under a new model tag in the background.
+
+    Videos are walked in video_analysis.id order at EMBEDDING_MIGRATION_RATE
+    videos per second, and the position is checkpointed in embedding_models
+    after every page, so a restarted job resumes where it stopped. Videos
+    processed meanwhile are embedded with the target tag at ingest. Videos
+    without any text to embed are recorded in embedding_skips. Once every
+    live video has a vector or a skip under the tag, the tag is activated and
+    the index builder publishes a generation built from it; videos that keep
+    failing are retried for EMBEDDING_MIGRATION_MAX_SWEEPS sweeps, after which
+    the job stops and leaves the tag migrating.
+    """
+    def __init__(self):
+        self.rate = settings.EMBEDDING_MIGRATION_RATE
+        self.batch_size = settings.EMBEDDING_MIGRATION_BATCH
+        self.max_sweeps = settings.EMBEDDING_MIGRATION_MAX_SWEEPS
+        self.sweep_pause = 60  # seconds between coverage sweeps
+
+    async def run(self, tag: str) -> bool:
+        """
+        Migrate to `tag` until it covers the corpus, then activate it.
+
+        Returns:
+            True once the tag is active, False if videos are still missing
+            after the last sweep
+        """
+        model, _ = parse_tag(tag)
+        state = await embedding_store.model(tag)
+        if state is None:
+            dimension = await asyncio.to_thread(embedding_dimension, model)
+            await embedding_store.register(tag, dimension)
+            state = await embedding_store.model(tag)
+        if state["status"] == "active":
+            return True
+
+        checkpoint = state.get("checkpoint")
+        embedded = state.get("embedded") or 0
+        logger.info(f"Migrating embeddings to {tag} from checkpoint {checkpoint} ({embedded} embedded)")
+        sweeps = 0
+        while True:
+            checkpoint, embedded, done = await self._page(tag, model, checkpoint, embedded)
+            await embedding_store.save_checkpoint(tag, checkpoint, embedded)
+            if not done:
+                continue
+
+            covered, total, missing = await embedding_store.coverage(tag)
+            logger.info(f"Embedding migration to {tag}: {covered}/{total} videos covered")
+            if covered >= total:
+                await embedding_store.activate(tag)
+                return True
+            sweeps += 1
+            if sweeps > self.max_sweeps:
+                logger.error(
+                    f"Embedding migration to {tag} stopped after {sweeps} sweeps with "
+                    f"{total - covered} videos missing, e.g. {', '.join(missing)}"
+                )
+                return False
+            # Videos were missed (e.g. failed pages); sweep again from the start,
+            # skipping the ones that already have a vector
+            logger.warning(f"Embedding migration to {tag}: still missing e.g. {', '.join(missing)}; sweeping again")
+            checkpoint = None
+            await asyncio.sleep(self.sweep_pause)
+
+    async def _page(self, tag: str, model: str, checkpoint: Optional[str], embedded: int):
+        """Re-embed one page of videos after `checkpoint`; returns (checkpoint, embedded, done)."""
+        query = (
+            admin_db.table("video_analysis")
+            .select("id,video_id,audio_transcription,metadata,videos!inner(title,duration)")
+            .is_("deleted_at", "null")
+            .is_("videos.deleted_at", "null")
+        )
+        if checkpoint is not None:
+            query = query.gt("id", checkpoint)
+        result = await query.order("id").limit(self.batch_size).execute()
+        rows = result.data or []
+        if not rows:
+            return checkpoint, embedded, True
+
+        done_ids = await embedding_store.existing(tag, [str(row["video_id"]) for row in rows])
+        interval = 1 / self.rate if self.rate > 0 else 0
+        for row in rows:
+            if str(row["video_id"]) in done_ids:
+                continue
+            started = time.monotonic()
+            try:
+                await self._embed(tag, model, row)
+                embedded += 1
+            except Exception as e:
+                # Left for the coverage sweep
+                logger.error(f"Error re-embedding video {row['video_id']} with {tag}: {str(e)}")
+            # Throttle so the job does not starve ingestion of CPU and database
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+        return rows[-1]["id"], embedded, len(rows) < self.batch_size
+
+    async def _embed(self, tag: str, model: str, row: Dict[str, Any]):
+        video = row["videos"]
+        metadata = row.get("metadata") or {}
+        document = await document_embedder.embed_video(
+            summary_text(video.get("title") or metadata.get("title"), metadata),
+            _transcription(row.get("audio_transcription")),
+            video.get("duration") or metadata.get("duration"),
+            model
+        )
+        if document is None:
+            # No title, summary or transcript: nothing to embed, ever
+            await embedding_store.skip(str(row["video_id"]), tag, "no_text")
+            return
+        await embedding_store.put(str(row["video_id"]), tag, document["embedding"])
+
+embedding_migration = EmbeddingMigration()
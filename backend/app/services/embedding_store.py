@@ -0,0 +1,137 @@
+import asyncio
+import time
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple
+from ..database import admin_db
+from ..core.config import settings
+from ..utils.embeddings import model_tag
+import logging
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingStore:
+    """
+    Versioned video embeddings (video_embeddings) and their model catalog.
+
+    Each vector is stored under the tag of the model that produced it, so a
+    new model can be back-filled next to the one serving searches. The
+    catalog (embedding_models) says which tag is active; migrations are
+    registered as "migrating" until the switch. Schema in
+    app/migrations/add_video_embeddings.sql; the tables are behind row level
+    security, so every call goes through the service key.
+    """
+    def __init__(self):
+        self.refresh_seconds = settings.EMBEDDING_ACTIVE_REFRESH_SECONDS
+        self.active = model_tag()  # last known active tag
+        self._active_checked = 0.0
+
+    async def active_tag(self) -> str:
+        """Tag searches currently use, re-read at most every EMBEDDING_ACTIVE_REFRESH_SECONDS."""
+        if time.monotonic() - self._active_checked < self.refresh_seconds:
+            return self.active
+        self._active_checked = time.monotonic()
+        try:
+            result = await admin_db.table("embedding_models").select("tag").eq("status", "active").limit(1).execute()
+            if result.data:
+                self.active = result.data[0]["tag"]
+        except Exception as e:
+            logger.error(f"Error reading active embedding model: {str(e)}")
+        return self.active
+
+    async def models(self) -> List[Dict[str, Any]]:
+        """Catalog rows (tag, dimension, status, checkpoint, embedded)."""
+        result = await admin_db.table("embedding_models").select("tag,dimension,status,checkpoint,embedded").execute()
+        return result.data or []
+
+    async def model(self, tag: str) -> Optional[Dict[str, Any]]:
+        result = await (
+            admin_db.table("embedding_models")
+            .select("tag,dimension,status,checkpoint,embedded")
+            .eq("tag", tag)
+            .limit(1)
+            .execute()
+        )
+        return result.data[0] if result.data else None
+
+    async def writing_tags(self) -> List[str]:
+        """
+        Tags a newly processed video is embedded with: the active one plus
+        any being migrated to, so a migration never falls behind new uploads.
+        """
+        try:
+            rows = await self.models()
+            tags = [row["tag"] for row in rows if row["status"] in ("active", "migrating")]
+        except Exception as e:
+            logger.error(f"Error reading embedding models: {str(e)}")
+            tags = []
+        return tags or [await self.active_tag()]
+
+    async def register(self, tag: str, dimension: int):
+        """Add a tag to the catalog as "migrating" (no-op if it exists)."""
+        await (
+            admin_db.rpc("register_embedding_model", {
+                "model_tag": tag,
+                "model_dimension": dimension
+            }).execute()
+        )
+
+    async def put(self, video_id: str, tag: str, embedding: np.ndarray):
+        """Store or replace one video's vector under a tag."""
+        await (
+            admin_db.table("video_embeddings").upsert({
+                "video_id": video_id,
+                "model": tag,
+                "embedding": np.asarray(embedding, dtype=np.float32).tolist()
+            }, on_conflict="video_id,model").execute()
+        )
+
+    async def existing(self, tag: str, video_ids: List[str]) -> set:
+        """Which of the given videos already have a vector, or a recorded skip, under the tag."""
+        if not video_ids:
+            return set()
+        vectors, skips = await asyncio.gather(
+            admin_db.table("video_embeddings").select("video_id").eq("model", tag).in_("video_id", video_ids).execute(),
+            admin_db.table("embedding_skips").select("video_id").eq("model", tag).in_("video_id", video_ids).execute()
+        )
+        return {str(row["video_id"]) for row in (vectors.data or []) + (skips.data or [])}
+
+    async def skip(self, video_id: str, tag: str, reason: str):
+        """Record that a video cannot be embedded under a tag, so it counts as covered."""
+        await (
+            admin_db.table("embedding_skips").upsert({
+                "video_id": video_id,
+                "model": tag,
+                "reason": reason
+            }, on_conflict="video_id,model", ignore_duplicates=True, returning=False).execute()
+        )
+
+    async def save_checkpoint(self, tag: str, checkpoint: Optional[str], embedded: int):
+        """Persist migration progress so a restarted job resumes after `checkpoint`."""
+        await (
+            admin_db.table("embedding_models").update({
+                "checkpoint": checkpoint,
+                "embedded": embedded
+            }).eq("tag", tag).execute()
+        )
+
+    async def coverage(self, tag: str) -> Tuple[int, int, List[str]]:
+        """
+        How much of the live corpus has a vector (or a recorded skip) under the tag.
+
+        Videos are counted once however many video_analysis rows they have.
+
+        Returns:
+            Tuple of (covered live videos, analysed live videos, sample of uncovered video IDs)
+        """
+        result = await admin_db.rpc("embedding_coverage", {"model_tag": tag}).execute()
+        row = result.data[0] if result.data else {}
+        return row.get("covered") or 0, row.get("total") or 0, [str(video_id) for video_id in row.get("missing") or []]
+
+    async def activate(self, tag: str):
+        """Make a tag the one searches use, atomically, and index its vectors in Postgres."""
+        await admin_db.rpc("activate_embedding_model", {"model_tag": tag}).execute()
+        self.active = tag
+        self._active_checked = time.monotonic()
+        logger.info(f"Embedding model {tag} is now active")
+
+embedding_store = EmbeddingStore()
@@ -0,0 +1,113 @@
+import os
+import numpy as np
+from typing import Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ExactReranker:
+    """
+    Full-precision copy of every indexed vector, kept in a memory-mapped
+    float16 matrix addressed by FAISS id, used to re-score ANN candidates
+    with exact inner products.
+    """
+    def __init__(self, path: str, dimension: int):
+        self.path = path
+        self.dimension = dimension
+        self.count = 0  # number of rows written
+        self.capacity = 0  # number of rows the file can hold
+        self.vectors = None  # np.memmap of shape (capacity, dimension)
+
+    def reset(self, capacity: int = 1024):
+        """Truncate the matrix file and preallocate room for `capacity` rows."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.close()
+        self.count = 0
+        self._allocate(max(capacity, 1))
+
+    def _allocate(self, capacity: int):
+        row_bytes = self.dimension * np.dtype(np.float16).itemsize
+        with open(self.path, "ab") as f:
+            f.truncate(capacity * row_bytes)
+        self.vectors = np.memmap(
+            self.path,
+            dtype=np.float16,
+            mode="r+",
+            shape=(capacity, self.dimension)
+        )
+        self.capacity = capacity
+
+    def open_readonly(self, count: int):
+        """Map an existing matrix file of `count` rows without write access."""
+        self.close()
+        self.count = count
+        self.capacity = count
+        if count:
+            self.vectors = np.memmap(
+                self.path,
+                dtype=np.float16,
+                mode="r",
+                shape=(count, self.dimension)
+            )
+
+    def put(self, start: int, vectors: np.ndarray):
+        """
+        Write a block of vectors at rows [start, start + len(vectors)).
+
+        Args:
+            start: First row (FAISS id) to write
+            vectors: Array of shape (n, dimension)
+        """
+        end = start + len(vectors)
+        if self.vectors is None:
+            self.reset(end)
+        if end > self.capacity:
+            # Grow geometrically so appends stay amortised O(1)
+            self.vectors.flush()
+            self._allocate(max(end, self.capacity * 2))
+        self.vectors[start:end] = vectors.astype(np.float16)
+        self.count = max(self.count, end)
+
+    def flush(self):
+        if self.vectors is not None:
+            self.vectors.flush()
+
+    def close(self):
+        if self.vectors is not None:
+            self.vectors.flush()
+            self.vectors = None
+            self.capacity = 0
+
+    def rerank(
+        self,
+        query_vector: np.ndarray,
+        ids: np.ndarray,
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Re-score candidate ids with exact inner products and keep the top k.
+
+        Args:
+            query_vector: Query vector of shape (dimension,)
+            ids: Candidate FAISS ids from the ANN stage
+            k: Number of results to keep
+
+        Returns:
+            (ids, scores) sorted by descending exact score
+        """
+        ids = ids[(ids >= 0) & (ids < self.count)]
+        if self.vectors is None or len(ids) == 0:
+            return ids, np.empty(0, dtype=np.float32)
+
+        # Sorted gather keeps page faults on the memmap sequential
+        order = np.argsort(ids, kind="stable")
+        candidates = np.asarray(self.vectors[ids[order]], dtype=np.float32)
+        scores = np.empty(len(ids), dtype=np.float32)
+        scores[order] = candidates @ query_vector.astype(np.float32)
+
+        if len(ids) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(ids))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return ids[top], scores[top]
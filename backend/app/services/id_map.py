@@ -0,0 +1,175 @@
+import os
+import json
+import uuid
+import numpy as np
+from typing import List, Optional, Iterable, Dict
+
+class IdMap:
+    """
+    Maps FAISS ids (dense row numbers) to video UUIDs and their owners.
+
+    UUIDs are stored as raw 16-byte values in one NumPy array indexed by FAISS
+    id, about 16 bytes per vector instead of a Python dict entry plus a
+    36-character string. Owners are small integer codes in a parallel int32
+    array. Reverse lookups binary-search a lazily built sorted copy of the keys
+    plus a short unsorted tail of rows appended since.
+    """
+    EMPTY = b""  # S16 values read back with trailing NUL bytes stripped
+    NO_OWNER = -1
+
+    def __init__(self, capacity: int = 0):
+        self.ids = np.zeros(max(capacity, 1), dtype="S16")
+        self.owners = np.full(max(capacity, 1), self.NO_OWNER, dtype=np.int32)
+        self.owner_ids: List[str] = []  # owner code -> user ID
+        self.owner_codes: Dict[str, int] = {}  # user ID -> owner code
+        self.count = 0
+        self.cleared = 0  # tombstoned rows still present in the index
+        self._reset_reverse_index()
+
+    def _reset_reverse_index(self):
+        self._sorted_keys = np.empty(0, dtype="S16")
+        self._sorted_rows = np.empty(0, dtype=np.int64)
+        self._sorted_upto = 0  # rows [0, _sorted_upto) are covered by the sorted arrays
+        self.max_unsorted_tail = 4096
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, row: int) -> str:
+        return self._decode(self.ids[row])
+
+    def append(self, video_id: str, owner_id: Optional[str] = None) -> int:
+        """Append a video ID and return its row (FAISS id)."""
+        return int(self.extend([video_id], [owner_id])[0])
+
+    def extend(
+        self,
+        video_ids: Iterable[str],
+        owner_ids: Optional[Iterable[Optional[str]]] = None
+    ) -> np.ndarray:
+        """Append video IDs (and optionally their owners) and return their rows."""
+        encoded = np.array([uuid.UUID(str(v)).bytes for v in video_ids], dtype="S16")
+        start, end = self.count, self.count + len(encoded)
+        if end > len(self.ids):
+            capacity = max(end, 2 * len(self.ids))
+            ids = np.zeros(capacity, dtype="S16")
+            ids[:self.count] = self.ids[:self.count]
+            owners = np.full(capacity, self.NO_OWNER, dtype=np.int32)
+            owners[:self.count] = self.owners[:self.count]
+            self.ids, self.owners = ids, owners
+        self.ids[start:end] = encoded
+        if owner_ids is not None:
+            self.owners[start:end] = [self._owner_code(owner) for owner in owner_ids]
+        self.count = end
+        return np.arange(start, end, dtype=np.int64)
+
+    def _owner_code(self, owner_id: Optional[str]) -> int:
+        if owner_id is None:
+            return self.NO_OWNER
+        owner_id = str(owner_id)
+        code = self.owner_codes.get(owner_id)
+        if code is None:
+            code = self.owner_codes[owner_id] = len(self.owner_ids)
+            self.owner_ids.append(owner_id)
+        return code
+
+    def clear(self, row: int):
+        """Tombstone a row so it no longer resolves to a video."""
+        if self.ids[row] != self.EMPTY:
+            self.ids[row] = self.EMPTY
+            self.cleared += 1
+
+    def gather(self, rows: np.ndarray) -> List[Optional[str]]:
+        """Translate FAISS ids to video IDs; out-of-range or cleared rows give None."""
+        rows = np.asarray(rows, dtype=np.int64)
+        valid = (rows >= 0) & (rows < self.count)
+        raw = self.ids[np.where(valid, rows, 0)]
+        return [
+            self._decode(value) if ok and value != self.EMPTY else None
+            for value, ok in zip(raw, valid)
+        ]
+
+    def rows_for_owner(self, owner_id: str) -> np.ndarray:
+        """Live (non-tombstoned) rows belonging to owner_id."""
+        code = self.owner_codes.get(str(owner_id))
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        rows = np.flatnonzero(self.owners[:self.count] == code)
+        return rows[self.ids[rows] != self.EMPTY].astype(np.int64)
+
+    def lookup(self, video_id: str) -> Optional[int]:
+        """Return the most recent row holding video_id, or None."""
+        key = np.array([uuid.UUID(str(video_id)).bytes], dtype="S16")[0]
+        if self.count - self._sorted_upto > self.max_unsorted_tail:
+            self._sort()
+
+        # Newest rows first: a re-added video shadows its older row
+        tail = np.flatnonzero(self.ids[self._sorted_upto:self.count] == key)
+        if len(tail):
+            return int(self._sorted_upto + tail[-1])
+
+        lo = np.searchsorted(self._sorted_keys, key, side="left")
+        hi = np.searchsorted(self._sorted_keys, key, side="right")
+        # Skip rows tombstoned since the last sort
+        rows = self._sorted_rows[lo:hi]
+        rows = rows[self.ids[rows] == key]
+        if len(rows) == 0:
+            return None
+        return int(rows.max())
+
+    def lookup_many(self, video_ids: List[str]) -> np.ndarray:
+        """Vectorised lookup(): the most recent row of each video ID, -1 where unknown."""
+        keys = np.array([uuid.UUID(str(v)).bytes for v in video_ids], dtype="S16")
+        if self.count - self._sorted_upto > self.max_unsorted_tail:
+            self._sort()
+        found = self._last_rows(self._sorted_keys, self._sorted_rows, keys)
+        tail_rows = np.argsort(self.ids[self._sorted_upto:self.count], kind="stable") + self._sorted_upto
+        in_tail = self._last_rows(self.ids[tail_rows], tail_rows, keys)
+        found = np.where(in_tail >= 0, in_tail, found)
+
+        # The newest row may have been tombstoned since the last sort
+        stale = np.flatnonzero((found >= 0) & (self.ids[np.maximum(found, 0)] != keys))
+        for i in stale.tolist():
+            row = self.lookup(video_ids[i])
+            found[i] = -1 if row is None else row
+        return found
+
+    def _last_rows(self, sorted_keys: np.ndarray, sorted_rows: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        """Highest row per key in a stably sorted (key, row) listing, -1 if absent."""
+        if len(sorted_keys) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        last = np.searchsorted(sorted_keys, keys, side="right") - 1
+        clipped = np.maximum(last, 0)
+        hit = (last >= 0) & (sorted_keys[clipped] == keys)
+        return np.where(hit, sorted_rows[clipped], -1).astype(np.int64)
+
+    def _sort(self):
+        self._sorted_rows = np.argsort(self.ids[:self.count], kind="stable")
+        self._sorted_keys = self.ids[self._sorted_rows]
+        self._sorted_upto = self.count
+
+    def save(self, directory: str):
+        """Write ids.npy, owners.npy and owners.json into directory."""
+        np.save(os.path.join(directory, "ids.npy"), self.ids[:self.count])
+        np.save(os.path.join(directory, "owners.npy"), self.owners[:self.count])
+        with open(os.path.join(directory, "owners.json"), "w") as f:
+            json.dump(self.owner_ids, f)
+
+    @classmethod
+    def load(cls, directory: str) -> "IdMap":
+        """Memory-map a map written by save(); the result is read-only."""
+        id_map = cls.__new__(cls)
+        id_map.ids = np.load(os.path.join(directory, "ids.npy"), mmap_mode="r")
+        id_map.owners = np.load(os.path.join(directory, "owners.npy"), mmap_mode="r")
+        with open(os.path.join(directory, "owners.json")) as f:
+            id_map.owner_ids = json.load(f)
+        id_map.owner_codes = {owner: code for code, owner in enumerate(id_map.owner_ids)}
+        id_map.count = len(id_map.ids)
+        id_map.cleared = int(np.count_nonzero(id_map.ids == cls.EMPTY))
+        id_map._reset_reverse_index()
+        return id_map
+
+    @staticmethod
+    def _decode(value: bytes) -> str:
+        # NumPy strips trailing NUL bytes from S16 values; pad them back
+        return str(uuid.UUID(bytes=bytes(value).ljust(16, b"\0")))
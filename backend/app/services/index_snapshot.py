@@ -0,0 +1,142 @@
+import os
+import json
+import shutil
+import time
+import faiss
+import numpy as np
+from typing import Optional
+from .exact_reranker import ExactReranker
+from .id_map import IdMap
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IndexSnapshot:
+    """
+    One immutable generation of the vector index.
+
+    Searches read `vector_store.snapshot` once and use only that object, so a
+    new generation can be swapped in with a single attribute assignment and
+    readers never need a lock.
+    """
+    def __init__(
+        self,
+        generation: int,
+        index: Optional[faiss.Index],
+        id_map: IdMap,
+        reranker: ExactReranker,
+        model: Optional[str] = None
+    ):
+        self.generation = generation
+        self.index = index
+        self.id_map = id_map  # FAISS id -> video ID
+        self.reranker = reranker
+        self.model = model  # tag of the embedding model the vectors came from
+
+class SnapshotPublisher:
+    """
+    Writes index generations to `<root>/generations/<generation>/` and flips
+    the `CURRENT` pointer atomically once a generation is complete.
+    """
+    def __init__(self, root: str, keep: int = 3):
+        self.root = root
+        self.keep = keep  # generations kept on disk for readers still mapping them
+
+    def publish(self, snapshot: IndexSnapshot) -> int:
+        """
+        Publish a snapshot and return its generation number.
+
+        Runs blocking file IO; call it from a worker thread.
+        """
+        generation = time.time_ns()
+        gen_dir = os.path.join(self.root, "generations", str(generation))
+        tmp_dir = gen_dir + ".tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        count = snapshot.index.ntotal
+        faiss.write_index(snapshot.index, os.path.join(tmp_dir, "index.faiss"))
+
+        # Copy only the written rows of the float16 matrix
+        snapshot.reranker.flush()
+        row_bytes = snapshot.reranker.dimension * np.dtype(np.float16).itemsize
+        remaining = snapshot.reranker.count * row_bytes
+        with open(snapshot.reranker.path, "rb") as src, open(os.path.join(tmp_dir, "vectors.f16"), "wb") as dst:
+            while remaining > 0:
+                block = src.read(min(remaining, 1 << 24))
+                if not block:
+                    break
+                dst.write(block)
+                remaining -= len(block)
+
+        snapshot.id_map.save(tmp_dir)
+
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump({
+                "generation": generation,
+                "count": count,
+                "vectors": snapshot.reranker.count,
+                "dimension": snapshot.reranker.dimension,
+                "model": snapshot.model
+            }, f)
+
+        # A generation becomes visible only after all of its files are complete
+        os.replace(tmp_dir, gen_dir)
+        pointer = os.path.join(self.root, "CURRENT")
+        with open(pointer + ".tmp", "w") as f:
+            f.write(str(generation))
+        os.replace(pointer + ".tmp", pointer)
+
+        self._prune()
+        logger.info(f"Published index generation {generation} with {count} vectors")
+        return generation
+
+    def _prune(self):
+        """Remove old generations; readers that still map them keep working on Linux."""
+        gen_root = os.path.join(self.root, "generations")
+        generations = sorted(
+            (name for name in os.listdir(gen_root) if name.isdigit()),
+            key=int
+        )
+        for name in generations[:-self.keep]:
+            shutil.rmtree(os.path.join(gen_root, name), ignore_errors=True)
+
+class SnapshotReader:
+    """Loads the generation `CURRENT` points at, memory-mapping its files."""
+    def __init__(self, root: str):
+        self.root = root
+        self._pointer_mtime = None
+
+    def changed(self) -> bool:
+        """Cheap stat of the `CURRENT` pointer; True when a new generation was published."""
+        try:
+            mtime = os.stat(os.path.join(self.root, "CURRENT")).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        return mtime != self._pointer_mtime
+
+    def load(self) -> Optional[IndexSnapshot]:
+        """Load the current generation, or None if nothing was published yet."""
+        pointer = os.path.join(self.root, "CURRENT")
+        try:
+            mtime = os.stat(pointer).st_mtime_ns
+            with open(pointer) as f:
+                generation = int(f.read().strip())
+        except FileNotFoundError:
+            return None
+
+        gen_dir = os.path.join(self.root, "generations", str(generation))
+        with open(os.path.join(gen_dir, "meta.json")) as f:
+            meta = json.load(f)
+
+        # IVF inverted lists are mapped rather than read, so every worker
+        # shares the same page-cache copy of the index
+        index = faiss.read_index(
+            os.path.join(gen_dir, "index.faiss"),
+            faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        )
+        reranker = ExactReranker(os.path.join(gen_dir, "vectors.f16"), meta["dimension"])
+        reranker.open_readonly(meta["vectors"])
+        id_map = IdMap.load(gen_dir)
+
+        self._pointer_mtime = mtime
+        return IndexSnapshot(generation, index, id_map, reranker, meta.get("model"))
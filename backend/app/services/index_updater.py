@@ -0,0 +1,179 @@
+import asyncio
+import datetime
+import time
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple
+from ..database import admin_db
+from ..core.config import settings
+from .vector_store import vector_store, VectorStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IndexUpdater:
+    """
+    Tails the index outbox and applies its changes to the in-memory index.
+
+    Embedding writes and video soft deletes/restores append to index_outbox
+    in the same transaction (app/migrations/add_index_outbox.sql). The
+    updater polls the rows after its cursor, collapses each batch to the
+    last change per video, fetches the added vectors in one query and
+    applies them with a single FAISS add, so new videos are searchable
+    within a poll interval plus the publish delay even at high ingest rates.
+
+    Ids are assigned when a transaction inserts, not when it commits, so a
+    slower transaction can commit a lower id after higher ones were read.
+    The cursor therefore only advances over contiguous ids; rows past a gap
+    are applied (re-applying is harmless) and the gap is waited on for
+    INDEX_OUTBOX_GAP_SECONDS before it is taken for a rolled back insert.
+
+    Runs in the process that owns the index: the index builder, or each
+    standalone worker. Readers get changes through published generations.
+    The outbox is behind row level security, so it is read with the
+    service key.
+    """
+    def __init__(self):
+        self.poll_seconds = settings.INDEX_OUTBOX_POLL_SECONDS
+        self.batch_size = settings.INDEX_OUTBOX_BATCH
+        self.gap_seconds = settings.INDEX_OUTBOX_GAP_SECONDS
+        self.retention_hours = settings.INDEX_OUTBOX_RETENTION_HOURS
+        self.cleanup_seconds = 3600  # between retention cleanups
+        self.cursor: Optional[int] = None  # every outbox id up to here is applied
+        self._applied: set = set()  # ids past the cursor that are applied already
+        self._gap_since: Dict[int, float] = {}  # first time each missing id was seen
+        self._lock = asyncio.Lock()
+        self._last_cleanup = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Only a process that builds its own FAISS index applies changes."""
+        return (
+            isinstance(vector_store, VectorStore)
+            and vector_store.role != "reader"
+            and self.poll_seconds > 0
+        )
+
+    async def rebuild(self):
+        """
+        Initialize or rebuild the index and position the cursor for it.
+
+        The outbox position is read before the build starts, so changes
+        made while it streams are replayed onto the new generation.
+        """
+        if not self.enabled:
+            await vector_store.initialize()
+            return
+        mark = await self._latest_id()
+        await vector_store.initialize()
+        async with self._lock:
+            # Changes past `mark` may have gone to the replaced generation only
+            self.cursor = mark if self.cursor is None else min(self.cursor, mark)
+            self._applied.clear()
+            self._gap_since.clear()
+
+    async def run(self):
+        """Poll the outbox forever; a full batch is followed immediately by the next."""
+        while True:
+            applied = 0
+            try:
+                applied = await self.poll()
+                if time.monotonic() - self._last_cleanup > self.cleanup_seconds:
+                    self._last_cleanup = time.monotonic()
+                    await self._cleanup()
+            except Exception as e:
+                logger.error(f"Error applying index outbox: {str(e)}")
+            if applied < self.batch_size:
+                await asyncio.sleep(self.poll_seconds)
+
+    async def poll(self) -> int:
+        """
+        Apply one batch of outbox rows past the cursor.
+
+        Returns:
+            Number of outbox rows applied
+        """
+        async with self._lock:
+            if self.cursor is None:
+                # No build positioned the cursor yet
+                return 0
+            result = await (
+                admin_db.table("index_outbox")
+                .select("id,video_id,model,op")
+                .gt("id", self.cursor)
+                .order("id")
+                .limit(self.batch_size)
+                .execute()
+            )
+            rows = [row for row in result.data or [] if row["id"] not in self._applied]
+            if rows:
+                await self._apply(rows)
+                self._applied.update(row["id"] for row in rows)
+            self._advance()
+            return len(rows)
+
+    async def _apply(self, rows: List[Dict[str, Any]]):
+        """Collapse rows to the last change per video and apply them in one batch."""
+        tag = vector_store.model
+        latest: Dict[str, str] = {}
+        for row in rows:
+            if row["op"] == "add" and row.get("model") not in (None, tag):
+                # A vector of another tag (e.g. a migration target) changed
+                continue
+            latest[str(row["video_id"])] = row["op"]
+
+        added = [video_id for video_id, op in latest.items() if op == "add"]
+        removals = [video_id for video_id, op in latest.items() if op == "remove"]
+        additions = await self._fetch(added, tag)
+        # Videos deleted since the add was queued come back without a vector
+        found = {video_id for video_id, _, _ in additions}
+        removals.extend(video_id for video_id in added if video_id not in found)
+        if additions or removals:
+            await vector_store.apply_changes(additions, removals)
+
+    async def _fetch(self, video_ids: List[str], tag: str) -> List[Tuple[str, Optional[str], np.ndarray]]:
+        """Current vectors of live videos under the index's tag."""
+        if not video_ids:
+            return []
+        result = await (
+            admin_db.table("video_embeddings")
+            .select("video_id,embedding,videos!inner(user_id)")
+            .eq("model", tag)
+            .in_("video_id", video_ids)
+            .is_("videos.deleted_at", "null")
+            .execute()
+        )
+        additions = []
+        buffer = np.empty(vector_store.dimension, dtype=np.float32)
+        for record in result.data or []:
+            if vector_store._decode_embedding(record["embedding"], buffer):
+                additions.append((str(record["video_id"]), str(record["videos"]["user_id"]), buffer.copy()))
+            else:
+                logger.warning(f"Skipping malformed embedding for video {record['video_id']}")
+        return additions
+
+    def _advance(self):
+        """Move the cursor over applied ids, waiting out recent gaps."""
+        now = time.monotonic()
+        while self._applied:
+            following = self.cursor + 1
+            if following in self._applied:
+                self._applied.discard(following)
+                self._gap_since.pop(following, None)
+                self.cursor = following
+            elif now - self._gap_since.setdefault(following, now) >= self.gap_seconds:
+                # Nothing committed under these ids in time: rolled back inserts
+                self._gap_since.pop(following)
+                self.cursor = min(self._applied) - 1
+            else:
+                return
+
+    async def _latest_id(self) -> int:
+        result = await admin_db.table("index_outbox").select("id").order("id", desc=True).limit(1).execute()
+        return result.data[0]["id"] if result.data else 0
+
+    async def _cleanup(self):
+        """Delete outbox rows past the retention period."""
+        cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=self.retention_hours)
+        await admin_db.table("index_outbox").delete().lt("created_at", cutoff.isoformat()).execute()
+
+index_updater = IndexUpdater()
@@ -0,0 +1,169 @@
+import math
+import os
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, List, Iterable, Optional
+from ..core.config import settings
+from .lexical_index import tokenize
+import logging
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself just
+let like me more most my myself no nor not now of off on once only or other our ours ourselves out
+over own really same she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up us very was we were what when where which
+while who whom why will with would yeah yes you your yours yourself yourselves okay oh um uh gonna
+wanna got get gets going go goes know think thing things something actually right well one two
+""".split())
+
+def content_terms(text: str) -> List[str]:
+    """Lowercase tokens of `text` without stopwords, numbers and one-letter words."""
+    return [
+        token for token in tokenize(text)
+        if len(token) > 1 and not token.isdigit() and token not in STOPWORDS
+    ]
+
+class KeywordExtractor:
+    """
+    TF-IDF keyword extraction against the corpus of indexed videos.
+
+    Document frequencies live in a small SQLite file (KEYWORD_STATS_PATH): one
+    counter row per term plus the term set of each video, so re-indexing a
+    video is idempotent and deleting it decrements exactly what it added.
+    SearchIndexer keeps the counters current on ingest, edit, delete and
+    restore, and any worker may update them concurrently.
+    """
+    def __init__(self, path: Optional[str] = None, limit: Optional[int] = None):
+        self.path = path or settings.KEYWORD_STATS_PATH
+        self.limit = limit or settings.KEYWORDS_PER_VIDEO
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened on first use so importing the module does not touch the disk
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER NOT NULL) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS documents (video_id TEXT PRIMARY KEY, terms TEXT NOT NULL) WITHOUT ROWID;
+            """)
+            self._connection = connection
+        return self._connection
+
+    def add_document(self, video_id: str, text: str):
+        """Count a video's distinct terms, replacing its previous version."""
+        terms = " ".join(sorted(set(content_terms(text))))
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute("SELECT terms FROM documents WHERE video_id = ?", (video_id,)).fetchone()
+            if row is not None and row[0] == terms:
+                return
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                if row is not None:
+                    self._decrement(connection, row[0])
+                connection.executemany(
+                    "INSERT INTO terms (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                    ((term,) for term in terms.split())
+                )
+                connection.execute("INSERT OR REPLACE INTO documents (video_id, terms) VALUES (?, ?)", (video_id, terms))
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+    def remove_document(self, video_id: str):
+        """Stop counting a video's terms."""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute("SELECT terms FROM documents WHERE video_id = ?", (video_id,)).fetchone()
+                if row is not None:
+                    self._decrement(connection, row[0])
+                    connection.execute("DELETE FROM documents WHERE video_id = ?", (video_id,))
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _decrement(connection: sqlite3.Connection, terms: str):
+        rows = [(term,) for term in terms.split()]
+        connection.executemany("UPDATE terms SET df = df - 1 WHERE term = ?", rows)
+        connection.executemany("DELETE FROM terms WHERE term = ? AND df <= 0", rows)
+
+    def document_frequencies(self, terms: Iterable[str]) -> Dict[str, int]:
+        """Number of indexed videos containing each term (absent terms are omitted)."""
+        terms = list(set(terms))
+        frequencies = {}
+        with self._lock:
+            connection = self._connect()
+            for start in range(0, len(terms), 500):  # stay under SQLite's bound-parameter limit
+                chunk = terms[start:start + 500]
+                frequencies.update(connection.execute(
+                    f"SELECT term, df FROM terms WHERE term IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+        return frequencies
+
+    def document_count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def _idf(self, terms: Iterable[str]) -> Dict[str, float]:
+        # Smoothed so terms unseen in the corpus get the highest weight, not infinity
+        terms = set(terms)
+        total = self.document_count()
+        frequencies = self.document_frequencies(terms)
+        return {term: math.log((total + 1) / (frequencies.get(term, 0) + 1)) + 1 for term in terms}
+
+    def extract(self, text: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Most discriminative terms of a text by TF-IDF.
+
+        Args:
+            text: Document text (title, description, transcript, ...)
+            limit: Number of keywords (defaults to KEYWORDS_PER_VIDEO)
+
+        Returns:
+            Up to `limit` terms, highest scoring first
+        """
+        counts = Counter(content_terms(text))
+        if not counts:
+            return []
+        idf = self._idf(counts)
+        scores = {term: (1 + math.log(count)) * idf[term] for term, count in counts.items()}
+        return sorted(scores, key=lambda term: (-scores[term], term))[:limit or self.limit]
+
+    def prune(self, keywords: List[str], text: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Keep only the most discriminative of an existing keyword list.
+
+        Multi-word keywords (e.g. tags) score the mean of their terms. Lists
+        already within the limit are returned unchanged.
+        """
+        limit = limit or self.limit
+        if len(keywords) <= limit:
+            return keywords
+        counts = Counter(content_terms(text))
+        parts = {keyword: content_terms(keyword) for keyword in keywords}
+        idf = self._idf(term for terms in parts.values() for term in terms)
+
+        def score(keyword: str) -> float:
+            terms = parts[keyword]
+            if not terms:
+                return 0.0
+            return sum((1 + math.log(counts.get(term, 1))) * idf[term] for term in terms) / len(terms)
+
+        ranked = sorted(range(len(keywords)), key=lambda i: -score(keywords[i]))
+        return [keywords[i] for i in sorted(ranked[:limit])]
+
+keyword_extractor = KeywordExtractor()
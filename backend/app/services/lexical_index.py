@@ -0,0 +1,203 @@
+import re
+import math
+import numpy as np
+from array import array
+from typing import Dict, List, Tuple, Optional, Iterable
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens used by the lexical indexes."""
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+class BM25Index:
+    """
+    BM25 inverted index over one user's videos.
+
+    Each posting list is a pair of compact arrays (document slots as uint32,
+    field-weighted term frequencies as float32), so a query scores all matching
+    documents with a few vectorised NumPy operations. Removed documents are
+    tombstoned and purged from the postings once they make up a quarter of the
+    index.
+    """
+    # Field weights (BM25F-style): a title hit counts more than a transcript hit
+    FIELD_WEIGHTS = {
+        "title": 3.0,
+        "keywords": 2.0,
+        "search_summary": 1.0,
+        "audio_transcription": 1.0
+    }
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Tuple[array, array]] = {}  # term -> (slots, weighted tf)
+        self.doc_freq: Dict[str, int] = {}  # live documents containing the term
+        self.slots: List[Optional[str]] = []  # slot -> video ID, None once removed
+        self.slot_of: Dict[str, int] = {}  # video ID -> slot
+        self.doc_terms: List[Tuple[str, ...]] = []  # slot -> unique terms, for removal
+        self.doc_len = array("f")  # slot -> weighted document length
+        self.dead = array("b")  # slot -> 1 once removed
+        self.live = 0
+        self.total_len = 0.0
+
+    def __len__(self) -> int:
+        return self.live
+
+    def add(self, video_id: str, fields: Dict[str, Iterable[str]]):
+        """
+        Index a document, replacing any previous version.
+
+        Args:
+            video_id: ID of the video
+            fields: Field name -> tokens, weighted by FIELD_WEIGHTS
+        """
+        self.remove(video_id)
+
+        term_freq: Dict[str, float] = {}
+        length = 0.0
+        for field, tokens in fields.items():
+            weight = self.FIELD_WEIGHTS.get(field, 1.0)
+            for token in tokens:
+                term_freq[token] = term_freq.get(token, 0.0) + weight
+                length += weight
+
+        slot = len(self.slots)
+        self.slots.append(video_id)
+        self.slot_of[video_id] = slot
+        self.doc_terms.append(tuple(term_freq))
+        self.doc_len.append(length)
+        self.dead.append(0)
+        self.live += 1
+        self.total_len += length
+
+        for term, tf in term_freq.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = (array("I"), array("f"))
+            posting[0].append(slot)
+            posting[1].append(tf)
+            self.doc_freq[term] = self.doc_freq.get(term, 0) + 1
+
+    def remove(self, video_id: str):
+        """Tombstone a document; its postings are purged on the next compaction."""
+        slot = self.slot_of.pop(video_id, None)
+        if slot is None:
+            return
+        self.slots[slot] = None
+        self.dead[slot] = 1
+        for term in self.doc_terms[slot]:
+            remaining = self.doc_freq[term] - 1
+            if remaining:
+                self.doc_freq[term] = remaining
+            else:
+                del self.doc_freq[term]
+        self.doc_terms[slot] = ()
+        self.live -= 1
+        self.total_len -= self.doc_len[slot]
+
+        if len(self.slots) > 64 and self.live < 0.75 * len(self.slots):
+            self._compact()
+
+    def _compact(self):
+        """Rebuild postings without tombstoned slots, renumbering live documents."""
+        remap = np.full(len(self.slots), -1, dtype=np.int64)
+        live_slots = [slot for slot, video_id in enumerate(self.slots) if video_id is not None]
+        remap[live_slots] = np.arange(len(live_slots))
+
+        postings = {}
+        for term, (slots, tfs) in self.postings.items():
+            new_slots = remap[np.frombuffer(slots, dtype=np.uint32)]
+            keep = new_slots >= 0
+            if keep.any():
+                postings[term] = (
+                    array("I", new_slots[keep].astype(np.uint32).tobytes()),
+                    array("f", np.frombuffer(tfs, dtype=np.float32)[keep].tobytes())
+                )
+        self.postings = postings
+        self.slots = [self.slots[slot] for slot in live_slots]
+        self.doc_terms = [self.doc_terms[slot] for slot in live_slots]
+        self.doc_len = array("f", (self.doc_len[slot] for slot in live_slots))
+        self.dead = array("b", bytes(len(live_slots)))
+        self.slot_of = {video_id: slot for slot, video_id in enumerate(self.slots)}
+
+    def search(self, terms: List[str], k: int = 50) -> List[Tuple[str, float]]:
+        """
+        Score documents matching any query term.
+
+        Returns:
+            Up to k (video_id, bm25_score) tuples, best first
+        """
+        if not self.live:
+            return []
+        scores = np.zeros(len(self.slots), dtype=np.float32)
+        doc_len = np.frombuffer(self.doc_len, dtype=np.float32)
+        avg_len = self.total_len / self.live or 1.0
+
+        for term in set(terms):
+            posting = self.postings.get(term)
+            df = self.doc_freq.get(term, 0)
+            if posting is None or not df:
+                continue
+            idf = math.log(1 + (self.live - df + 0.5) / (df + 0.5))
+            slots = np.frombuffer(posting[0], dtype=np.uint32)
+            tf = np.frombuffer(posting[1], dtype=np.float32)
+            norm = self.k1 * (1 - self.b + self.b * doc_len[slots] / avg_len)
+            scores[slots] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        if self.live < len(self.slots):
+            scores[np.frombuffer(self.dead, dtype=np.int8).astype(bool)] = 0
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(self.slots[slot], float(scores[slot])) for slot in matched]
+
+class LexicalIndex:
+    """Per-user BM25 indexes; users only ever search their own library."""
+    def __init__(self):
+        self.indexes: Dict[str, BM25Index] = {}
+
+    def add_document(self, user_id: str, video_id: str, fields: Dict[str, str]):
+        tokens = {
+            field: tokenize(" ".join(value) if isinstance(value, list) else value or "")
+            for field, value in fields.items()
+        }
+        self.indexes.setdefault(user_id, BM25Index()).add(video_id, tokens)
+
+    def remove_document(self, user_id: str, video_id: str):
+        index = self.indexes.get(user_id)
+        if index is not None:
+            index.remove(video_id)
+            if not len(index):
+                del self.indexes[user_id]
+
+    def search(self, user_id: str, query: str, k: int = 50) -> List[Tuple[str, float]]:
+        return self.search_terms(user_id, tokenize(query), k)
+
+    def search_terms(self, user_id: str, terms: List[str], k: int = 50) -> List[Tuple[str, float]]:
+        """Search with pre-tokenized terms, e.g. a query expanded with typo corrections."""
+        index = self.indexes.get(user_id)
+        if index is None:
+            return []
+        return index.search(terms, k)
+
+    def clear(self):
+        self.indexes = {}
+
+def reciprocal_rank_fusion(
+    rankings: List[List[Tuple[str, float]]],
+    k: int = 60
+) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked (video_id, score) lists by summing 1 / (k + rank).
+
+    Only ranks are used, so BM25 and cosine scores need no calibration.
+    """
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, (video_id, _) in enumerate(ranking, start=1):
+            fused[video_id] = fused.get(video_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+lexical_index = LexicalIndex()
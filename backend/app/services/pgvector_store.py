@@ -0,0 +1,137 @@
+import numpy as np
+from typing import Dict, List, Tuple, Optional
+from ..database import admin_db
+from ..core.config import settings
+from .vector_backend import VectorBackend
+from .embedding_store import embedding_store
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PgVectorStore(VectorBackend):
+    """
+    k-NN search served by the per-model ivfflat indexes on video_embeddings.
+
+    Queries go through the `match_videos` and `video_similarities` RPCs
+    (app/migrations/add_video_embeddings.sql), which apply the user and
+    deleted_at filters and the model tag in Postgres, so this backend
+    keeps no vectors in process memory. Embeddings are written by ingestion
+    directly to video_embeddings, so adds and removes need no work here.
+    """
+    def __init__(self):
+        self.dimension = 384  # dimension of all-MiniLM-L6-v2 embeddings
+        self.probes = settings.PGVECTOR_PROBES  # ivfflat lists scanned per query
+
+    @property
+    def model(self) -> str:
+        return embedding_store.active
+
+    async def current_model(self) -> str:
+        return await embedding_store.active_tag()
+
+    async def initialize(self):
+        await embedding_store.active_tag()
+        logger.info("Using pgvector backend; no in-process index to build")
+
+    async def search(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 50,
+        user_id: Optional[str] = None,
+        refine_factor: Optional[int] = None,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Search for similar videos with the match_videos RPC.
+
+        Args:
+            query_embedding: Query vector to search for
+            k: Number of results to return
+            user_id: Restrict results to this user's videos
+            refine_factor: Ignored; pgvector scores are exact for the rows it scans
+            nprobe: ivfflat lists to scan (defaults to PGVECTOR_PROBES)
+
+        Returns:
+            List of (video_id, similarity_score) tuples
+        """
+        try:
+            return await self._match(query_embedding, k, user_id, nprobe or self.probes)
+        except Exception as e:
+            logger.error(f"Error during pgvector search: {str(e)}")
+            return []
+
+    async def search_below(
+        self,
+        query_embedding: np.ndarray,
+        k: int,
+        user_id: Optional[str] = None,
+        ceiling: Optional[float] = None
+    ) -> Tuple[List[Tuple[str, float]], bool]:
+        """
+        Return the k most similar videos whose similarity is at most `ceiling`.
+
+        The ceiling is applied inside match_videos, so a deep page reads only
+        its own window. Errors propagate so paging never ends silently.
+
+        Returns:
+            Tuple of ((video_id, similarity) pairs best first, whether no
+            further videos exist below the window)
+        """
+        results = await self._match(query_embedding, k + 1, user_id, self.probes, ceiling)
+        return results[:k], len(results) <= k
+
+    async def similarities(
+        self,
+        query_embedding: np.ndarray,
+        video_ids: List[str]
+    ) -> Dict[str, float]:
+        """Exact similarity of the query to specific videos."""
+        if not video_ids:
+            return {}
+        vector = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        result = await (
+            admin_db.rpc("video_similarities", {
+                "query_embedding": vector.tolist(),
+                "video_ids": list(video_ids),
+                "filter_model": self.model
+            }).execute()
+        )
+        return {str(row["video_id"]): float(row["similarity"]) for row in result.data or []}
+
+    async def _match(
+        self,
+        query_embedding: np.ndarray,
+        k: int,
+        user_id: Optional[str],
+        probes: int,
+        ceiling: Optional[float] = None
+    ) -> List[Tuple[str, float]]:
+        vector = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        result = await (
+            admin_db.rpc("match_videos", {
+                "query_embedding": vector.tolist(),
+                "match_count": k,
+                "filter_user_id": user_id,
+                "probes": probes,
+                "filter_model": self.model,
+                "max_similarity": ceiling
+            }).execute()
+        )
+        return [
+            (str(row["video_id"]), float(row["similarity"]))
+            for row in result.data or []
+        ]
+
+    async def add_embedding(
+        self,
+        video_id: str,
+        embedding: np.ndarray,
+        user_id: Optional[str] = None,
+        model: Optional[str] = None
+    ):
+        # The row written to video_embeddings is already indexed by Postgres
+        pass
+
+    async def remove_embedding(self, video_id: str):
+        # Soft-deleted rows are excluded by the RPC's deleted_at filter
+        pass
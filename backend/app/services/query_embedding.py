@@ -0,0 +1,149 @@
+import asyncio
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+from ..core.config import settings
+from ..utils.embeddings import get_embeddings, MODEL_NAME
+import logging
+
+logger = logging.getLogger(__name__)
+
+class QueryEmbeddingService:
+    """
+    Embeds search queries.
+
+    The model runs on one dedicated executor thread so inference never blocks
+    the event loop. Repeated queries are answered from an LRU cache keyed by the
+    normalised query string. Concurrent cold queries are coalesced: they queue
+    for a short window, or until the previous batch finishes, and are then
+    encoded in a single `model.encode` call.
+    """
+    def __init__(self):
+        self.cache_size = settings.QUERY_EMBEDDING_CACHE_SIZE
+        self.batch_window = settings.QUERY_EMBEDDING_BATCH_WINDOW_MS / 1000
+        self.max_batch_size = 64
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-embedding")
+
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}  # queued or encoding
+        self._queue: List[str] = []  # keys waiting for the next batch
+        self._models: Dict[str, Optional[str]] = {}  # queued key -> model to encode it with
+        self._flush_handle = None
+        self._encoding = False
+
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+        self.encoded = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Cache key for a query: lowercased with whitespace collapsed."""
+        return " ".join(query.lower().split())
+
+    async def warm_up(self):
+        """Load the model and run one encode so the first real query is not cold."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, get_embeddings, ["warm up"])
+        logger.info("Query embedding model warmed up")
+
+    async def embed(self, query: str, model: Optional[str] = None) -> np.ndarray:
+        """
+        Get the embedding for a search query.
+
+        Args:
+            query: Raw search query
+            model: Model name, when searching vectors of a model other than
+                EMBEDDING_MODEL (e.g. right after an embedding migration)
+
+        Returns:
+            Normalized, read-only embedding vector
+        """
+        key = self.normalize(query)
+        if model is not None and model != MODEL_NAME:
+            key = f"{model}\n{key}"
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        future = self._pending.get(key)
+        if future is None:
+            # First caller for this key; identical concurrent queries share the future
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            self._queue.append(key)
+            self._models[key] = model
+            if len(self._queue) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        # Shield so one cancelled request does not cancel the shared result
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._encoding or not self._queue:
+            # The running batch flushes again when it finishes
+            return
+        batch = self._queue[:self.max_batch_size]
+        del self._queue[:len(batch)]
+        self._encoding = True
+        asyncio.get_running_loop().create_task(self._encode_batch(batch))
+
+    async def _encode_batch(self, batch: List[str]):
+        loop = asyncio.get_running_loop()
+        try:
+            # Usually one model; a batch straddling a model switch is encoded per model
+            models = [self._models.pop(key, None) for key in batch]
+            vectors = [None] * len(batch)
+            for model in set(models):
+                rows = [i for i, row_model in enumerate(models) if row_model == model]
+                texts = [batch[i].split("\n", 1)[-1] for i in rows]
+                encoded = await loop.run_in_executor(self.executor, get_embeddings, texts, model)
+                for i, vector in zip(rows, encoded):
+                    vectors[i] = vector
+            self.batches += 1
+            self.encoded += len(batch)
+            for key, vector in zip(batch, vectors):
+                vector = vector.astype(np.float32)
+                vector.setflags(write=False)
+                self._remember(key, vector)
+                future = self._pending.pop(key)
+                if not future.done():
+                    future.set_result(vector)
+        except Exception as e:
+            logger.error(f"Error encoding query batch: {str(e)}")
+            for key in batch:
+                future = self._pending.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+        finally:
+            self._encoding = False
+            if self._queue:
+                self._flush()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "cached_queries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "batches": self.batches,
+            "average_batch_size": self.encoded / self.batches if self.batches else 0.0
+        }
+
+query_embedding_service = QueryEmbeddingService()
@@ -4,10 +4,10 @@ Redis service for caching video metadata
 import json
 import logging
 from typing import Optional, Dict, Any
-from redis import Redis
 from datetime import timedelta
 import os
 from dotenv import load_dotenv
+from ..core.registry import registry
 
 load_dotenv()
 
@@ -16,6 +16,7 @@ logger = logging.getLogger(__name__)
 class RedisService:
     def __init__(self):
         """Initialize Redis connection"""
+        from redis import Redis
         try:
             self.redis = Redis(
                 host=os.getenv("REDIS_HOST"),
@@ -149,4 +150,4 @@ class RedisService:
             return False
 
 # Initialize Redis service
-redis_service = RedisService() 
\ No newline at end of file
+redis_service = registry.lazy("redis", RedisService) 
\ No newline at end of file
@@ -0,0 +1,187 @@
+import numpy as np
+import operator
+from itertools import repeat
+from typing import Dict, List, Tuple, Any
+
+class MatchType:
+    PERFECT = "PERFECT"
+    STRONG = "STRONG"
+    PARTIAL = "PARTIAL"
+    WEAK = "WEAK"
+    LAST_RESORT = "LAST_RESORT"
+
+# One bit per match type, in field order; the points each match is worth
+MATCH_BITS = [
+    MatchType.PERFECT,  # title or search summary
+    MatchType.STRONG,  # keywords
+    MatchType.PARTIAL,  # visual summary
+    MatchType.WEAK,  # transcription
+    MatchType.LAST_RESORT  # metadata values
+]
+MATCH_POINTS = [50, 30, 20, 10, 5]
+SIMILARITY_POINTS = 20
+MAX_SCORE = 100.0
+
+# Points for every possible bitmask, so scoring is a single table lookup
+POINTS_BY_MASK = np.array([
+    sum(points for bit, points in enumerate(MATCH_POINTS) if mask >> bit & 1)
+    for mask in range(1 << len(MATCH_BITS))
+], dtype=np.float32)
+
+SEPARATOR = "\x00"
+
+def combine(masks: np.ndarray, similarities: np.ndarray) -> np.ndarray:
+    """Relevance scores from match bitmasks and vector similarities, capped at MAX_SCORE."""
+    scores = POINTS_BY_MASK[masks] + SIMILARITY_POINTS * np.asarray(similarities, dtype=np.float32)
+    return np.minimum(scores, MAX_SCORE)
+
+def match_details(mask: int) -> Dict[str, bool]:
+    """Expand a match bitmask into the MatchType flags."""
+    return {match_type: bool(mask >> bit & 1) for bit, match_type in enumerate(MATCH_BITS)}
+
+def _match_fields(document: Dict[str, Any]) -> List[str]:
+    """Lowercased text per match type; list values are joined so a match cannot span two of them."""
+    metadata = document.get("metadata") or {}
+    return [
+        SEPARATOR.join([document["title"].lower(), document["search_summary"].lower()]),
+        SEPARATOR.join(keyword.lower() for keyword in document["keywords"]),
+        document["visual_summary"].lower(),
+        document["audio_transcription"].lower(),
+        SEPARATOR.join(str(value).lower() for value in metadata.values()) if isinstance(metadata, dict) else ""
+    ]
+
+class _UserFields:
+    """Pre-normalized match fields of one user's videos, stored column-wise."""
+    def __init__(self):
+        self.slot_of: Dict[str, int] = {}
+        self.video_ids: List[str] = []
+        self.fields: List[List[str]] = [[] for _ in MATCH_BITS]  # field -> slot -> text
+
+    def put(self, video_id: str, fields: List[str]):
+        slot = self.slot_of.get(video_id)
+        if slot is None:
+            self.slot_of[video_id] = len(self.video_ids)
+            self.video_ids.append(video_id)
+            for column, text in zip(self.fields, fields):
+                column.append(text)
+        else:
+            for column, text in zip(self.fields, fields):
+                column[slot] = text
+
+    def remove(self, video_id: str):
+        slot = self.slot_of.pop(video_id, None)
+        if slot is None:
+            return
+        # Move the last video into the freed slot
+        last = len(self.video_ids) - 1
+        if slot != last:
+            moved = self.video_ids[last]
+            self.video_ids[slot] = moved
+            self.slot_of[moved] = slot
+            for column in self.fields:
+                column[slot] = column[last]
+        self.video_ids.pop()
+        for column in self.fields:
+            column.pop()
+
+    def match_masks(self, query: str, slots: List[int]) -> np.ndarray:
+        """
+        Match-type bitmask of the given slots for a lowercased query.
+
+        Each field is one C-level `map(operator.contains)` pass over the
+        candidates' pre-lowercased texts, so there is no per-video Python code;
+        the cost is bounded by the candidates' text, not the whole library.
+        """
+        masks = np.zeros(len(slots), dtype=np.uint8)
+        for bit, column in enumerate(self.fields):
+            hits = np.fromiter(
+                map(operator.contains, map(column.__getitem__, slots), repeat(query)),
+                dtype=bool,
+                count=len(slots)
+            )
+            masks[hits] |= 1 << bit
+        return masks
+
+class RelevanceScorer:
+    """
+    Scores search candidates against a query in one batch pass.
+
+    Fields are lowercased once when a video is indexed (see SearchIndexer),
+    so a query runs one batched substring pass per field over its candidates
+    and converts the resulting bitmasks to points with a NumPy table lookup.
+    """
+    def __init__(self):
+        self.users: Dict[str, _UserFields] = {}
+
+    def add_document(self, document: Dict[str, Any]):
+        self.users.setdefault(document["user_id"], _UserFields()).put(
+            document["id"], _match_fields(document)
+        )
+
+    def remove_document(self, user_id: str, video_id: str):
+        fields = self.users.get(user_id)
+        if fields is not None:
+            fields.remove(video_id)
+            if not fields.video_ids:
+                del self.users[user_id]
+
+    def clear(self):
+        self.users = {}
+
+    def score(
+        self,
+        user_id: str,
+        query: str,
+        video_ids: List[str],
+        similarities: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score candidate videos for a query.
+
+        Args:
+            user_id: Owner of the candidates
+            query: Raw search query
+            video_ids: Candidate video IDs
+            similarities: Vector similarity per candidate (0 if not a vector match)
+
+        Returns:
+            Tuple of (scores capped at MAX_SCORE, match bitmasks) per candidate;
+            use match_details() to expand a bitmask
+        """
+        masks = np.zeros(len(video_ids), dtype=np.uint8)
+        query = query.lower().strip().replace(SEPARATOR, "")
+        fields = self.users.get(user_id)
+        if query and fields is not None:
+            slots = np.fromiter(
+                map(fields.slot_of.get, video_ids, repeat(-1)),
+                dtype=np.int64,
+                count=len(video_ids)
+            )
+            known = slots >= 0
+            if known.all():
+                masks = fields.match_masks(query, slots.tolist())
+            elif known.any():
+                masks[known] = fields.match_masks(query, slots[known].tolist())
+
+        return combine(masks, similarities), masks
+
+    def match_all(self, user_id: str, query: str) -> Tuple[List[str], np.ndarray]:
+        """
+        Every video of the user whose fields contain the query.
+
+        Args:
+            user_id: ID of the user searching
+            query: Raw search query
+
+        Returns:
+            Tuple of (matching video IDs, their match bitmasks)
+        """
+        query = query.lower().strip().replace(SEPARATOR, "")
+        fields = self.users.get(user_id)
+        if not query or fields is None:
+            return [], np.zeros(0, dtype=np.uint8)
+        masks = fields.match_masks(query, range(len(fields.video_ids)))
+        matched = np.flatnonzero(masks)
+        return [fields.video_ids[slot] for slot in matched.tolist()], masks[matched]
+
+relevance_scorer = RelevanceScorer()
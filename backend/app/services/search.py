@@ -1,144 +1,450 @@
-from typing import List, Dict, Any
-from ..database import supabase
+from typing import List, Dict, Any, Tuple, AsyncIterator, Optional
+from ..database import db
+from ..core.config import settings
+from ..utils.cursor import encode_cursor, decode_cursor
+from ..utils.embeddings import parse_tag, MODEL_NAME
 from .vector_store import vector_store
+from .query_embedding import query_embedding_service
+from .lexical_index import lexical_index, reciprocal_rank_fusion
+from .relevance_scoring import relevance_scorer, combine, SIMILARITY_POINTS, POINTS_BY_MASK, MAX_SCORE, MatchType
+from .search_cache import search_cache
+from .trigram_index import trigram_index
+from .segment_index import segment_index
+from .search_indexer import search_indexer
+from .search_budget import SearchBudget, stage_costs
+import asyncio
+import time
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
 
-class MatchType:
-    PERFECT = "PERFECT"
-    STRONG = "STRONG"
-    PARTIAL = "PARTIAL"
-    WEAK = "WEAK"
-    LAST_RESORT = "LAST_RESORT"
-
 class SearchService:
     def __init__(self):
-        self.db = supabase
+        self.db = db
+        self.candidate_count = 50  # candidates taken from each retriever
         
     async def search_videos(
         self,
         user_id: str,
         query: str,
-        platform: str = None
+        platform: str = None,
+        budget: Optional[SearchBudget] = None
     ) -> List[Dict[str, Any]]:
         """
-        Search for videos using semantic search and relevance scoring.
+        Search for videos using hybrid semantic (ANN) and lexical (BM25) retrieval.
         
         Args:
             user_id: ID of the user performing the search
             query: Search query string
             platform: Optional platform filter
+            budget: Deadline for this search; records the stages that ran
+                (defaults to SEARCH_DEADLINE_MS)
             
         Returns:
             List of matching videos with relevance scores (internal match details hidden)
         """
+        budget = budget or SearchBudget()
         try:
-            # Get query embedding
-            query_embedding = await self._get_query_embedding(query)
+            # Identical searches are served from, or coalesced onto, the result cache;
+            # results degraded by the deadline are not stored
+            query = query_embedding_service.normalize(query)
+            key = search_cache.key(user_id, query, platform, vector_store.generation)
+            results = await search_cache.get_or_compute(
+                key,
+                lambda: self._search(user_id, query, platform, budget),
+                cache_if=lambda: not budget.degraded
+            )
+            if not budget.ran and not budget.skipped:
+                budget.record("cache")
+            return results
             
-            # Search vector store
-            similar_videos = await vector_store.search(query_embedding)
+        except Exception as e:
+            logger.error(f"Error in search_videos: {str(e)}")
+            return []
+        
+    async def _search(
+        self,
+        user_id: str,
+        query: str,
+        platform: str,
+        budget: SearchBudget
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a search without the result cache; errors propagate so they are not cached.
+        """
+        query_embedding, video_ids, scores = await self._retrieve(user_id, query, budget)
+        if not video_ids:
+            return []
+        return await self._enrich_within(user_id, platform, query_embedding, video_ids, scores, budget)
+        
+    async def stream_search(
+        self,
+        user_id: str,
+        query: str,
+        platform: str = None,
+        budget: Optional[SearchBudget] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Search in stages, yielding events as each stage completes.
+        
+        Events, one per NDJSON line:
+            {"type": "preview", "results": [...]}: ranked results from the
+                in-memory indexes (id, title, url, thumbnail_url, platform,
+                relevance_score), before any database round trip
+            {"type": "results", "results": [...]}: final results, joined with
+                the database and with jump-to moments; same as search_videos
+            {"type": "done", "count": n, "elapsed_ms": t, "stages": [...], "skipped": [...]}
+            {"type": "error", "detail": "..."} if a stage fails
+        """
+        budget = budget or SearchBudget()
+        try:
+            query = query_embedding_service.normalize(query)
+            key = search_cache.key(user_id, query, platform, vector_store.generation)
+            results = search_cache.get(key)
             
-            if not similar_videos:
-                return []
+            if results is None:
+                query_embedding, video_ids, scores = await self._retrieve(user_id, query, budget)
+                yield {"type": "preview", "results": self._preview(platform, video_ids, scores)}
+                
+                results = []
+                if video_ids:
+                    results = await self._enrich_within(user_id, platform, query_embedding, video_ids, scores, budget)
+                if not budget.degraded:
+                    search_cache.put(key, results, time.perf_counter() - budget.started)
+            else:
+                budget.record("cache")
+                
+            yield {"type": "results", "results": results}
+            yield {"type": "done", "count": len(results), **budget.report()}
             
-            # Get video details from database
-            video_ids = [video_id for video_id, _ in similar_videos]
+        except Exception as e:
+            logger.error(f"Error in stream_search: {str(e)}")
+            yield {"type": "error", "detail": str(e)}
+        
+    async def search_page(
+        self,
+        user_id: str,
+        query: str,
+        platform: str = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Return one page of a search, continuing after `cursor`.
+        
+        Pages walk a global ranking ordered by (relevance score desc, video ID
+        asc). A video's relevance (text match points plus exact vector
+        similarity) does not depend on which other videos were retrieved, so
+        the ranking is the same on every request and the cursor only needs the
+        last (score, video ID) pair. Each page fetches the next similarity
+        window below the cursor and computes similarities only for the text
+        matches whose score bounds can place them on the page, so the vector
+        work of a deep page is about that of the first one; finding the text
+        matches is still a scan of the user's in-memory fields.
+        
+        The cursor is tied to the embedding model tag it was scored with;
+        after a switch to another model the client has to start over.
+        
+        Args:
+            user_id: ID of the user performing the search
+            query: Search query string
+            platform: Optional platform filter
+            limit: Page size
+            cursor: next_cursor of the previous page, or None for the first page
             
-            # Query Supabase for video details
-            result = self.db.table("videos").select("*").in_("id", video_ids).eq("user_id", user_id).execute()
+        Returns:
+            Dict with "results" (as search_videos) and "next_cursor" (None on the last page)
             
-            if not result.data:
-                return []
+        Raises:
+            ValueError: If the cursor is invalid or belongs to another search
+        """
+        query = query_embedding_service.normalize(query)
+        after = None
+        if cursor:
+            state = decode_cursor(cursor, settings.SEARCH_CURSOR_SECRET)
+            if (state.get("u"), state.get("q"), state.get("p")) != (user_id, query, platform):
+                raise ValueError("Cursor does not belong to this search")
+            if state.get("m") != vector_store.model:
+                raise ValueError("Search index changed models; start again from the first page")
+            after = (float(state["s"]), str(state["i"]))
             
-            # Sort videos by similarity score
-            video_scores = {video_id: score for video_id, score in similar_videos}
-            videos = sorted(
-                result.data,
-                key=lambda v: video_scores.get(v["id"], 0),
-                reverse=True
+        corrected, _ = trigram_index.expand(user_id, query)
+        query_embedding = await self._get_query_embedding(corrected)
+        page = await self._ranked_page(user_id, corrected, platform, query_embedding, limit, after)
+        if not page:
+            return {"results": [], "next_cursor": None}
+        
+        video_ids = [video_id for _, video_id in page]
+        scores = np.array([score for score, _ in page], dtype=np.float32)
+        results = await self._enrich(user_id, platform, query_embedding, video_ids, scores)
+        
+        next_cursor = None
+        if len(page) == limit:
+            last_score, last_id = page[-1]
+            next_cursor = encode_cursor(
+                {"u": user_id, "q": query, "p": platform, "m": vector_store.model, "s": last_score, "i": last_id},
+                settings.SEARCH_CURSOR_SECRET
             )
+        return {"results": results, "next_cursor": next_cursor}
+        
+    async def _ranked_page(
+        self,
+        user_id: str,
+        query: str,
+        platform: Optional[str],
+        query_embedding: np.ndarray,
+        limit: int,
+        after: Optional[Tuple[float, str]]
+    ) -> List[Tuple[float, str]]:
+        """The next `limit` (score, video ID) pairs of the global ranking after `after`."""
+        def allowed(score: float, video_id: str) -> bool:
+            if platform:
+                card = search_indexer.cards.get(video_id)
+                if card is None or card["platform"] != platform:
+                    return False
+            return after is None or score < after[0] or (score == after[0] and video_id > after[1])
             
-            return videos
+        # Videos matching the query text, with their exact vector similarity
+        text_ids, masks = relevance_scorer.match_all(user_id, query)
+        page = await self._text_page(text_ids, masks, query_embedding, limit, after, allowed)
+        
+        # Videos ranked by similarity alone, below the cursor's score
+        text_set = set(text_ids)
+        ceiling = None if after is None else after[0] / SIMILARITY_POINTS + 1e-6
+        want = limit + len(text_set)
+        while True:
+            similar_videos, exhausted = await vector_store.search_below(
+                query_embedding, k=want, user_id=user_id, ceiling=ceiling
+            )
+            similar_ids = [video_id for video_id, _ in similar_videos if video_id not in text_set]
+            similar_scores = combine(
+                np.zeros(len(similar_ids), dtype=np.uint8),
+                np.array([similarity for video_id, similarity in similar_videos if video_id not in text_set], dtype=np.float32)
+            )
+            similar = [
+                (score, video_id)
+                for score, video_id in zip(similar_scores.tolist(), similar_ids)
+                if allowed(score, video_id)
+            ]
+            if len(similar) >= limit or exhausted:
+                break
+            want *= 4
             
-        except Exception as e:
-            logger.error(f"Error in search_videos: {str(e)}")
-            return []
+        page.extend(similar)
+        page.sort(key=lambda entry: (-entry[0], entry[1]))
+        return page[:limit]
         
-    async def _get_query_embedding(self, query: str) -> List[float]:
+    async def _text_page(
+        self,
+        text_ids: List[str],
+        masks: np.ndarray,
+        query_embedding: np.ndarray,
+        limit: int,
+        after: Optional[Tuple[float, str]],
+        allowed
+    ) -> List[Tuple[float, str]]:
         """
-        Get embedding for a search query.
+        The best `limit` allowed text matches after `after`.
+        
+        A match scores its text points plus SIMILARITY_POINTS times a
+        similarity in [-1, 1], so its score is bounded before the similarity
+        is known. Matches that rank above the cursor whatever their similarity
+        are dropped, and the rest are scored best bound first, stopping once
+        no unscored match can beat the page.
         """
-        # TODO: Implement query embedding generation
-        # For now, return a dummy embedding
-        return [0.0] * 384  # Same dimension as video embeddings
+        if not text_ids:
+            return []
+        points = POINTS_BY_MASK[masks]
+        lower = np.minimum(points - SIMILARITY_POINTS, MAX_SCORE)
+        upper = np.minimum(points + SIMILARITY_POINTS, MAX_SCORE)
+        candidates = np.arange(len(text_ids))
+        if after is not None:
+            candidates = candidates[lower <= after[0]]
+        candidates = candidates[np.argsort(-upper[candidates], kind="stable")]
+        
+        page: List[Tuple[float, str]] = []
+        batch_size = max(limit, 64)
+        for start in range(0, len(candidates), batch_size):
+            if len(page) >= limit and page[limit - 1][0] > upper[candidates[start]]:
+                break
+            batch = candidates[start:start + batch_size]
+            batch_ids = [text_ids[i] for i in batch]
+            similarity_by_id = await vector_store.similarities(query_embedding, batch_ids)
+            similarities = np.array([similarity_by_id.get(video_id, 0.0) for video_id in batch_ids], dtype=np.float32)
+            page.extend(
+                (score, video_id)
+                for score, video_id in zip(combine(masks[batch], similarities).tolist(), batch_ids)
+                if allowed(score, video_id)
+            )
+            page.sort(key=lambda entry: (-entry[0], entry[1]))
+            del page[limit:]
+        return page
         
-    def _calculate_relevance_score(
+    async def _retrieve(
         self,
+        user_id: str,
         query: str,
-        similarity: float,
-        title: str,
-        search_summary: str,
-        visual_summary: str,
-        audio_transcription: str,
-        keywords: List[str],
-        metadata: Dict[str, Any]
-    ) -> tuple[float, Dict[str, Any]]:
-        """
-        Calculate relevance score and match details based on different criteria.
-        Internal use only - match details are not exposed to the frontend.
-        """
-        score = 0.0
-        query_lower = query.lower()
-        matches = {
-            MatchType.PERFECT: False,
-            MatchType.STRONG: False,
-            MatchType.PARTIAL: False,
-            MatchType.WEAK: False,
-            MatchType.LAST_RESORT: False
-        }
-        
-        # Perfect match (50 points) - title or search summary
-        if query_lower in title.lower() or query_lower in search_summary.lower():
-            score += 50
-            matches[MatchType.PERFECT] = True
-            
-        # Strong match - keywords (30 points)
-        if any(query_lower in keyword.lower() for keyword in keywords):
-            score += 30
-            matches[MatchType.STRONG] = True
-            
-        # Partial match - visual content (20 points)
-        if query_lower in visual_summary.lower():
-            score += 20
-            matches[MatchType.PARTIAL] = True
-            
-        # Weak match - transcription (10 points)
-        if query_lower in audio_transcription.lower():
-            score += 10
-            matches[MatchType.WEAK] = True
+        budget: SearchBudget
+    ) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """
+        Retrieve and score candidates using only in-memory indexes.
+        
+        Returns:
+            Tuple of (query embedding, candidate video IDs best first, their relevance scores)
+        """
+        # Correct typos against the user's vocabulary before retrieval
+        query, lexical_terms = trigram_index.expand(user_id, query)
+        
+        # Get query embedding
+        query_embedding = await self._get_query_embedding(query)
+        budget.record("embed")
+        
+        # Dense and lexical candidates, fused by rank
+        similar_videos = await self._vector_search(user_id, query_embedding, budget)
+        lexical_matches = lexical_index.search_terms(user_id, lexical_terms, k=self.candidate_count)
+        budget.record("lexical")
+        fused = reciprocal_rank_fusion([similar_videos, lexical_matches])[:self.candidate_count]
+        
+        if not fused:
+            return query_embedding, [], np.zeros(0, dtype=np.float32)
+        
+        # Score all candidates in one pass: text matches plus vector similarity
+        video_ids = [video_id for video_id, _ in fused]
+        similarity_by_id = dict(similar_videos)
+        similarities = np.array([similarity_by_id.get(video_id, 0.0) for video_id in video_ids], dtype=np.float32)
+        scores, _ = relevance_scorer.score(user_id, query, video_ids, similarities)
+        # Stable sort keeps the fused rank as the tie-breaker
+        order = np.argsort(-scores, kind="stable")
+        return query_embedding, [video_ids[i] for i in order], scores[order]
+        
+    async def _vector_search(
+        self,
+        user_id: str,
+        query_embedding: np.ndarray,
+        budget: SearchBudget
+    ) -> List[Tuple[str, float]]:
+        """
+        Vector candidates at the widest settings the budget allows.
+        
+        Wide IVF probing is given up first, then exact re-ranking; each
+        combination's cost is learned from earlier searches on this worker.
+        """
+        options = [(True, True), (False, True), (False, False)]
+        for wide, rerank in options:
+            stage = f"vector:{'wide' if wide else 'narrow'}:{'rerank' if rerank else 'approx'}"
+            if (wide, rerank) == options[-1] or budget.fits(stage_costs.estimate(stage)):
+                break
+            stage_costs.skipped(stage)
             
-        # Last resort - metadata (5 points)
-        if metadata and any(
-            query_lower in str(value).lower() 
-            for value in metadata.values()
-        ):
-            score += 5
-            matches[MatchType.LAST_RESORT] = True
+        started = time.perf_counter()
+        similar_videos = await vector_store.search(
+            query_embedding,
+            k=self.candidate_count,
+            user_id=user_id,
+            refine_factor=None if rerank else 1,
+            nprobe=None if wide else settings.SEARCH_DEGRADED_NPROBE
+        )
+        stage_costs.observe(stage, time.perf_counter() - started)
+        budget.record("vector")
+        budget.record("wide_probe", ran=wide)
+        budget.record("rerank", ran=rerank)
+        return similar_videos
+        
+    async def _enrich_within(
+        self,
+        user_id: str,
+        platform: str,
+        query_embedding: np.ndarray,
+        video_ids: List[str],
+        scores: np.ndarray,
+        budget: SearchBudget
+    ) -> List[Dict[str, Any]]:
+        """
+        _enrich when the database round trip fits the budget, else the in-memory cards.
+        """
+        if budget.fits(stage_costs.estimate("enrich")):
+            started = time.perf_counter()
+            try:
+                results = await asyncio.wait_for(
+                    self._enrich(user_id, platform, query_embedding, video_ids, scores),
+                    timeout=budget.timeout()
+                )
+                stage_costs.observe("enrich", time.perf_counter() - started)
+                budget.record("enrich")
+                return results
+            except asyncio.TimeoutError:
+                # At least this long; later searches skip it until the estimate decays
+                stage_costs.observe("enrich", time.perf_counter() - started)
+        else:
+            stage_costs.skipped("enrich")
             
-        # Vector similarity score (0-20 points)
-        similarity_score = 20 * similarity
-        score += similarity_score
-        
-        # Cap the final score at 100
-        final_score = min(score, 100.0)
-        
-        # Return both score and match details (for internal use)
-        return final_score, {
-            "matches": matches,
-            "similarity_score": similarity_score,
-            "total_score": final_score
-        }
+        budget.record("enrich", ran=False)
+        results = self._preview(platform, video_ids, scores)
+        moments = self._moments(query_embedding, [video["id"] for video in results])
+        for video in results:
+            video["moments"] = moments.get(video["id"], [])
+        return results
+        
+    def _preview(
+        self,
+        platform: str,
+        video_ids: List[str],
+        scores: np.ndarray
+    ) -> List[Dict[str, Any]]:
+        """Result cards from the search indexer's in-memory copy of each video."""
+        preview = []
+        for video_id, score in zip(video_ids, scores.tolist()):
+            card = search_indexer.cards.get(video_id)
+            if card is None or (platform and card["platform"] != platform):
+                continue
+            preview.append({**card, "relevance_score": round(score, 2)})
+        return preview
+        
+    async def _enrich(
+        self,
+        user_id: str,
+        platform: str,
+        query_embedding: np.ndarray,
+        video_ids: List[str],
+        scores: np.ndarray
+    ) -> List[Dict[str, Any]]:
+        """Join ranked candidates with their database rows and attach moments."""
+        rank = {video_id: position for position, video_id in enumerate(video_ids)}
+        relevance = {video_id: round(score, 2) for video_id, score in zip(video_ids, scores.tolist())}
+        
+        # Query Supabase for video details
+        query_builder = self.db.table("videos").select("*").in_("id", video_ids).eq("user_id", user_id).is_("deleted_at", "null")
+        if platform:
+            query_builder = query_builder.eq("platform", platform)
+        result = await query_builder.execute()
+        
+        if not result.data:
+            return []
+        
+        # Sort videos by relevance score
+        videos = sorted(result.data, key=lambda v: rank.get(v["id"], len(rank)))
+        # Jump-to offsets inside each result video
+        moments = self._moments(query_embedding, [video["id"] for video in videos])
+        for video in videos:
+            video["relevance_score"] = relevance.get(video["id"], 0.0)
+            video["moments"] = moments.get(video["id"], [])
+        
+        return videos
+        
+    def _moments(self, query_embedding: np.ndarray, video_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Segment moments, when the query was embedded with the model segments are stored with."""
+        if parse_tag(vector_store.model)[0] != MODEL_NAME:
+            return {}
+        return segment_index.moments(query_embedding, video_ids)
+        
+    async def _get_query_embedding(self, query: str) -> np.ndarray:
+        """
+        Get embedding for a search query (cached and batched, see QueryEmbeddingService).
+        
+        The query is embedded with the model of the vectors being searched.
+        """
+        model, _ = parse_tag(await vector_store.current_model())
+        return await query_embedding_service.embed(query, model)
 
 search_service = SearchService() 
\ No newline at end of file
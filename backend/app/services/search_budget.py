@@ -0,0 +1,68 @@
+import time
+from typing import Dict, List, Any, Optional
+from ..core.config import settings
+
+class StageCosts:
+    """Moving averages of how long each search stage takes on this worker."""
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.seconds: Dict[str, float] = {}
+
+    def observe(self, stage: str, seconds: float):
+        previous = self.seconds.get(stage)
+        self.seconds[stage] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+    def estimate(self, stage: str) -> float:
+        """Expected seconds for a stage; 0 until it has been observed once."""
+        return self.seconds.get(stage, 0.0)
+
+    def skipped(self, stage: str):
+        """Lower the estimate of a skipped stage so it is eventually retried and re-measured."""
+        if stage in self.seconds:
+            self.seconds[stage] *= 1 - self.alpha / 4
+
+stage_costs = StageCosts()
+
+class SearchBudget:
+    """
+    Time budget of one search and a record of the stages it ran.
+
+    SearchService asks the budget before each optional stage (wide IVF
+    probing, exact re-ranking, database enrichment) whether the stage's
+    expected cost still fits before the deadline, and skips it otherwise, so
+    a slow dependency degrades results instead of queueing requests.
+    """
+    def __init__(self, deadline_ms: Optional[float] = None):
+        if deadline_ms is None:
+            deadline_ms = settings.SEARCH_DEADLINE_MS
+        self.started = time.perf_counter()
+        self.deadline = None if not deadline_ms else self.started + deadline_ms / 1000
+        self.ran: List[str] = []
+        self.skipped: List[str] = []
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (infinite without one)."""
+        if self.deadline is None:
+            return float("inf")
+        return self.deadline - time.perf_counter()
+
+    def fits(self, seconds: float) -> bool:
+        return seconds <= self.remaining()
+
+    def timeout(self) -> Optional[float]:
+        """Remaining time for asyncio.wait_for, None without a deadline."""
+        return None if self.deadline is None else max(0.0, self.remaining())
+
+    def record(self, stage: str, ran: bool = True):
+        (self.ran if ran else self.skipped).append(stage)
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.skipped)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "stages": self.ran,
+            "skipped": self.skipped,
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 1)
+        }
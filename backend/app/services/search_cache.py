@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Tuple, Callable, Awaitable, Optional
+from ..core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+SearchKey = Tuple[str, str, Optional[str], int, int]
+
+class SearchResultCache:
+    """
+    Caches search results per (user, normalised query, platform, index generation).
+
+    Each key also carries the user's library version, which SearchIndexer bumps
+    whenever one of that user's videos is indexed or removed, so a change only
+    invalidates that user's entries. Concurrent identical searches share one
+    in-flight computation. Entries also expire after SEARCH_CACHE_TTL_SECONDS
+    to bound staleness from writes made by other workers.
+    """
+    def __init__(self):
+        self.max_size = settings.SEARCH_CACHE_SIZE
+        self.ttl = settings.SEARCH_CACHE_TTL_SECONDS
+
+        # key -> (expires_at, results, seconds it took to compute)
+        self._entries: "OrderedDict[SearchKey, Tuple[float, List[Dict[str, Any]], float]]" = OrderedDict()
+        self._pending: Dict[SearchKey, asyncio.Future] = {}
+        self._user_versions: Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.saved_seconds = 0.0
+
+    def key(self, user_id: str, normalized_query: str, platform: Optional[str], generation: int) -> SearchKey:
+        return (user_id, normalized_query, platform, generation, self._user_versions.get(user_id, 0))
+
+    def invalidate_user(self, user_id: str):
+        """Make every cached search of this user stale; entries age out of the LRU."""
+        self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+
+    async def get_or_compute(
+        self,
+        key: SearchKey,
+        compute: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        cache_if: Optional[Callable[[], bool]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return cached results for key, or compute them once for all concurrent callers.
+
+        Args:
+            key: Cache key from key()
+            compute: Coroutine function producing the results; failures are not cached
+            cache_if: Called after compute; results are only stored if it returns True
+
+        Returns:
+            Search results (a fresh list; the result dicts are shared)
+        """
+        results = self._lookup(key)
+        if results is not None:
+            return results
+
+        future = self._pending.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return list(await asyncio.shield(future))
+
+        self.misses += 1
+        future = self._pending[key] = asyncio.get_running_loop().create_future()
+        started = time.perf_counter()
+        try:
+            results = await compute()
+        except Exception as e:
+            self._pending.pop(key, None)
+            future.set_exception(e)
+            # Retrieve it so an unawaited future does not log a warning
+            future.exception()
+            raise
+        cost = time.perf_counter() - started
+
+        self._pending.pop(key, None)
+        future.set_result(results)
+        if cache_if is None or cache_if():
+            self.put(key, results, cost)
+        return list(results)
+
+    def get(self, key: SearchKey) -> Optional[List[Dict[str, Any]]]:
+        """Cached results for key, or None; for callers that compute in stages themselves."""
+        results = self._lookup(key)
+        if results is None:
+            self.misses += 1
+        return results
+
+    def put(self, key: SearchKey, results: List[Dict[str, Any]], cost: float):
+        """Store results that took `cost` seconds to compute."""
+        if key[4] != self._user_versions.get(key[0], 0):
+            # The user's library changed while computing
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, results, cost)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _lookup(self, key: SearchKey) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, results, cost = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.saved_seconds += cost
+        return list(results)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses + self.coalesced
+        return {
+            "cached_searches": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits + self.coalesced) / total if total else 0.0,
+            "saved_latency_seconds": round(self.saved_seconds, 3)
+        }
+
+search_cache = SearchResultCache()
@@ -0,0 +1,209 @@
+import asyncio
+import json
+from typing import Dict, Any, List, Optional
+from ..database import admin_db
+from .lexical_index import lexical_index
+from .relevance_scoring import relevance_scorer
+from .search_cache import search_cache
+from .autocomplete import autocomplete_index
+from .trigram_index import trigram_index
+from .segment_index import segment_index
+from .keyword_extractor import keyword_extractor
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Text fields the in-process search structures are built from
+DOCUMENT_FIELDS = "id,user_id,title,platform,url,thumbnail_url,video_analysis(search_summary,visual_summary,audio_transcription,keywords,metadata,deleted_at)"
+
+def _text(value: Any) -> str:
+    """Flatten a stored text field; audio_transcription may be a JSON object."""
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        return value.get("text") or ""
+    if isinstance(value, list):
+        return " ".join(str(item) for item in value)
+    return str(value)
+
+def _object_labels(visual_summary: Any) -> List[str]:
+    """Detected object labels from a visual summary ({"most_common_objects": [[label, count], ...]})."""
+    if isinstance(visual_summary, str):
+        try:
+            visual_summary = json.loads(visual_summary)
+        except ValueError:
+            return []
+    if not isinstance(visual_summary, dict):
+        return []
+    return [
+        str(item[0] if isinstance(item, (list, tuple)) else item)
+        for item in visual_summary.get("most_common_objects") or []
+    ]
+
+def build_search_document(video: Dict[str, Any], analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Normalize a video row and its analysis into the document the search indexes use.
+
+    Args:
+        video: Row from the videos table (id, user_id, title, platform, url, thumbnail_url)
+        analysis: Row from video_analysis, if the video has been analysed
+
+    Returns:
+        Dictionary with plain-text fields, keywords and detected object labels
+    """
+    analysis = analysis or {}
+    keywords = analysis.get("keywords") or []
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    object_labels = _object_labels(analysis.get("visual_summary"))
+    visual_summary = analysis.get("visual_summary")
+    if object_labels:
+        # Stored as JSON; match against the labels rather than the JSON text
+        visual_summary = " ".join(object_labels)
+    return {
+        "id": str(video["id"]),
+        "user_id": str(video["user_id"]),
+        "platform": video.get("platform"),
+        "url": video.get("url"),
+        "thumbnail_url": video.get("thumbnail_url"),
+        "title": _text(video.get("title")),
+        "search_summary": _text(analysis.get("search_summary")),
+        "visual_summary": _text(visual_summary),
+        "audio_transcription": _text(analysis.get("audio_transcription")),
+        "keywords": [str(keyword) for keyword in keywords],
+        "object_labels": object_labels,
+        "metadata": analysis.get("metadata") or {}
+    }
+
+class SearchIndexer:
+    """
+    Keeps the in-process search structures in step with the database.
+
+    Ingest, edit, delete and restore all go through this one hook, which fans
+    the normalized document out to every structure (the BM25 index, the
+    relevance scorer's pre-normalized fields, the autocomplete vocabulary and
+    the trigram typo index, plus the video's timestamped segments and the
+    corpus keyword statistics)
+    and invalidates the user's cached search results.
+    """
+    def __init__(self, page_size: int = 500):
+        self.page_size = page_size
+        self.owners: Dict[str, str] = {}  # video ID -> user ID of indexed videos
+        self.cards: Dict[str, Dict[str, Any]] = {}  # video ID -> fields a result preview shows
+
+    @staticmethod
+    def _update_keyword_statistics(documents: List[Dict[str, Any]]):
+        """
+        Count the documents' terms in the keyword extractor and prune their keywords.
+
+        Blocking SQLite work; callers run it off the event loop, one page at a time.
+        """
+        for document in documents:
+            text = " ".join(
+                document[field] for field in ("title", "search_summary", "visual_summary", "audio_transcription")
+            )
+            try:
+                keyword_extractor.add_document(document["id"], text)
+                # Rows stored before TF-IDF extraction carry every word as a keyword
+                document["keywords"] = keyword_extractor.prune(document["keywords"], text)
+            except Exception as e:
+                logger.error(f"Error updating keyword statistics for video {document['id']}: {str(e)}")
+
+    async def index_document(self, document: Dict[str, Any]):
+        """Add or replace one normalized document in every search structure."""
+        await asyncio.to_thread(self._update_keyword_statistics, [document])
+        self._add_to_indexes(document)
+
+    def _add_to_indexes(self, document: Dict[str, Any]):
+        """Add or replace a document whose keywords are already pruned in the in-process structures."""
+        lexical_index.add_document(document["user_id"], document["id"], {
+            "title": document["title"],
+            "keywords": document["keywords"],
+            "search_summary": document["search_summary"],
+            "audio_transcription": document["audio_transcription"]
+        })
+        relevance_scorer.add_document(document)
+        autocomplete_index.add_document(document)
+        trigram_index.add_document(document)
+        self.owners[document["id"]] = document["user_id"]
+        self.cards[document["id"]] = {
+            field: document[field] for field in ("id", "title", "url", "thumbnail_url", "platform")
+        }
+        search_cache.invalidate_user(document["user_id"])
+
+    def remove_video(self, video_id: str, user_id: Optional[str] = None):
+        """Drop a video from every search structure."""
+        segment_index.remove_video(video_id)
+        try:
+            keyword_extractor.remove_document(video_id)
+        except Exception as e:
+            logger.error(f"Error updating keyword statistics for video {video_id}: {str(e)}")
+        self.cards.pop(video_id, None)
+        user_id = self.owners.pop(video_id, user_id)
+        if user_id is not None:
+            lexical_index.remove_document(user_id, video_id)
+            relevance_scorer.remove_document(user_id, video_id)
+            autocomplete_index.remove_document(user_id, video_id)
+            trigram_index.remove_document(user_id, video_id)
+            search_cache.invalidate_user(user_id)
+
+    async def index_video(self, video_id: str):
+        """
+        Fetch a video and its analysis and (re)index it.
+
+        Called after ingest, edits and restores; a deleted or missing video is
+        removed instead.
+        """
+        try:
+            result = await (
+                admin_db.table("videos")
+                .select(DOCUMENT_FIELDS)
+                .eq("id", video_id)
+                .is_("deleted_at", "null")
+                .execute()
+            )
+            if not result.data:
+                self.remove_video(video_id)
+                return
+            await self.index_document(self._document_from_row(result.data[0]))
+            await segment_index.load_video(video_id)
+        except Exception as e:
+            logger.error(f"Error indexing video {video_id}: {str(e)}")
+
+    async def rebuild(self):
+        """Rebuild every search structure from the database using keyset pagination."""
+        lexical_index.clear()
+        relevance_scorer.clear()
+        autocomplete_index.clear()
+        trigram_index.clear()
+        self.owners = {}
+        self.cards = {}
+        last_id = None
+        indexed = 0
+        while True:
+            query = admin_db.table("videos").select(DOCUMENT_FIELDS).is_("deleted_at", "null")
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            result = await query.order("id").limit(self.page_size).execute()
+            if not result.data:
+                break
+            documents = [self._document_from_row(row) for row in result.data]
+            await asyncio.to_thread(self._update_keyword_statistics, documents)
+            for document in documents:
+                self._add_to_indexes(document)
+            indexed += len(result.data)
+            last_id = result.data[-1]["id"]
+            if len(result.data) < self.page_size:
+                break
+        logger.info(f"Search indexes built with {indexed} videos")
+        await segment_index.rebuild()
+
+    @staticmethod
+    def _document_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+        analyses: List[Dict[str, Any]] = row.get("video_analysis") or []
+        if isinstance(analyses, dict):
+            analyses = [analyses]
+        analysis = next((a for a in analyses if not a.get("deleted_at")), None)
+        return build_search_document(row, analysis)
+
+search_indexer = SearchIndexer()
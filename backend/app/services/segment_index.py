@@ -0,0 +1,356 @@
+import asyncio
+import re
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple
+from ..database import admin_db
+from ..core.config import settings
+from ..utils.embeddings import get_embeddings
+import logging
+
+logger = logging.getLogger(__name__)
+
+ISO_DURATION = re.compile(r"^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?$")
+WORDS_PER_SECOND = 2.5  # speaking rate used when the video duration is unknown
+KINDS = ["frame", "transcript"]
+
+def parse_duration(value: Any) -> Optional[float]:
+    """Duration in seconds from a number or an ISO 8601 duration such as "PT4M13S"."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = ISO_DURATION.match(value.strip())
+        if match and any(match.groups()):
+            days, hours, minutes, seconds = (float(part or 0) for part in match.groups())
+            return days * 86400 + hours * 3600 + minutes * 60 + seconds
+    return None
+
+def _frame_segments(frame_analysis: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    segments = []
+    for frame in frame_analysis or []:
+        labels = [obj["label"] for obj in frame.get("objects", []) if obj.get("label")]
+        if labels:
+            segments.append({
+                "kind": "frame",
+                "start_seconds": float(frame.get("timestamp") or 0),
+                "end_seconds": None,
+                "text": ", ".join(labels)
+            })
+    return segments
+
+def transcript_segments(transcription: Any, duration: Optional[float]) -> List[Dict[str, Any]]:
+    """Sentence segments, timed from ASR chunks when present, else estimated from word offsets."""
+    if not isinstance(transcription, dict):
+        return []
+    chunks = transcription.get("chunks")
+    if chunks:
+        return [
+            {
+                "kind": "transcript",
+                "start_seconds": float(chunk["timestamp"][0] or 0),
+                "end_seconds": float(chunk["timestamp"][1]) if chunk["timestamp"][1] is not None else None,
+                "text": chunk["text"].strip()
+            }
+            for chunk in chunks
+            if chunk.get("text", "").strip() and chunk.get("timestamp")
+        ]
+
+    sentences = transcription.get("sentences") or []
+    total_words = sum(len(sentence.split()) for sentence in sentences)
+    if not total_words:
+        return []
+    seconds_per_word = duration / total_words if duration else 1 / WORDS_PER_SECOND
+    segments = []
+    offset = 0
+    for sentence in sentences:
+        words = len(sentence.split())
+        segments.append({
+            "kind": "transcript",
+            "start_seconds": round(offset * seconds_per_word, 1),
+            "end_seconds": round((offset + words) * seconds_per_word, 1),
+            "text": sentence
+        })
+        offset += words
+    return segments
+
+def _fit(segments: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+    """Merge consecutive segments into windows so at most `budget` remain."""
+    if len(segments) <= budget:
+        return segments
+    if budget <= 0:
+        return []
+    size = -(-len(segments) // budget)
+    windows = []
+    for i in range(0, len(segments), size):
+        group = segments[i:i + size]
+        windows.append({
+            "kind": group[0]["kind"],
+            "start_seconds": group[0]["start_seconds"],
+            "end_seconds": group[-1]["end_seconds"],
+            "text": " ".join(segment["text"] for segment in group) if group[0]["kind"] == "transcript"
+                else "; ".join(segment["text"] for segment in group)
+        })
+    return windows
+
+def build_segments(
+    frame_analysis: List[Dict[str, Any]],
+    transcription: Any,
+    duration: Any,
+    max_segments: int
+) -> List[Dict[str, Any]]:
+    """
+    Split an analysed video into timestamped, searchable segments.
+
+    Args:
+        frame_analysis: Per-frame results from analyze_frames
+        transcription: Result of transcribe_video
+        duration: Video duration in seconds or as an ISO 8601 duration
+        max_segments: Cap per video; frames get at most half of it
+
+    Returns:
+        Segments with kind, start_seconds, end_seconds and text
+    """
+    frames = _frame_segments(frame_analysis)
+    transcript = transcript_segments(transcription, parse_duration(duration))
+    frames = _fit(frames, max_segments // 2 if transcript else max_segments)
+    transcript = _fit(transcript, max_segments - len(frames))
+    return frames + transcript
+
+class SegmentIndex:
+    """
+    In-memory index of video segments for jump-to-moment results.
+
+    Segment embeddings are stored as int8 with one float scale per row, a
+    quarter of the float32 size, and each video's segments are one contiguous
+    block of rows. Search first finds videos and then scores only the blocks
+    of the result videos, so the cost does not grow with the library.
+    """
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+        self.max_segments = settings.SEGMENTS_PER_VIDEO
+        self.min_score = 0.2  # below this a segment is not a useful moment
+        self.page_size = 1000
+        self._reset()
+
+    def _reset(self):
+        self.codes = np.zeros((0, self.dimension), dtype=np.int8)
+        self.scales = np.zeros(0, dtype=np.float32)
+        self.starts = np.zeros(0, dtype=np.float32)
+        self.kinds = np.zeros(0, dtype=np.uint8)
+        self.texts: List[str] = []
+        self.blocks: Dict[str, Tuple[int, int]] = {}  # video ID -> (first row, row count)
+        self.rows = 0
+        self.dead = 0
+
+    def _reserve(self, count: int):
+        needed = self.rows + count
+        if needed <= len(self.codes):
+            return
+        capacity = max(needed, 2 * len(self.codes), 1024)
+        for name in ("codes", "scales", "starts", "kinds"):
+            current = getattr(self, name)
+            grown = np.zeros((capacity,) + current.shape[1:], dtype=current.dtype)
+            grown[:self.rows] = current[:self.rows]
+            setattr(self, name, grown)
+
+    def put_video(self, video_id: str, segments: List[Dict[str, Any]], embeddings: np.ndarray):
+        """Replace a video's segments; embeddings are quantized to int8 per row."""
+        self.remove_video(video_id)
+        if not segments:
+            return
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        scales = np.maximum(np.abs(embeddings).max(axis=1), 1e-12) / 127
+        self._reserve(len(segments))
+        first = self.rows
+        end = first + len(segments)
+        self.codes[first:end] = np.round(embeddings / scales[:, None]).astype(np.int8)
+        self.scales[first:end] = scales
+        self.starts[first:end] = [segment["start_seconds"] for segment in segments]
+        self.kinds[first:end] = [KINDS.index(segment["kind"]) for segment in segments]
+        self.texts[first:end] = [segment["text"] for segment in segments]
+        self.blocks[video_id] = (first, len(segments))
+        self.rows = end
+
+    def remove_video(self, video_id: str):
+        block = self.blocks.pop(video_id, None)
+        if block is None:
+            return
+        self.dead += block[1]
+        if self.dead > 1024 and self.dead > self.rows // 2:
+            self._compact()
+
+    def _compact(self):
+        """Close the gaps left by removed videos."""
+        order = [(video_id, first, count) for video_id, (first, count) in self.blocks.items()]
+        rows = np.concatenate([np.arange(first, first + count) for _, first, count in order]) if order else np.zeros(0, dtype=np.int64)
+        self.codes = self.codes[rows]
+        self.scales = self.scales[rows]
+        self.starts = self.starts[rows]
+        self.kinds = self.kinds[rows]
+        self.texts = [self.texts[row] for row in rows.tolist()]
+        self.blocks = {}
+        position = 0
+        for video_id, _, count in order:
+            self.blocks[video_id] = (position, count)
+            position += count
+        self.rows = position
+        self.dead = 0
+
+    def moments(
+        self,
+        query_embedding: np.ndarray,
+        video_ids: List[str],
+        per_video: int = 3
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Best-matching moments inside each of the given videos.
+
+        Args:
+            query_embedding: Normalized query vector
+            video_ids: Videos to look inside (already filtered to the user)
+            per_video: Maximum moments per video
+
+        Returns:
+            Video ID -> moments (start_seconds, kind, text, score), best first
+        """
+        blocks = [(video_id, self.blocks[video_id]) for video_id in video_ids if video_id in self.blocks]
+        if not blocks:
+            return {}
+        rows = np.concatenate([np.arange(first, first + count) for _, (first, count) in blocks])
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        scores = (self.codes[rows].astype(np.float32) @ query) * self.scales[rows]
+
+        results = {}
+        offset = 0
+        for video_id, (_, count) in blocks:
+            block_scores = scores[offset:offset + count]
+            best = np.argsort(-block_scores, kind="stable")[:per_video]
+            moments = []
+            for i in best.tolist():
+                if block_scores[i] < self.min_score:
+                    break
+                row = int(rows[offset + i])
+                moments.append({
+                    "start_seconds": float(self.starts[row]),
+                    "kind": KINDS[self.kinds[row]],
+                    "text": self.texts[row][:200],
+                    "score": round(float(block_scores[i]), 4)
+                })
+            if moments:
+                results[video_id] = moments
+            offset += count
+        return results
+
+    async def ingest(
+        self,
+        video_id: str,
+        frame_analysis: List[Dict[str, Any]],
+        transcription: Any,
+        duration: Any,
+        windows: Optional[List[Dict[str, Any]]] = None,
+        window_embeddings: Optional[np.ndarray] = None
+    ) -> int:
+        """
+        Build, embed and store a processed video's segments.
+
+        The rows replace earlier ones in video_segments atomically
+        (replace_video_segments) and are picked up by the in-memory index through SearchIndexer.index_video.
+
+        Args:
+            windows: Timed transcript windows from the document embedder; when
+                given they replace the sentence segments and their vectors are
+                stored as they are instead of being encoded again
+            window_embeddings: Vectors of `windows`, one row each
+
+        Returns:
+            Number of segments stored
+        """
+        timed = [
+            i for i, window in enumerate(windows or [])
+            if window["kind"] == "transcript" and window["start_seconds"] is not None
+        ]
+        if timed:
+            frames = _fit(_frame_segments(frame_analysis), self.max_segments // 2)
+            keep = np.linspace(0, len(timed) - 1, min(len(timed), self.max_segments - len(frames))).round().astype(int)
+            rows = [timed[i] for i in keep]
+            segments = frames + [windows[i] for i in rows]
+        else:
+            segments = build_segments(frame_analysis, transcription, duration, self.max_segments)
+        if not segments:
+            await self._replace(video_id, [])
+            return 0
+        if timed:
+            embeddings = np.asarray(window_embeddings, dtype=np.float32)[rows]
+            if frames:
+                frame_embeddings = await asyncio.to_thread(get_embeddings, [segment["text"] for segment in frames])
+                embeddings = np.vstack([frame_embeddings, embeddings])
+        else:
+            embeddings = await asyncio.to_thread(get_embeddings, [segment["text"] for segment in segments])
+        rows = [
+            {**segment, "video_id": video_id, "embedding": embedding.tolist()}
+            for segment, embedding in zip(segments, embeddings)
+        ]
+        await self._replace(video_id, rows)
+        return len(rows)
+
+    async def _replace(self, video_id: str, rows: List[Dict[str, Any]]):
+        """Swap a video's stored segments for `rows` in one transaction."""
+        await admin_db.rpc("replace_video_segments", {
+            "target_video_id": video_id,
+            "segments": rows
+        }).execute()
+
+    async def load_video(self, video_id: str):
+        """(Re)load one video's segments from the database."""
+        result = await (
+            admin_db.table("video_segments")
+            .select("kind,start_seconds,text,embedding")
+            .eq("video_id", video_id)
+            .order("start_seconds")
+            .execute()
+        )
+        self._put_rows(video_id, result.data or [])
+
+    async def rebuild(self):
+        """Load every live video's segments using keyset pagination on id."""
+        self._reset()
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        last_id = None
+        while True:
+            query = (
+                admin_db.table("video_segments")
+                .select("id,video_id,kind,start_seconds,text,embedding,videos!inner(deleted_at)")
+                .is_("videos.deleted_at", "null")
+            )
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            result = await query.order("id").limit(self.page_size).execute()
+            if not result.data:
+                break
+            for row in result.data:
+                grouped.setdefault(str(row["video_id"]), []).append(row)
+            last_id = result.data[-1]["id"]
+            if len(result.data) < self.page_size:
+                break
+        for video_id, rows in grouped.items():
+            rows.sort(key=lambda row: row["start_seconds"])
+            self._put_rows(video_id, rows)
+        logger.info(f"Segment index built with {self.rows} segments from {len(self.blocks)} videos")
+
+    def _put_rows(self, video_id: str, rows: List[Dict[str, Any]]):
+        segments = []
+        embeddings = []
+        for row in rows:
+            embedding = row["embedding"]
+            if isinstance(embedding, str):
+                embedding = np.fromstring(embedding.strip("[]"), dtype=np.float32, sep=",")
+            embedding = np.asarray(embedding, dtype=np.float32)
+            if embedding.shape != (self.dimension,):
+                continue
+            segments.append(row)
+            embeddings.append(embedding)
+        if segments:
+            self.put_video(video_id, segments, np.stack(embeddings))
+        else:
+            self.remove_video(video_id)
+
+segment_index = SegmentIndex()
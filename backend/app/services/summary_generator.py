@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional
 import json
 from pydantic import BaseModel
+from .keyword_extractor import keyword_extractor
 
 class VideoAnalysisData(BaseModel):
     title: str
@@ -18,14 +19,9 @@ class SearchableSummary(BaseModel):
     search_summary: str
     raw_data: Dict  # Stores all original data for future reference
 
-def extract_keywords(text: str) -> List[str]:
-    """Extract important keywords from text while removing common words."""
-    # TODO: Implement more sophisticated keyword extraction
-    # For now, just split and lowercase unique words
-    words = set(word.lower() for word in text.split())
-    # Remove common words
-    common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'is', 'are'}
-    return list(words - common_words)
+def extract_keywords(text: str, limit: Optional[int] = None) -> List[str]:
+    """Extract the most discriminative terms of a text by TF-IDF over the indexed corpus."""
+    return keyword_extractor.extract(text, limit)
 
 def generate_visual_summary(visual_analysis: List[Dict]) -> str:
     """Generate a human-readable summary from visual analysis results."""
@@ -80,27 +76,16 @@ def generate_searchable_summary(
     # Create a condensed audio summary (first 200 characters for quick reference)
     audio_summary = audio_transcription[:200] + "..." if len(audio_transcription) > 200 else audio_transcription
     
-    # Collect keywords from all sources
-    keywords = set()
-    
-    # Add keywords from title
-    keywords.update(extract_keywords(title))
-    
-    # Add keywords from metadata
-    if 'tags' in metadata:
-        keywords.update(metadata['tags'])
-    if 'description' in metadata:
-        keywords.update(extract_keywords(metadata['description']))
-    
-    # Add keywords from visual analysis
+    # Rank the text by TF-IDF the same way ingest does, then add tags and
+    # detected objects and keep the most discriminative of the lot
+    text = f"{title}. {metadata.get('description', '')} {audio_transcription}"
+    keywords = extract_keywords(text)
+    keywords.extend(metadata.get('tags') or [])
     for frame in visual_analysis:
-        if 'objects' in frame:
-            keywords.update(frame['objects'])
+        keywords.extend(frame.get('objects') or [])
         if 'scene' in frame:
-            keywords.add(frame['scene'])
-    
-    # Add keywords from transcription
-    keywords.update(extract_keywords(audio_transcription))
+            keywords.append(frame['scene'])
+    keywords = keyword_extractor.prune(list(dict.fromkeys(str(keyword) for keyword in keywords)), text)
     
     # Create a comprehensive search summary
     search_summary = f"{title}. {visual_summary}. {audio_summary}"
@@ -117,7 +102,7 @@ def generate_searchable_summary(
         platform=platform,
         visual_summary=visual_summary,
         audio_summary=audio_summary,
-        keywords=list(keywords),
+        keywords=keywords,
         search_summary=search_summary,
         raw_data=raw_data
     ) 
\ No newline at end of file
@@ -0,0 +1,196 @@
+import numpy as np
+from array import array
+from typing import Dict, List, Tuple, Any, Optional
+from .lexical_index import tokenize
+
+def trigrams(term: str) -> List[str]:
+    """Character trigrams of a term padded with one boundary marker each side."""
+    padded = f"${term}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance between a and b, or limit + 1 once it must exceed limit.
+
+    Only the diagonal band of width 2 * limit + 1 is computed.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    over = limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        low = i - limit if i > limit else 1
+        high = i + limit if i + limit < len(b) else len(b)
+        current = [over] * (len(b) + 1)
+        if low == 1:
+            current[0] = i
+        best = current[0]
+        left = current[low - 1]
+        for j in range(low, high + 1):
+            value = previous[j - 1] if char_a == b[j - 1] else previous[j - 1] + 1
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if left + 1 < value:
+                value = left + 1
+            current[j] = left = value
+            if value < best:
+                best = value
+        if best > limit:
+            return over
+        previous = current
+    return previous[len(b)] if previous[len(b)] < over else over
+
+class _UserVocabulary:
+    """One user's terms with trigram postings (compact arrays of term IDs)."""
+    def __init__(self):
+        self.terms: List[str] = []  # term ID -> term
+        self.lengths = array("H")  # term ID -> term length
+        self.term_id: Dict[str, int] = {}  # live terms only
+        self.frequency: Dict[str, int] = {}  # term -> videos containing it
+        self.postings: Dict[str, array] = {}  # trigram -> term IDs
+        self.contributions: Dict[str, List[str]] = {}  # video ID -> its terms
+        self.dead = 0
+
+    def add(self, video_id: str, terms: List[str]):
+        self.remove(video_id)
+        self.contributions[video_id] = terms
+        for term in terms:
+            if term not in self.term_id:
+                term_id = self.term_id[term] = len(self.terms)
+                self.terms.append(term)
+                self.lengths.append(len(term))
+                for gram in set(trigrams(term)):
+                    self.postings.setdefault(gram, array("I")).append(term_id)
+            self.frequency[term] = self.frequency.get(term, 0) + 1
+
+    def remove(self, video_id: str):
+        for term in self.contributions.pop(video_id, []):
+            remaining = self.frequency[term] - 1
+            if remaining:
+                self.frequency[term] = remaining
+            else:
+                # Postings keep the stale ID until the next compaction
+                del self.frequency[term]
+                del self.term_id[term]
+                self.dead += 1
+        if self.dead > 64 and self.dead > len(self.term_id):
+            self._compact()
+
+    def _compact(self):
+        live = list(self.term_id)
+        self.terms = live
+        self.lengths = array("H", map(len, live))
+        self.term_id = {term: term_id for term_id, term in enumerate(live)}
+        self.postings = {}
+        for term_id, term in enumerate(live):
+            for gram in set(trigrams(term)):
+                self.postings.setdefault(gram, array("I")).append(term_id)
+        self.dead = 0
+
+    def candidates(self, token: str, max_distance: int, limit: int) -> List[Tuple[str, int]]:
+        """Terms within max_distance of token as (term, distance), closest and most frequent first."""
+        grams = set(trigrams(token))
+        lists = [np.frombuffer(self.postings[gram], dtype=np.uint32) for gram in grams if gram in self.postings]
+        if not lists:
+            return []
+        # Work only on terms that share a trigram, never the whole vocabulary
+        ids, shared = np.unique(np.concatenate(lists), return_counts=True)
+        lengths = np.frombuffer(self.lengths, dtype=np.uint16)[ids].astype(np.int32)
+        # Each edit changes at most three trigrams
+        needed = max(1, len(grams) - 3 * max_distance)
+        keep = (shared >= needed) & (np.abs(lengths - len(token)) <= max_distance)
+        ids, shared = ids[keep], shared[keep]
+        # Verify the terms sharing the most trigrams first; verification is exact
+        ids = ids[np.argsort(-shared, kind="stable")][:limit * 4]
+
+        matches = []
+        for term_id in ids.tolist():
+            term = self.terms[term_id]
+            # A removed and re-added term keeps its stale ID until compaction
+            if self.term_id.get(term) != term_id:
+                continue
+            distance = bounded_edit_distance(token, term, max_distance)
+            if distance <= max_distance:
+                matches.append((term, distance))
+                if len(matches) == limit:
+                    break
+        matches.sort(key=lambda match: (match[1], -self.frequency[match[0]]))
+        return matches[:limit]
+
+class TrigramIndex:
+    """
+    Per-user typo tolerance: expands misspelled query tokens to known terms.
+
+    The vocabulary is the title words and keywords of the user's videos, plus
+    the words of their search summaries; SearchIndexer keeps it
+    current. A trigram filter narrows the vocabulary to a few candidates,
+    which are then verified with a banded edit distance.
+    """
+    def __init__(self, limit: int = 3):
+        self.limit = limit  # expansions per misspelled token
+        self.users: Dict[str, _UserVocabulary] = {}
+
+    @staticmethod
+    def max_distance(token: str) -> int:
+        """Allowed edits: none for very short tokens, one up to 5 characters, else two."""
+        if len(token) < 4:
+            return 0
+        return 1 if len(token) <= 5 else 2
+
+    @staticmethod
+    def _terms(document: Dict[str, Any]) -> List[str]:
+        words = set(tokenize(document["title"]))
+        for keyword in document["keywords"]:
+            words.update(tokenize(keyword))
+        words.update(tokenize(document["search_summary"]))
+        return sorted(word for word in words if len(word) >= 3 and not word.isdigit())
+
+    def add_document(self, document: Dict[str, Any]):
+        self.users.setdefault(document["user_id"], _UserVocabulary()).add(
+            document["id"], self._terms(document)
+        )
+
+    def remove_document(self, user_id: str, video_id: str):
+        vocabulary = self.users.get(user_id)
+        if vocabulary is not None:
+            vocabulary.remove(video_id)
+            if not vocabulary.contributions:
+                del self.users[user_id]
+
+    def clear(self):
+        self.users = {}
+
+    def expand(self, user_id: str, query: str) -> Tuple[str, List[str]]:
+        """
+        Correct unknown query tokens against the user's vocabulary.
+
+        Args:
+            user_id: ID of the user searching
+            query: Normalised query
+
+        Returns:
+            Tuple of (query with each unknown token replaced by its best
+            candidate, all tokens plus every candidate for lexical retrieval)
+        """
+        vocabulary: Optional[_UserVocabulary] = self.users.get(user_id)
+        tokens = tokenize(query)
+        if vocabulary is None:
+            return query, tokens
+
+        corrected = []
+        expanded = list(tokens)
+        for token in tokens:
+            distance = self.max_distance(token)
+            if token in vocabulary.term_id or not distance:
+                corrected.append(token)
+                continue
+            matches = vocabulary.candidates(token, distance, self.limit)
+            corrected.append(matches[0][0] if matches else token)
+            expanded.extend(term for term, _ in matches)
+        if corrected == tokens:
+            return query, tokens
+        return " ".join(corrected), expanded
+
+trigram_index = TrigramIndex()
@@ -0,0 +1,95 @@
+from abc import ABC, abstractmethod
+import numpy as np
+from typing import Dict, List, Tuple, Optional
+from ..utils.embeddings import model_tag
+
+class VectorBackend(ABC):
+    """
+    Interface shared by the k-NN backends behind `vector_store`.
+
+    Selected with VECTOR_BACKEND: "faiss" keeps an in-process index
+    (VectorStore), "pgvector" pushes the query down into Postgres
+    (PgVectorStore) so small deployments hold no index in memory.
+    """
+
+    @property
+    def generation(self) -> int:
+        """Identifier of the index state searches run against."""
+        return 0
+
+    @property
+    def model(self) -> str:
+        """Tag of the embedding model whose vectors searches run against."""
+        return model_tag()
+
+    async def current_model(self) -> str:
+        """The model tag query embeddings must be made with, refreshed if needed."""
+        return self.model
+
+    @abstractmethod
+    async def initialize(self):
+        """Prepare the backend for searching."""
+
+    @abstractmethod
+    async def search(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 50,
+        user_id: Optional[str] = None,
+        refine_factor: Optional[int] = None,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Return up to k (video_id, similarity) pairs, best first.
+
+        When user_id is given only that user's non-deleted videos are returned.
+        refine_factor and nprobe override the backend's re-ranking over-fetch
+        and the number of index lists scanned; a deadline-bound search lowers
+        them to trade recall for latency.
+        """
+
+    @abstractmethod
+    async def search_below(
+        self,
+        query_embedding: np.ndarray,
+        k: int,
+        user_id: Optional[str] = None,
+        ceiling: Optional[float] = None
+    ) -> Tuple[List[Tuple[str, float]], bool]:
+        """
+        Return the k most similar videos whose similarity is at most `ceiling`.
+
+        Used by cursor paging to fetch only the next window of a ranking, so
+        it must not cap how deep the ranking goes.
+
+        Returns:
+            Tuple of ((video_id, similarity) pairs best first, whether no
+            further videos exist below the window)
+        """
+
+    @abstractmethod
+    async def similarities(
+        self,
+        query_embedding: np.ndarray,
+        video_ids: List[str]
+    ) -> Dict[str, float]:
+        """Exact similarity of the query to specific videos; missing videos are omitted."""
+
+    @abstractmethod
+    async def add_embedding(
+        self,
+        video_id: str,
+        embedding: np.ndarray,
+        user_id: Optional[str] = None,
+        model: Optional[str] = None
+    ):
+        """
+        Make a newly stored embedding searchable.
+
+        model is the tag the vector was made with; vectors of a tag other
+        than the one being searched (e.g. a migration target) are ignored.
+        """
+
+    @abstractmethod
+    async def remove_embedding(self, video_id: str):
+        """Stop returning a video from searches."""
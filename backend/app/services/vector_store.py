@@ -1,16 +1,33 @@
+import os
+import time
+import asyncio
+import contextlib
 import faiss
 import numpy as np
-from typing import List, Tuple, Dict, Any
-from ..database import supabase
+from typing import List, Tuple, Dict, Any, Optional, AsyncIterator
+from ..database import admin_db
+from ..core.config import settings
+from .exact_reranker import ExactReranker
+from .index_snapshot import IndexSnapshot, SnapshotPublisher, SnapshotReader
+from .id_map import IdMap
+from .vector_backend import VectorBackend
+from .embedding_store import embedding_store
+from ..utils.embeddings import model_tag
 import logging
 
 logger = logging.getLogger(__name__)
 
-class VectorStore:
+class VectorStore(VectorBackend):
+    """
+    In-process FAISS index over video embeddings.
+    
+    With VECTOR_INDEX_ROLE=writer a single index-builder process owns the index
+    and publishes immutable generations to VECTOR_STORE_DIR; uvicorn workers run
+    as readers that memory-map the latest generation and swap to new ones
+    without locking. The default "standalone" role builds a private index.
+    """
     def __init__(self):
         self.dimension = 384  # dimension of all-MiniLM-L6-v2 embeddings
-        self.index = None
-        self.id_map: Dict[int, str] = {}  # Maps FAISS index to video IDs
         
         # PQ parameters
         self.nlist = 100  # number of clusters (centroids)
@@ -18,62 +35,253 @@ class VectorStore:
         self.M = 8  # number of sub-vectors (must divide dimension)
         self.nbits = 8  # bits per code (8 = 256 centroids per sub-quantizer)
         
+        # Bulk load parameters
+        self.page_size = 1000  # embeddings fetched per PostgREST request
+        self.add_chunk_size = 16384  # vectors added to FAISS per call
+        self.train_sample_size = 39 * 2 ** self.nbits  # ~39 points per PQ centroid
+        self.min_train_points = max(self.nlist, 2 ** self.nbits)  # below this use a flat index
+        self.exact_owner_limit = 2048  # libraries up to this size are scanned exactly instead of via IVF
+        self.range_margin = 0.05  # initial slack for PQ score error around range-search windows
+        self.range_gap = 0.05  # initial similarity width of a paging window
+        
+        # Exact re-ranking: PQ scores are coarse, so over-fetch k * refine_factor
+        # candidates and re-score them against full-precision vectors
+        self.refine_factor = max(1, settings.VECTOR_REFINE_FACTOR)
+        self.vectors_path = os.path.join(settings.VECTOR_STORE_DIR, "vectors.f16")
+        
+        # Current generation: index, id map (FAISS id -> video ID) and vectors
+        self.snapshot = IndexSnapshot(
+            generation=0,
+            index=None,
+            id_map=IdMap(),
+            reranker=ExactReranker(self.vectors_path, self.dimension),
+            model=model_tag()
+        )
+        
+        # Snapshot sharing across worker processes
+        self.role = settings.VECTOR_INDEX_ROLE
+        self.publisher = SnapshotPublisher(settings.VECTOR_STORE_DIR)
+        self.reader = SnapshotReader(settings.VECTOR_STORE_DIR)
+        self._follow_task = None
+        self._publish_task = None
+        # Serializes changes to the working generation with publishes and with
+        # searches that run on it in worker threads (FAISS releases the GIL)
+        self._write_lock = asyncio.Lock()
+        
+    @property
+    def index(self) -> Optional[faiss.Index]:
+        return self.snapshot.index
+        
+    @property
+    def id_map(self) -> IdMap:
+        return self.snapshot.id_map
+        
+    @property
+    def generation(self) -> int:
+        """Identifier of the index generation searches currently run against."""
+        return self.snapshot.generation
+        
+    @property
+    def model(self) -> str:
+        """
+        Tag of the embedding model of the current generation.
+        
+        The tag travels with the generation, so a switch to a new model is
+        atomic: queries are embedded with whichever model built the index
+        they are about to search.
+        """
+        return self.snapshot.model or model_tag()
+        
     async def initialize(self):
-        """Initialize FAISS index with existing embeddings from database."""
+        """
+        Initialize the index for this process's role.
+        
+        Readers load the latest published generation and follow new ones;
+        standalone and writer processes build from the database, and writers
+        publish the result for readers.
+        """
+        if self.role == "reader":
+            await self._load_published()
+            if self._follow_task is None:
+                self._follow_task = asyncio.create_task(self._follow_published())
+            return
+            
+        await self.rebuild()
+        if self.role == "writer":
+            await self.publish()
+            
+    async def rebuild(self, model: Optional[str] = None):
+        """
+        Build FAISS index by streaming existing embeddings from database.
+        
+        Only vectors of one model tag are indexed: `model`, or else the
+        active tag in embedding_models.
+        
+        Embeddings are keyset-paginated by video_embeddings.id and decoded straight
+        into a preallocated page buffer, so peak memory is one page plus the
+        training sample rather than the whole corpus as JSON and Python lists.
+        IVF and PQ are trained in a worker thread on a random sample drawn from
+        the full-precision matrix once every page has arrived, so the codebooks
+        reflect the whole corpus rather than its oldest vectors.
+        """
         try:
-            # Create base quantizer
-            quantizer = faiss.IndexFlatIP(self.dimension)
-            
-            # Create IVF index with Product Quantization
-            self.index = faiss.IndexIVFPQ(
-                quantizer,
-                self.dimension,
-                self.nlist,
-                self.M,
-                self.nbits
-            )
+            tag = model or await embedding_store.active_tag()
+            catalog = await embedding_store.model(tag)
+            if catalog is not None:
+                self.dimension = catalog["dimension"]
+            total = await self._count_embeddings(tag)
             
-            # Get all embeddings from database
-            result = supabase.table("video_analysis").select("video_id,embedding").execute()
-            if not result.data:
-                return
-                
-            # Build index
-            embeddings = []
-            self.id_map = {}
-            
-            for idx, record in enumerate(result.data):
-                if not record.get('embedding'):
-                    continue
-                embedding = np.array(record['embedding'], dtype=np.float32)
-                embeddings.append(embedding)
-                self.id_map[idx] = str(record['video_id'])
-                
-            if embeddings:
-                embeddings_array = np.vstack(embeddings)
-                
-                # Train the index
-                logger.info("Training FAISS index...")
-                self.index.train(embeddings_array)
-                
-                # Add vectors to the index
-                logger.info("Adding vectors to FAISS index...")
-                self.index.add(embeddings_array)
-                
-                # Set search parameters
-                self.index.nprobe = self.nprobe
+            index = self._create_index(total)
+            id_map = IdMap(total)
+            reranker = ExactReranker(self.vectors_path + ".building", self.dimension)
+            reranker.reset(total)
+            
+            needs_training = not index.is_trained
+            rows = 0  # rows streamed into the full-precision matrix
+            added = 0  # rows added to the FAISS index
+            
+            page = np.empty((self.page_size, self.dimension), dtype=np.float32)
+            async for video_ids, owner_ids, count in self._stream_embeddings(page, tag):
+                id_map.extend(video_ids, owner_ids)
+                reranker.put(rows, page[:count])
+                rows += count
                 
-                logger.info(f"Index built with {len(embeddings)} vectors")
-                logger.info(f"Index size: {self.index.size() / 1024 / 1024:.2f} MB")
+                if not needs_training:
+                    added = await self._add_rows(index, reranker, added, rows)
+                    
+            if needs_training:
+                if rows != total:
+                    # The corpus changed since it was counted; size the index for what arrived
+                    index = self._create_index(rows)
+                if not index.is_trained:
+                    # Pages arrive in video_embeddings.id (insertion) order, so a
+                    # prefix would be the oldest vectors; sample the whole corpus
+                    train_size = min(rows, self.train_sample_size)
+                    positions = np.sort(np.random.default_rng().choice(rows, train_size, replace=False))
+                    sample = np.asarray(reranker.vectors[positions], dtype=np.float32)
+                    logger.info(f"Training FAISS index on {train_size} sampled vectors...")
+                    await asyncio.to_thread(index.train, sample)
+            added = await self._add_rows(index, reranker, added, rows)
+            
+            if hasattr(index, "nprobe"):
+                index.nprobe = self.nprobe
+            reranker.flush()
+            os.replace(reranker.path, self.vectors_path)
+            reranker.path = self.vectors_path
+            
+            # Swap in the new generation only once it is complete
+            self.snapshot = IndexSnapshot(time.time_ns(), index, id_map, reranker, tag)
+            
+            logger.info(f"Index built with {index.ntotal} {tag} vectors")
                 
         except Exception as e:
             logger.error(f"Error initializing vector store: {str(e)}")
             raise
+            
+    def _create_index(self, total: int) -> faiss.Index:
+        """Create an empty index suited to the corpus size."""
+        if total < self.min_train_points:
+            # Too few vectors to train IVF centroids and PQ codebooks;
+            # exact search is both cheaper and better at this size
+            return faiss.IndexFlatIP(self.dimension)
+            
+        # Create base quantizer
+        quantizer = faiss.IndexFlatIP(self.dimension)
+        
+        # Create IVF index with Product Quantization
+        return faiss.IndexIVFPQ(
+            quantizer,
+            self.dimension,
+            self.nlist,
+            self.M,
+            self.nbits,
+            faiss.METRIC_INNER_PRODUCT
+        )
+        
+    async def _add_rows(
+        self,
+        index: faiss.Index,
+        reranker: ExactReranker,
+        start: int,
+        end: int
+    ) -> int:
+        """Add rows [start, end) to the index in bounded chunks; returns end."""
+        for chunk_start in range(start, end, self.add_chunk_size):
+            chunk_end = min(chunk_start + self.add_chunk_size, end)
+            chunk = np.asarray(reranker.vectors[chunk_start:chunk_end], dtype=np.float32)
+            await asyncio.to_thread(index.add, chunk)
+        return end
+        
+    async def _count_embeddings(self, tag: str) -> int:
+        """Count indexable embeddings so the matrix can be preallocated."""
+        result = await (
+            admin_db.table("video_embeddings")
+            .select("id,videos!inner(user_id)", count="exact")
+            .eq("model", tag)
+            .is_("videos.deleted_at", "null")
+            .limit(1)
+            .execute()
+        )
+        return result.count or 0
+        
+    async def _stream_embeddings(
+        self,
+        page: np.ndarray,
+        tag: str
+    ) -> AsyncIterator[Tuple[List[str], List[str], int]]:
+        """
+        Stream one model tag's embeddings page by page using keyset pagination on id.
+        
+        Each page is decoded into `page` in place; yields the video IDs and
+        owner user IDs of the decoded rows and how many rows of `page` are valid.
+        """
+        last_id = None
+        while True:
+            query = (
+                admin_db.table("video_embeddings")
+                .select("id,video_id,embedding,videos!inner(user_id)")
+                .eq("model", tag)
+                .is_("videos.deleted_at", "null")
+            )
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            result = await query.order("id").limit(len(page)).execute()
+            if not result.data:
+                return
+                
+            video_ids = []
+            owner_ids = []
+            for record in result.data:
+                if self._decode_embedding(record["embedding"], page[len(video_ids)]):
+                    video_ids.append(str(record["video_id"]))
+                    owner_ids.append(str(record["videos"]["user_id"]))
+                else:
+                    logger.warning(f"Skipping malformed embedding for video {record['video_id']}")
+            last_id = result.data[-1]["id"]
+            
+            if video_ids:
+                yield video_ids, owner_ids, len(video_ids)
+            if len(result.data) < len(page):
+                return
+                
+    def _decode_embedding(self, value: Any, out: np.ndarray) -> bool:
+        """Decode a pgvector value ("[0.1,...]" text or JSON list) into `out`."""
+        if isinstance(value, str):
+            vector = np.fromstring(value.strip("[]"), dtype=np.float32, sep=",")
+        else:
+            vector = np.asarray(value, dtype=np.float32)
+        if vector.shape != (self.dimension,):
+            return False
+        out[:] = vector
+        return True
         
     async def search(
         self,
         query_embedding: np.ndarray,
-        k: int = 50
+        k: int = 50,
+        user_id: Optional[str] = None,
+        refine_factor: Optional[int] = None,
+        nprobe: Optional[int] = None
     ) -> List[Tuple[str, float]]:
         """
         Search for similar vectors in the index.
@@ -81,39 +289,194 @@ class VectorStore:
         Args:
             query_embedding: Query vector to search for
             k: Number of results to return
+            user_id: Restrict results to this user's videos
+            refine_factor: Over-fetch factor for exact re-ranking
+                (defaults to VECTOR_REFINE_FACTOR, 1 returns raw PQ scores)
+            nprobe: IVF lists to scan (defaults to self.nprobe)
             
         Returns:
             List of (video_id, similarity_score) tuples
         """
-        if self.index is None or self.index.ntotal == 0:
+        # Read the generation once; a concurrent swap never tears a search
+        snapshot = self.snapshot
+        if snapshot.index is None or snapshot.index.ntotal == 0:
             return []
             
         try:
             # Reshape query embedding for FAISS
-            query_vector = query_embedding.reshape(1, -1).astype(np.float32)
-            
-            # Search index
-            distances, indices = self.index.search(query_vector, k)
-            
-            # Convert results to list of (id, score) tuples
-            results = []
-            for idx, distance in zip(indices[0], distances[0]):
-                if idx < 0 or idx >= len(self.id_map):
-                    continue
-                video_id = self.id_map[idx]
-                similarity = float(distance)  # Convert from numpy float to Python float
-                results.append((video_id, similarity))
-                
-            return results
+            query_vector = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+            if query_vector.shape[1] != snapshot.index.d:
+                # Embedded just before a switch to a model of another dimension
+                logger.warning(f"Query dimension {query_vector.shape[1]} does not match index generation {snapshot.generation}")
+                return []
+            
+            refine_factor = self.refine_factor if refine_factor is None else max(1, refine_factor)
+            refine = refine_factor > 1 and snapshot.reranker.count > 0
+            
+            # Leave room for tombstoned rows that will be dropped below
+            fetch_k = k + min(snapshot.id_map.cleared, k)
+            
+            params = None
+            if user_id is not None:
+                owner_rows = snapshot.id_map.rows_for_owner(user_id)
+                if len(owner_rows) == 0:
+                    return []
+                if len(owner_rows) <= self.exact_owner_limit and snapshot.reranker.count > 0:
+                    # A single library is small: score all of it exactly
+                    ids, scores = snapshot.reranker.rerank(query_vector[0], owner_rows, k)
+                    return list(zip(snapshot.id_map.gather(ids), map(float, scores)))
+                params = self._search_params(snapshot.index, owner_rows, nprobe=nprobe)
+            elif nprobe is not None:
+                params = self._search_params(snapshot.index, None, nprobe=nprobe)
+            
+            # Search index, over-fetching candidates when re-ranking
+            distances, indices = snapshot.index.search(
+                query_vector,
+                fetch_k * refine_factor if refine else fetch_k,
+                params=params
+            )
+            
+            if refine:
+                # Replace approximate PQ scores with exact inner products
+                ids, scores = snapshot.reranker.rerank(query_vector[0], indices[0], fetch_k)
+            else:
+                ids, scores = indices[0], distances[0]
+            
+            # Translate FAISS ids with one vectorised gather
+            video_ids = snapshot.id_map.gather(ids)
+            return [
+                (video_id, float(score))
+                for video_id, score in zip(video_ids, scores)
+                if video_id is not None
+            ][:k]
             
         except Exception as e:
             logger.error(f"Error during search: {str(e)}")
             return []
+            
+    async def search_below(
+        self,
+        query_embedding: np.ndarray,
+        k: int,
+        user_id: Optional[str] = None,
+        ceiling: Optional[float] = None
+    ) -> Tuple[List[Tuple[str, float]], bool]:
+        """
+        Return the k most similar videos whose exact similarity is at most `ceiling`.
+        
+        A user's library is scored exactly against the full-precision vectors,
+        so every page is cut from the same complete ranking and costs the same
+        however deep it is. Without a user, FAISS range search over all
+        inverted lists fetches the window [ceiling - gap, ceiling]; the window
+        is widened until it holds k rows, and its margin grows with the PQ
+        error seen in this call so no row near the window edge is lost. Both
+        start from the same defaults on every call, so one query never
+        changes another's windows.
+        
+        Returns:
+            Tuple of ((video_id, similarity) pairs best first, whether no
+            further videos exist below the window)
+        """
+        snapshot = self.snapshot
+        if snapshot.index is None or snapshot.index.ntotal == 0:
+            return [], True
+        query_vector = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        
+        if user_id is not None and snapshot.reranker.count > 0:
+            owner_rows = snapshot.id_map.rows_for_owner(user_id)
+            if len(owner_rows) == 0:
+                return [], True
+            ids, scores = snapshot.reranker.rerank(query_vector[0], owner_rows, len(owner_rows))
+            exhausted = True
+        else:
+            params = None
+            if user_id is not None:
+                owner_rows = snapshot.id_map.rows_for_owner(user_id)
+                if len(owner_rows) == 0:
+                    return [], True
+                params = self._search_params(snapshot.index, owner_rows, nprobe=getattr(snapshot.index, "nlist", None))
+            elif hasattr(snapshot.index, "nlist"):
+                params = self._search_params(snapshot.index, None, nprobe=snapshot.index.nlist)
+            top = 1.0 if ceiling is None else ceiling
+            gap = self.range_gap
+            margin = self.range_margin
+            while True:
+                radius = top - gap
+                async with self._reading():
+                    lims, distances, rows = await asyncio.to_thread(
+                        snapshot.index.range_search, query_vector, float(radius - margin), params=params
+                    )
+                near = distances <= top + margin
+                rows, distances = rows[near], distances[near]
+                if snapshot.reranker.count > 0:
+                    # PQ scores are approximate: rescore exactly and track the error
+                    ids, scores = snapshot.reranker.rerank(query_vector[0], rows, len(rows))
+                    by_row = np.argsort(rows, kind="stable")
+                    approx = distances[by_row[np.searchsorted(rows[by_row], ids)]]
+                    error = float(np.abs(approx - scores).max()) if len(ids) else 0.0
+                    if error > margin:
+                        margin = error * 1.25
+                        continue
+                else:
+                    order = np.argsort(-distances, kind="stable")
+                    ids, scores = rows[order], distances[order]
+                in_window = scores > radius
+                if ceiling is not None:
+                    in_window &= scores <= ceiling
+                exhausted = radius <= -1
+                if in_window.sum() >= k or exhausted:
+                    break
+                gap *= 4
+            
+        if ceiling is not None:
+            keep = scores <= ceiling
+            ids, scores = ids[keep], scores[keep]
+        video_ids = snapshot.id_map.gather(ids[:k + min(snapshot.id_map.cleared, k)])
+        results = [
+            (video_id, float(score))
+            for video_id, score in zip(video_ids, scores)
+            if video_id is not None
+        ]
+        return results[:k], exhausted and len(results) <= k
+        
+    async def similarities(
+        self,
+        query_embedding: np.ndarray,
+        video_ids: List[str]
+    ) -> Dict[str, float]:
+        """Exact similarity of the query to specific videos."""
+        snapshot = self.snapshot
+        rows = snapshot.id_map.lookup_many(video_ids)
+        known = rows >= 0
+        if not known.any() or snapshot.reranker.count == 0:
+            return {}
+        query_vector = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        ids, scores = snapshot.reranker.rerank(query_vector, rows[known], int(known.sum()))
+        score_by_row = dict(zip(ids.tolist(), scores.tolist()))
+        return {
+            video_id: score_by_row[row]
+            for video_id, row in zip(video_ids, rows.tolist())
+            if row in score_by_row
+        }
+        
+    def _search_params(
+        self,
+        index: faiss.Index,
+        rows: Optional[np.ndarray],
+        nprobe: Optional[int] = None
+    ) -> Optional[faiss.SearchParameters]:
+        """Search parameters restricting FAISS to the given rows (all rows if None)."""
+        selector = faiss.IDSelectorBatch(rows) if rows is not None else None
+        if hasattr(index, "nprobe"):
+            return faiss.SearchParametersIVF(sel=selector, nprobe=nprobe or self.nprobe)
+        return faiss.SearchParameters(sel=selector) if selector is not None else None
         
     async def add_embedding(
         self,
         video_id: str,
-        embedding: np.ndarray
+        embedding: np.ndarray,
+        user_id: Optional[str] = None,
+        model: Optional[str] = None
     ):
         """
         Add a new embedding to the index.
@@ -121,23 +484,74 @@ class VectorStore:
         Args:
             video_id: ID of the video
             embedding: Embedding vector to add
+            user_id: ID of the video's owner, used by per-user searches
+            model: Tag the vector was made with; other tags than the index's are skipped
         """
-        try:
-            if self.index is None:
-                await self.initialize()
-                
-            # Add to FAISS index
-            vector = embedding.reshape(1, -1).astype(np.float32)
-            self.index.add(vector)
+        if model is not None and model != self.model:
+            return
             
-            # Update ID mapping
-            self.id_map[self.index.ntotal - 1] = video_id
+        await self.apply_changes([(video_id, user_id, embedding)], [])
+        
+    async def apply_changes(
+        self,
+        additions: List[Tuple[str, Optional[str], np.ndarray]],
+        removals: List[str]
+    ) -> int:
+        """
+        Apply a batch of index changes to the writer's working generation.
+        
+        A video that is added again replaces its previous row, so replaying
+        a change is harmless. Does nothing before the first build, which
+        reads every stored embedding anyway.
+        
+        Args:
+            additions: (video_id, owner user_id, embedding) of each new or changed vector
+            removals: IDs of videos to stop returning
             
-            logger.info(f"Added embedding for video {video_id}")
+        Returns:
+            Number of rows added
+        """
+        if self.role == "reader":
+            # Published generations are immutable; the index builder applies
+            # the change and publishes a new generation
+            logger.debug(f"Reader process skipping {len(additions)} adds and {len(removals)} removals")
+            return 0
             
-        except Exception as e:
-            logger.error(f"Error adding embedding: {str(e)}")
-            raise
+        async with self._write_lock:
+            snapshot = self.snapshot
+            if snapshot.index is None:
+                return 0
+                
+            try:
+                # Tombstone the current rows of replaced and removed videos
+                changed = [video_id for video_id, _, _ in additions] + list(removals)
+                if changed and len(snapshot.id_map):
+                    for row in snapshot.id_map.lookup_many(changed).tolist():
+                        if row >= 0:
+                            snapshot.id_map.clear(row)
+                            
+                if additions:
+                    vectors = np.stack([
+                        np.asarray(embedding, dtype=np.float32).reshape(-1)
+                        for _, _, embedding in additions
+                    ])
+                    start = snapshot.index.ntotal
+                    # The writer's working generation is the only mutable one
+                    snapshot.index.add(vectors)
+                    snapshot.id_map.extend(
+                        [video_id for video_id, _, _ in additions],
+                        [user_id for _, user_id, _ in additions]
+                    )
+                    snapshot.reranker.put(start, vectors)
+                    
+                snapshot.generation += 1
+                logger.info(f"Applied {len(additions)} embedding adds and {len(removals)} removals")
+                self._schedule_publish()
+                return len(additions)
+                
+            except Exception as e:
+                logger.error(f"Error applying index changes: {str(e)}")
+                raise
         
     async def remove_embedding(self, video_id: str):
         """
@@ -146,7 +560,79 @@ class VectorStore:
         Args:
             video_id: ID of the video to remove
         """
-        # FAISS doesn't support direct removal, so we need to rebuild the index
-        await self.initialize()
+        if self.role == "reader":
+            logger.debug(f"Reader process skipping removal for video {video_id}")
+            return
+            
+        async with self._write_lock:
+            snapshot = self.snapshot
+            row = snapshot.id_map.lookup(video_id)
+            if row is None:
+                return
+                
+            # Tombstone the row instead of rebuilding; searches skip it and the
+            # next full rebuild drops the vector from the index
+            snapshot.id_map.clear(row)
+            snapshot.generation += 1
+        logger.info(f"Removed embedding for video {video_id}")
+        self._schedule_publish()
+        
+    async def publish(self):
+        """
+        Publish the current generation for reader processes (writer role).
+        
+        Changes wait until the files are written, so the published index,
+        id map and vectors always agree.
+        """
+        async with self._write_lock:
+            snapshot = self.snapshot
+            if snapshot.index is None:
+                return
+            snapshot.generation = await asyncio.to_thread(self.publisher.publish, snapshot)
+            
+    def _reading(self):
+        """Guard for work on the snapshot outside the event loop thread."""
+        # Readers only ever hold published generations, which never change
+        return contextlib.nullcontext() if self.role == "reader" else self._write_lock
+        
+    def _schedule_publish(self):
+        """Coalesce bursts of adds into one publish after a short delay."""
+        if self.role != "writer":
+            return
+        if self._publish_task is None or self._publish_task.done():
+            self._publish_task = asyncio.create_task(self._publish_later())
+            
+    async def _publish_later(self):
+        await asyncio.sleep(settings.VECTOR_SNAPSHOT_PUBLISH_DELAY)
+        try:
+            await self.publish()
+        except Exception as e:
+            logger.error(f"Error publishing index generation: {str(e)}")
+            
+    async def _load_published(self):
+        """Swap to the latest published generation, if there is one."""
+        snapshot = await asyncio.to_thread(self.reader.load)
+        if snapshot is not None:
+            self.snapshot = snapshot
+            logger.info(f"Loaded index generation {snapshot.generation} with {snapshot.index.ntotal} vectors")
+        else:
+            logger.warning("No published index generation found yet")
+            
+    async def _follow_published(self):
+        """Poll the CURRENT pointer and swap to new generations as they appear."""
+        while True:
+            await asyncio.sleep(settings.VECTOR_SNAPSHOT_POLL_SECONDS)
+            try:
+                if self.reader.changed():
+                    await self._load_published()
+            except Exception as e:
+                logger.error(f"Error loading index generation: {str(e)}")
+
+def create_vector_store() -> VectorBackend:
+    """Instantiate the k-NN backend selected by VECTOR_BACKEND."""
+    if settings.VECTOR_BACKEND == "pgvector":
+        from .pgvector_store import PgVectorStore
+        return PgVectorStore()
+    return VectorStore()
 
-vector_store = VectorStore() 
\ No newline at end of file
+vector_store = create_vector_store() 
\ No newline at end of file
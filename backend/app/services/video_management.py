@@ -1,16 +1,26 @@
-from typing import Dict, Any, Optional, List
-from ..database import supabase
+from typing import Dict, Any, Optional, List, Tuple
+from collections import OrderedDict
+import time
+import uuid
+from ..database import db
+from ..core.config import settings
+from ..utils.cursor import encode_cursor, decode_cursor
 from fastapi import HTTPException
 import logging
 from datetime import datetime, timedelta
 from .vector_store import vector_store
+from .search_indexer import search_indexer
 
 logger = logging.getLogger(__name__)
 
 class VideoManagementService:
     def __init__(self):
-        self.supabase = supabase
+        self.db = db
         self.PURGE_DAYS = 1  # Number of days before permanent deletion
+        # Fields of a video list item; the rest of the row is never sent
+        self.LIST_COLUMNS = "id,title,description,url,thumbnail_url,platform,created_at,keywords,deleted_at"
+        self.TOTALS_CACHE_SIZE = 1024  # Listings whose counted total is kept
+        self._totals: "OrderedDict[Tuple[str, Optional[str], bool], Tuple[float, int]]" = OrderedDict()  # listing -> (expiry, total)
 
     async def update_video(
         self,
@@ -31,17 +41,20 @@ class VideoManagementService:
         """
         try:
             # First verify the video exists and belongs to the user
-            result = self.supabase.table("videos").select("*").eq("id", video_id).eq("user_id", user_id).is_("deleted_at", "null").execute()
+            result = await self.db.table("videos").select("*").eq("id", video_id).eq("user_id", user_id).is_("deleted_at", "null").execute()
             
             if not result.data:
                 raise HTTPException(status_code=404, detail="Video not found")
                 
             # Update the video
-            update_result = self.supabase.table("videos").update(updates).eq("id", video_id).execute()
+            update_result = await self.db.table("videos").update(updates).eq("id", video_id).execute()
             
             if not update_result.data:
                 raise HTTPException(status_code=500, detail="Failed to update video")
                 
+            # Re-index edited text fields
+            await search_indexer.index_video(video_id)
+            
             return update_result.data[0]
             
         except Exception as e:
@@ -65,7 +78,7 @@ class VideoManagementService:
         """
         try:
             # First verify the video exists and belongs to the user
-            result = self.supabase.table("videos").select("*").eq("id", video_id).eq("user_id", user_id).is_("deleted_at", "null").execute()
+            result = await self.db.table("videos").select("*").eq("id", video_id).eq("user_id", user_id).is_("deleted_at", "null").execute()
             
             if not result.data:
                 raise HTTPException(status_code=404, detail="Video not found")
@@ -75,23 +88,25 @@ class VideoManagementService:
             purge_deadline = deleted_at + timedelta(days=self.PURGE_DAYS)
                 
             # Soft delete the video
-            delete_result = self.supabase.table("videos").update({
+            delete_result = await self.db.table("videos").update({
                 "deleted_at": deleted_at.isoformat()
             }).eq("id", video_id).execute()
             
             if delete_result.data:
                 # Soft delete associated video analysis
-                await self.supabase.table("video_analysis").update({
+                await self.db.table("video_analysis").update({
                     "deleted_at": deleted_at.isoformat()
                 }).eq("video_id", video_id).execute()
                 
                 # Soft delete video categories
-                await self.supabase.table("video_categories").update({
+                await self.db.table("video_categories").update({
                     "deleted_at": deleted_at.isoformat()
                 }).eq("video_id", video_id).execute()
                 
-                # Remove from vector store
+                # Remove from vector store and search indexes
                 await vector_store.remove_embedding(video_id)
+                search_indexer.remove_video(video_id, user_id)
+                self.invalidate_totals(user_id)
                 
             return {
                 "success": bool(delete_result.data),
@@ -114,7 +129,7 @@ class VideoManagementService:
         """
         try:
             # Check if video exists and was deleted
-            result = self.supabase.table("videos").select("*").eq("id", video_id).eq("user_id", user_id).not_.is_("deleted_at", "null").execute()
+            result = await self.db.table("videos").select("*").eq("id", video_id).eq("user_id", user_id).not_.is_("deleted_at", "null").execute()
             
             if not result.data:
                 raise HTTPException(status_code=404, detail="Deleted video not found")
@@ -125,23 +140,24 @@ class VideoManagementService:
                 raise HTTPException(status_code=400, detail="Video has been permanently deleted and cannot be restored")
                 
             # Restore the video
-            restore_result = self.supabase.table("videos").update({
+            restore_result = await self.db.table("videos").update({
                 "deleted_at": None
             }).eq("id", video_id).execute()
             
             if restore_result.data:
                 # Restore associated video analysis
-                await self.supabase.table("video_analysis").update({
+                await self.db.table("video_analysis").update({
                     "deleted_at": None
                 }).eq("video_id", video_id).execute()
                 
                 # Restore video categories
-                await self.supabase.table("video_categories").update({
+                await self.db.table("video_categories").update({
                     "deleted_at": None
                 }).eq("video_id", video_id).execute()
                 
-                # Rebuild vector store index
-                await vector_store.initialize()
+                # The index updater re-adds the embeddings from index_outbox
+                await search_indexer.index_video(video_id)
+                self.invalidate_totals(user_id)
                 
             return restore_result.data[0]
             
@@ -155,23 +171,57 @@ class VideoManagementService:
         platform: Optional[str] = None,
         limit: int = 50,
         offset: int = 0,
-        include_deleted: bool = False
+        include_deleted: bool = False,
+        cursor: Optional[str] = None,
+        include_total: bool = True
     ) -> Dict[str, Any]:
         """
-        Get user's videos with optional deleted items.
+        Get one page of a user's videos, newest first.
+        
+        Pages are keyed on (created_at, id): a cursor resumes right after the
+        last video of the previous page, so every page is one index range scan
+        on idx_videos_user_created however deep into the library it is. Offset
+        paging still works for older clients but gets slower with the offset.
         
         Args:
             user_id: ID of the user
             platform: Optional platform filter
             limit: Number of videos to return
-            offset: Pagination offset
+            offset: Pagination offset, ignored when a cursor is given
             include_deleted: Include deleted videos
+            cursor: next_cursor of the previous page
+            include_total: Also return the total, estimated for large
+                libraries and cached for VIDEO_LIST_COUNT_TTL_SECONDS
             
         Returns:
-            Dictionary containing videos and total count
+            Dictionary containing videos, total (None unless requested) and
+            next_cursor (None on the last page)
+            
+        Raises:
+            ValueError: If the cursor is invalid or belongs to another listing
         """
+        after = None
+        if cursor:
+            state = decode_cursor(cursor, settings.SEARCH_CURSOR_SECRET)
+            if (state.get("u"), state.get("p"), state.get("d")) != (user_id, platform, include_deleted):
+                raise ValueError("Cursor does not belong to this listing")
+            # Both values are spliced into the filter string, so only accept
+            # what encode_cursor itself produces
+            try:
+                created_at = str(state["c"])
+                datetime.fromisoformat(created_at)
+                last_id = str(uuid.UUID(str(state["i"])))
+            except (KeyError, ValueError) as e:
+                raise ValueError("Malformed cursor") from e
+            after = (created_at, last_id)
+            offset = 0
+            
         try:
-            query = self.supabase.table("videos").select("*").eq("user_id", user_id)
+            total_key = (user_id, platform, include_deleted)
+            total = self._cached_total(total_key) if include_total else None
+            count = settings.VIDEO_LIST_COUNT if include_total and total is None else None
+            
+            query = self.db.table("videos").select(self.LIST_COLUMNS, count=count).eq("user_id", user_id)
             
             if not include_deleted:
                 query = query.is_("deleted_at", "null")
@@ -179,16 +229,36 @@ class VideoManagementService:
             if platform:
                 query = query.eq("platform", platform)
                 
-            # Get total count
-            count_result = query.count().execute()
-            total = count_result.count if hasattr(count_result, 'count') else 0
+            if after:
+                created_at, last_id = after
+                query = query.or_(
+                    f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{last_id})'
+                )
+                
+            # One extra row tells whether there is a next page
+            videos = await (
+                query.order("created_at", desc=True)
+                .order("id", desc=True)
+                .range(offset, offset + limit)
+                .execute()
+            )
+            rows = videos.data or []
+            if count:
+                total = videos.count or 0
+                self._store_total(total_key, total)
             
-            # Get videos
-            videos = query.order("created_at", desc=True).range(offset, offset + limit).execute()
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                next_cursor = encode_cursor(
+                    {"u": user_id, "p": platform, "d": include_deleted, "c": str(last["created_at"]), "i": str(last["id"])},
+                    settings.SEARCH_CURSOR_SECRET
+                )
             
             # Process videos to include purge deadline for deleted items
             processed_videos = []
-            for v in videos.data:
+            for v in rows:
                 video_data = {
                     "id": str(v["id"]),
                     "title": v["title"],
@@ -196,7 +266,7 @@ class VideoManagementService:
                     "url": v["url"],
                     "thumbnail_url": v["thumbnail_url"],
                     "platform": v["platform"],
-                    "created_at": v["created_at"].isoformat(),
+                    "created_at": v["created_at"],
                     "keywords": v["keywords"] or [],
                     "deleted_at": v.get("deleted_at")
                 }
@@ -205,9 +275,10 @@ class VideoManagementService:
                 if v.get("deleted_at"):
                     deleted_at = datetime.fromisoformat(v["deleted_at"])
                     purge_deadline = deleted_at + timedelta(days=self.PURGE_DAYS)
+                    now = datetime.now(purge_deadline.tzinfo) if purge_deadline.tzinfo else datetime.utcnow()
                     video_data.update({
                         "purge_deadline": purge_deadline.isoformat(),
-                        "days_until_purge": max(0, (purge_deadline - datetime.utcnow()).days)
+                        "days_until_purge": max(0, (purge_deadline - now).days)
                     })
                 
                 processed_videos.append(video_data)
@@ -216,13 +287,37 @@ class VideoManagementService:
                 "videos": processed_videos,
                 "total": total,
                 "limit": limit,
-                "offset": offset
+                "offset": offset,
+                "next_cursor": next_cursor
             }
             
         except Exception as e:
             logger.error(f"Error getting user videos: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    def _cached_total(self, key: Tuple[str, Optional[str], bool]) -> Optional[int]:
+        """Total of a listing counted within the TTL, if any."""
+        cached = self._totals.get(key)
+        if cached is None:
+            return None
+        if cached[0] < time.monotonic():
+            del self._totals[key]
+            return None
+        self._totals.move_to_end(key)
+        return cached[1]
+
+    def _store_total(self, key: Tuple[str, Optional[str], bool], total: int):
+        """Cache a counted total, evicting the least recently used listings."""
+        self._totals[key] = (time.monotonic() + settings.VIDEO_LIST_COUNT_TTL_SECONDS, total)
+        self._totals.move_to_end(key)
+        while len(self._totals) > self.TOTALS_CACHE_SIZE:
+            self._totals.popitem(last=False)
+
+    def invalidate_totals(self, user_id: str):
+        """Forget the cached totals of a user's listings after videos were added or removed."""
+        for key in [key for key in self._totals if key[0] == user_id]:
+            del self._totals[key]
+
     async def _get_video(self, video_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Get video details and verify ownership."""
         query = """
@@ -230,6 +325,6 @@ class VideoManagementService:
             FROM videos
             WHERE id = $1 AND user_id = $2
         """
-        return await self.supabase.table("videos").select("*").eq("id", video_id).eq("user_id", user_id).execute()
+        return await self.db.table("videos").select("*").eq("id", video_id).eq("user_id", user_id).execute()
 
 video_management_service = VideoManagementService() 
\ No newline at end of file
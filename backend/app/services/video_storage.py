@@ -1,7 +1,11 @@
-from typing import Dict, List
+from typing import Dict, List, Any, Optional
 import json
+import numpy as np
 from .summary_generator import SearchableSummary
-from ..database import get_db
+from .document_embedding import document_embedder
+from .embedding_store import embedding_store
+from ..database import db
+from ..utils.embeddings import parse_tag, MODEL_NAME
 import datetime
 
 async def store_video_analysis(
@@ -15,8 +19,6 @@ async def store_video_analysis(
         video_id: UUID of the video
         summary: SearchableSummary object containing all analysis data
     """
-    supabase = get_db()
-    
     # Create the video_analysis entry
     data = {
         "video_id": video_id,
@@ -27,13 +29,61 @@ async def store_video_analysis(
         "metadata": summary.raw_data,
         "confidence_scores": summary.raw_data.get("confidence_scores", {}),
         "processing_status": "completed",
-        "embedding": summary.raw_data.get("embedding"),
         "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat()
     }
     
-    result = supabase.table("video_analysis").insert(data).execute()
+    result = await db.table("video_analysis").insert(data).execute()
+    
+    # Embeddings live in video_embeddings; writing them queues the index update
+    await store_video_embeddings(
+        video_id,
+        summary.search_summary,
+        summary.raw_data["audio_transcription"],
+        summary.raw_data.get("duration")
+    )
     return result.data[0] if result.data else None
 
+async def store_video_embeddings(
+    video_id: str,
+    search_summary: str,
+    transcription: Any,
+    duration: Any = None,
+    document: Optional[Dict[str, Any]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Embed a video and store the vector under every model tag in use.
+    
+    Each write also queues an index_outbox row in the same transaction
+    (app/migrations/add_index_outbox.sql), from which the index updater
+    makes the video searchable.
+    
+    Args:
+        video_id: UUID of the video
+        search_summary: Title, description and visual summary text
+        transcription: Result of transcribe_video, or a stored plain-text transcript
+        duration: Video duration in seconds or as an ISO 8601 duration
+        document: Result of document_embedder.embed for EMBEDDING_MODEL, if already computed
+        
+    Returns:
+        Dictionary of model tag -> stored vector (empty if there is no text)
+    """
+    if document is None:
+        document = await document_embedder.embed_video(search_summary, transcription, duration)
+    if document is None:
+        return {}
+    
+    embeddings = {}
+    for tag in await embedding_store.writing_tags():
+        model, _ = parse_tag(tag)
+        if model == MODEL_NAME:
+            embeddings[tag] = document["embedding"]
+        else:
+            # A migration target; embed now so the migration never falls behind
+            target = await document_embedder.embed_video(search_summary, transcription, duration, model)
+            embeddings[tag] = target["embedding"]
+        await embedding_store.put(video_id, tag, embeddings[tag])
+    return embeddings
+
 async def get_video_analysis(
     video_id: str
 ) -> Dict:
@@ -46,9 +96,7 @@ async def get_video_analysis(
     Returns:
         Dict containing all analysis data
     """
-    supabase = get_db()
-    
-    result = supabase.table("video_analysis").select("*").eq("video_id", video_id).execute()
+    result = await db.table("video_analysis").select("*").eq("video_id", video_id).execute()
     return result.data[0] if result.data else None
 
 async def update_video_status(
@@ -64,8 +112,6 @@ async def update_video_status(
         status: New status value
         error: Optional error message
     """
-    supabase = get_db()
-    
     data = {
         "status": status,
         "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat()
@@ -74,4 +120,4 @@ async def update_video_status(
     if error:
         data["error"] = error
     
-    supabase.table("videos").update(data).eq("id", video_id).execute() 
\ No newline at end of file
+    await db.table("videos").update(data).eq("id", video_id).execute() 
\ No newline at end of file
@@ -6,11 +6,9 @@ import base64
 import io
 from PIL import Image
 from ..core.config import settings
+from ..core.registry import registry
 import logging
-import cv2
 from io import BytesIO
-import tensorflow as tf
-import tensorflow_hub as hub
 import os
 
 logger = logging.getLogger(__name__)
@@ -27,6 +25,10 @@ class VisualAnalysisService:
         
         # Initialize TensorFlow with CPU only
         try:
+            # Imported here so processes that never analyse frames do not load TensorFlow
+            import tensorflow as tf
+            import tensorflow_hub as hub
+            
             # Disable GPU
             os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
             
@@ -233,4 +235,4 @@ class VisualAnalysisService:
             raise
 
 # Initialize the visual analysis service
-visual_analysis_service = VisualAnalysisService() 
\ No newline at end of file
+visual_analysis_service = registry.lazy("visual_analysis", VisualAnalysisService) 
\ No newline at end of file
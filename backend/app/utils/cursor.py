@@ -0,0 +1,59 @@
+import base64
+import hashlib
+import hmac
+import json
+from typing import Dict, Any
+
+def check_secret(secret: str):
+    """
+    Refuse an empty signing key; with one anyone could mint valid cursors.
+
+    Raises:
+        ValueError: If the secret is empty
+    """
+    if not secret:
+        raise ValueError("SEARCH_CURSOR_SECRET is not set; refusing to sign or verify cursors")
+
+def encode_cursor(state: Dict[str, Any], secret: str) -> str:
+    """
+    Encode paging state as an opaque, signed, URL-safe cursor.
+
+    Args:
+        state: JSON-serialisable paging state
+        secret: Signing key
+
+    Returns:
+        Cursor string
+
+    Raises:
+        ValueError: If the secret is empty
+    """
+    check_secret(secret)
+    payload = base64.urlsafe_b64encode(
+        json.dumps(state, separators=(",", ":")).encode()
+    ).rstrip(b"=")
+    signature = hmac.new(secret.encode(), payload, hashlib.sha256).digest()
+    return (payload + b"." + base64.urlsafe_b64encode(signature).rstrip(b"=")).decode()
+
+def decode_cursor(cursor: str, secret: str) -> Dict[str, Any]:
+    """
+    Verify and decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the secret is empty, or the cursor is malformed or its
+            signature does not match
+    """
+    check_secret(secret)
+    try:
+        payload, signature = cursor.encode().split(b".")
+        expected = hmac.new(secret.encode(), payload, hashlib.sha256).digest()
+        if not hmac.compare_digest(base64.urlsafe_b64decode(signature + b"=" * (-len(signature) % 4)), expected):
+            raise ValueError("Invalid cursor signature")
+        state = json.loads(base64.urlsafe_b64decode(payload + b"=" * (-len(payload) % 4)))
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(state, dict):
+        raise ValueError("Malformed cursor")
+    return state
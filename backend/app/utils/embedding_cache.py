@@ -0,0 +1,143 @@
+"""
+Persistent cache of text embeddings.
+
+Vectors are stored in a SQLite file keyed by (model version, SHA-256 of the
+whitespace-normalised text) as float16 blobs, so reprocessing a video,
+re-running a backfill or migration, or re-indexing edited text only encodes
+text that has not been seen before. When the file grows past
+EMBEDDING_CACHE_MAX_MB the least recently used entries are evicted.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Optional
+from ..core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+def text_key(text: str) -> bytes:
+    """SHA-256 of the text with whitespace runs collapsed (the tokenizer ignores them too)."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).digest()
+
+class EmbeddingCache:
+    def __init__(self, path: Optional[str] = None, max_mb: Optional[float] = None):
+        self.path = path or settings.EMBEDDING_CACHE_PATH
+        self.max_bytes = int((settings.EMBEDDING_CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024)
+        self.check_every = 1000  # inserts between size checks
+        self.evict_fraction = 0.1  # share of entries dropped when over the limit
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened on first use so importing the module does not touch the disk
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    version TEXT NOT NULL,
+                    key BLOB NOT NULL,
+                    vector BLOB NOT NULL,
+                    used REAL NOT NULL,
+                    PRIMARY KEY (version, key)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_embeddings_used ON embeddings (used);
+            """)
+            self._connection = connection
+        return self._connection
+
+    def get_many(self, version: str, keys: List[bytes], dimension: Optional[int] = None) -> Dict[bytes, np.ndarray]:
+        """
+        Look up cached vectors.
+
+        Args:
+            version: Model version the vectors must come from
+            keys: text_key() of each text
+            dimension: Expected vector length; entries of another length are ignored
+
+        Returns:
+            key -> float32 vector for the keys that were cached
+        """
+        if not self.enabled or not keys:
+            return {}
+        found = {}
+        unique = list(set(keys))
+        with self._lock:
+            connection = self._connect()
+            for start in range(0, len(unique), 500):  # stay under SQLite's bound-parameter limit
+                chunk = unique[start:start + 500]
+                rows = connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE version = ? AND key IN ({','.join('?' * len(chunk))})",
+                    [version, *chunk]
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+                    if dimension is None or vector.shape[0] == dimension:
+                        found[bytes(key)] = vector
+            if found:
+                connection.executemany(
+                    "UPDATE embeddings SET used = ? WHERE version = ? AND key = ?",
+                    [(time.time(), version, key) for key in found]
+                )
+        self.hits += sum(1 for key in keys if key in found)
+        self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, version: str, keys: List[bytes], vectors: np.ndarray):
+        """Store vectors (as float16) and evict old entries if the file is over its size limit."""
+        if not self.enabled or not keys:
+            return
+        now = time.time()
+        payloads = np.asarray(vectors, dtype=np.float16)
+        with self._lock:
+            connection = self._connect()
+            connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (version, key, vector, used) VALUES (?, ?, ?, ?)",
+                [(version, key, payload.tobytes(), now) for key, payload in zip(keys, payloads)]
+            )
+            self._inserts += len(keys)
+            if self._inserts >= self.check_every:
+                self._inserts = 0
+                self._evict(connection)
+
+    def _evict(self, connection: sqlite3.Connection):
+        page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+        evicted = 0
+        while True:
+            pages = connection.execute("PRAGMA page_count").fetchone()[0]
+            free = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            count = connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if (pages - free) * page_size <= self.max_bytes or count == 0:
+                break
+            drop = max(1, int(count * self.evict_fraction))
+            # Freed pages are reused by later inserts, so the file stops growing
+            connection.execute(
+                "DELETE FROM embeddings WHERE (version, key) IN (SELECT version, key FROM embeddings ORDER BY used LIMIT ?)",
+                (drop,)
+            )
+            evicted += drop
+        if evicted:
+            logger.info(f"Embedding cache over {self.max_bytes >> 20} MB; evicted {evicted} least recently used entries")
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0
+        }
+
+embedding_cache = EmbeddingCache()
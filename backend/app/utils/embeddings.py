@@ -1,22 +1,125 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
+from typing import List, Optional, Tuple, TYPE_CHECKING
+from ..core.config import settings
+from ..core.registry import registry
+from .embedding_cache import embedding_cache, text_key
+import logging
 
-# Initialize the model (this will download it if not present)
-model = SentenceTransformer('all-MiniLM-L6-v2')
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = settings.EMBEDDING_MODEL
+
+def model_tag(model: Optional[str] = None, version: Optional[str] = None) -> str:
+    """
+    Tag stored with each video embedding, e.g. "all-MiniLM-L6-v2@v1".
+
+    The version is bumped (EMBEDDING_VERSION) when the way documents are
+    embedded changes, so vectors of the same model but a different pipeline
+    are kept apart.
+    """
+    return f"{model or MODEL_NAME}@v{version or settings.EMBEDDING_VERSION}"
+
+def parse_tag(tag: str) -> Tuple[str, str]:
+    """Split a tag into (model name, version)."""
+    model, _, version = tag.rpartition("@v")
+    return (model, version) if model else (tag, "")
+
+def _load_model() -> "SentenceTransformer":
+    if settings.EMBEDDING_BACKEND == "onnx":
+        from .onnx_embeddings import load_encoder, HUB_MODEL
+        try:
+            if HUB_MODEL.split("/")[-1] != MODEL_NAME:
+                raise ValueError(f"the ONNX export is of {HUB_MODEL}, not {MODEL_NAME}")
+            return load_encoder()
+        except Exception as e:
+            logger.error(f"ONNX embedding backend unavailable, using PyTorch: {str(e)}")
+    # Importing sentence_transformers pulls in torch, so it waits for first use too
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME)
+
+registry.register("embedding_model", _load_model)
+
+def get_model(model: Optional[str] = None) -> "SentenceTransformer":
+    """
+    Load a model on first use (this will download it if not present).
+
+    Args:
+        model: sentence-transformers model name; defaults to EMBEDDING_MODEL.
+            Other models (e.g. the target of an embedding migration) are
+            registered as "embedding_model:<name>" the first time they are asked for.
+    """
+    if model is None or model == MODEL_NAME:
+        return registry.get("embedding_model")
+    name = f"embedding_model:{model}"
+    if not registry.is_registered(name):
+        def load(model=model):
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer(model)
+        registry.register(name, load)
+    return registry.get(name)
+
+def embedding_dimension(model: Optional[str] = None) -> int:
+    """Length of the vectors a model produces."""
+    encoder = get_model(model)
+    if hasattr(encoder, "get_sentence_embedding_dimension"):
+        return encoder.get_sentence_embedding_dimension()
+    return int(encoder.encode(["dimension"], convert_to_numpy=True).shape[1])
 
 def get_embedding(text: str) -> np.ndarray:
     """
-    Generate embedding vector for the given text using sentence-transformers.
-    
+    Generate embedding vector for the given text with the EMBEDDING_BACKEND model.
+
     Args:
         text: Input text to generate embedding for
-        
+
     Returns:
         Numpy array containing the embedding vector
     """
-    # Generate embedding
-    embedding = model.encode(text, convert_to_numpy=True)
-    
-    # Normalize the embedding vector
-    normalized = embedding / np.linalg.norm(embedding)
-    return normalized 
\ No newline at end of file
+    return get_embeddings([text])[0]
+
+def get_embeddings(texts: List[str], model: Optional[str] = None) -> np.ndarray:
+    """
+    Generate normalized embedding vectors for a batch of texts in one encode call.
+
+    Texts already in the persistent embedding cache are not encoded again,
+    and duplicates within the batch are encoded once.
+
+    Args:
+        texts: Input texts to generate embeddings for
+        model: Model name (defaults to EMBEDDING_MODEL)
+
+    Returns:
+        Numpy array of shape (len(texts), dimension)
+    """
+    if not embedding_cache.enabled:
+        return _encode(texts, model)
+
+    version = cache_version(model)
+    keys = [text_key(text) for text in texts]
+    found = embedding_cache.get_many(version, keys)
+    missing = {}
+    for text, key in zip(texts, keys):
+        if key not in found and key not in missing:
+            missing[key] = text
+    if missing:
+        encoded = _encode(list(missing.values()), model)
+        embedding_cache.put_many(version, list(missing), encoded)
+        found.update(zip(missing, encoded))
+    return np.stack([found[key] for key in keys]).astype(np.float32) if keys else _encode(texts, model)
+
+def cache_version(model: Optional[str] = None) -> str:
+    """Cache namespace of a model: its name plus the backend, whose vectors differ slightly."""
+    model = model or MODEL_NAME
+    backend = settings.EMBEDDING_BACKEND if model == MODEL_NAME else "torch"
+    return f"{model}:{backend}"
+
+def _encode(texts: List[str], model: Optional[str] = None) -> np.ndarray:
+    # Generate embeddings
+    embeddings = get_model(model).encode(texts, convert_to_numpy=True)
+
+    # Normalize the embedding vectors
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
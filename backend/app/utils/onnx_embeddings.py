@@ -0,0 +1,189 @@
+"""
+ONNX Runtime backend for text embeddings (EMBEDDING_BACKEND=onnx).
+
+The sentence-transformers model is exported once to ONNX, its weights are
+quantized to int8 with dynamic quantization, and texts are then encoded with
+ONNX Runtime on the CPU: tokenize, run the transformer, mean-pool over the
+attention mask. This mirrors the model's own pipeline, so vectors stay
+384-d and comparable with the PyTorch ones.
+
+Export and check parity ahead of deployment with:
+
+    python -m app.utils.onnx_embeddings
+"""
+import os
+import numpy as np
+from typing import List, Optional
+from ..core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+HUB_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+MAX_LENGTH = 256  # the model's max_seq_length; longer inputs are truncated
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+INPUT_NAMES = ["input_ids", "attention_mask", "token_type_ids"]
+
+PARITY_TEXTS = [
+    "how to make neapolitan pizza at home",
+    "golden retriever puppy learning to fetch",
+    "A quick tutorial on training a neural network in Python.",
+    "sunset timelapse over the mountains with calm music",
+    "street food tour in Bangkok, trying mango sticky rice",
+    "beginner guitar lesson: three chords for your first song",
+    "The speaker explains how compound interest grows savings over decades.",
+    "cat",
+]
+
+def export_model(directory: str) -> str:
+    """
+    Export the model to ONNX and quantize its weights to int8.
+
+    Needs torch and transformers; only the export does, not encoding.
+
+    Args:
+        directory: Where the ONNX files and tokenizer are written
+
+    Returns:
+        Path of the quantized model
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    os.makedirs(directory, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(HUB_MODEL)
+    model = AutoModel.from_pretrained(HUB_MODEL)
+    model.eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    fp32_path = os.path.join(directory, FP32_FILE)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in INPUT_NAMES + ["last_hidden_state"]}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in INPUT_NAMES),
+            fp32_path,
+            input_names=INPUT_NAMES,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14
+        )
+
+    int8_path = os.path.join(directory, INT8_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    tokenizer.save_pretrained(directory)
+    logger.info(f"Exported {HUB_MODEL} to {int8_path}")
+    return int8_path
+
+class OnnxEncoder:
+    """
+    Drop-in for SentenceTransformer.encode backed by an int8 ONNX model.
+
+    Texts are sorted by length before batching so each batch pads to a
+    similar length, as sentence-transformers does.
+    """
+    def __init__(self, directory: str, threads: int = 0, batch_size: int = 32):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads  # 0 lets ONNX Runtime use every core
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            os.path.join(directory, INT8_FILE),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+        self.input_names = [node.name for node in self.session.get_inputs()]
+        self.batch_size = batch_size
+
+    def encode(self, texts: List[str], convert_to_numpy: bool = True, batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Mean-pooled token embeddings, shape (len(texts), 384).
+
+        convert_to_numpy is accepted for compatibility; the result is always NumPy.
+        """
+        batch_size = batch_size or self.batch_size
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        embeddings = None
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            batch = self.tokenizer(
+                [texts[i] for i in rows],
+                padding=True,
+                truncation=True,
+                max_length=MAX_LENGTH,
+                return_tensors="np"
+            )
+            hidden = self.session.run(
+                None,
+                {name: batch[name].astype(np.int64) for name in self.input_names}
+            )[0]
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            if embeddings is None:
+                embeddings = np.empty((len(texts), pooled.shape[1]), dtype=np.float32)
+            embeddings[rows] = pooled
+        return embeddings if embeddings is not None else np.zeros((0, 384), dtype=np.float32)
+
+def parity(encoder, reference, texts: List[str] = PARITY_TEXTS) -> float:
+    """
+    Lowest cosine similarity between two encoders' vectors for the same texts.
+
+    Args:
+        encoder: Candidate encoder (e.g. OnnxEncoder)
+        reference: Reference encoder (e.g. the SentenceTransformer model)
+        texts: Texts to compare on
+
+    Returns:
+        Minimum cosine similarity over texts
+    """
+    a = np.asarray(encoder.encode(texts, convert_to_numpy=True), dtype=np.float32)
+    b = np.asarray(reference.encode(texts, convert_to_numpy=True), dtype=np.float32)
+    a /= np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b /= np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return float((a * b).sum(axis=1).min())
+
+def load_encoder() -> OnnxEncoder:
+    """
+    Load the int8 encoder from EMBEDDING_ONNX_DIR, exporting the model first if needed.
+
+    A fresh export is only kept if it passes the parity check against the
+    PyTorch model (EMBEDDING_ONNX_MIN_COSINE).
+    """
+    directory = settings.EMBEDDING_ONNX_DIR
+    if not os.path.exists(os.path.join(directory, INT8_FILE)):
+        from sentence_transformers import SentenceTransformer
+        export_model(directory)
+        encoder = OnnxEncoder(directory, settings.EMBEDDING_THREADS)
+        similarity = parity(encoder, SentenceTransformer(HUB_MODEL))
+        logger.info(f"ONNX int8 parity: minimum cosine {similarity:.4f}")
+        if similarity < settings.EMBEDDING_ONNX_MIN_COSINE:
+            os.remove(os.path.join(directory, INT8_FILE))
+            raise RuntimeError(
+                f"Quantized model diverges from the reference (cosine {similarity:.4f} "
+                f"< {settings.EMBEDDING_ONNX_MIN_COSINE})"
+            )
+        return encoder
+    return OnnxEncoder(directory, settings.EMBEDDING_THREADS)
+
+if __name__ == "__main__":
+    import time
+    from sentence_transformers import SentenceTransformer
+
+    logging.basicConfig(level=logging.INFO)
+    export_model(settings.EMBEDDING_ONNX_DIR)
+    encoder = OnnxEncoder(settings.EMBEDDING_ONNX_DIR, settings.EMBEDDING_THREADS)
+    reference = SentenceTransformer(HUB_MODEL)
+    print(f"Minimum cosine similarity to PyTorch: {parity(encoder, reference):.4f}")
+
+    texts = PARITY_TEXTS * 64
+    for name, model in [("pytorch fp32", reference), ("onnx int8", encoder)]:
+        model.encode(texts[:32], convert_to_numpy=True)
+        started = time.perf_counter()
+        model.encode(texts, convert_to_numpy=True)
+        print(f"{name}: {len(texts) / (time.perf_counter() - started):.0f} texts/s")
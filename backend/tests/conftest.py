@@ -0,0 +1,14 @@
+"""
+Shared test setup.
+
+The app reads its Supabase settings at import time; placeholder values let
+the pure modules be imported without a .env. Nothing here talks to Supabase.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SUPABASE_URL", "http://supabase.test")
+os.environ.setdefault("SUPABASE_KEY", "anon-key")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "service-key")
@@ -0,0 +1,31 @@
+import pytest
+from app.utils.cursor import encode_cursor, decode_cursor
+
+def test_round_trip():
+    state = {"u": "user", "s": 41.5, "i": "video", "p": None}
+    assert decode_cursor(encode_cursor(state, "secret"), "secret") == state
+
+def test_tampered_or_foreign_cursors_are_rejected():
+    cursor = encode_cursor({"s": 1.0}, "secret")
+    payload, signature = cursor.split(".")
+    forged = encode_cursor({"s": 99.0}, "secret").split(".")[0] + "." + signature
+
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "other-secret")
+    with pytest.raises(ValueError):
+        decode_cursor(forged, "secret")
+
+@pytest.mark.parametrize("cursor", ["", "junk", "a.b.c", "!!!.???"])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "secret")
+
+def test_non_object_state_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor([1, 2], "secret"), "secret")
+
+def test_empty_secret_is_refused():
+    with pytest.raises(ValueError):
+        encode_cursor({"s": 1.0}, "")
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor({"s": 1.0}, "secret"), "")
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from app.services.document_embedding import window_starts, pool
+
+def test_windows_overlap_and_cover_the_tail():
+    assert window_starts(10, 4, 1, 100) == [0, 3, 6]
+    assert window_starts(11, 4, 1, 100) == [0, 3, 6, 7]
+
+def test_short_or_empty_texts():
+    assert window_starts(3, 4, 1, 100) == [0]
+    assert window_starts(0, 4, 1, 100) == []
+    assert window_starts(10, 4, 1, 0) == []
+
+def test_window_count_is_capped_by_spreading_starts():
+    starts = window_starts(10_000, 100, 20, 8)
+    assert len(starts) == 8
+    assert starts[0] == 0 and starts[-1] == 10_000 - 100
+    assert starts == sorted(starts)
+
+def test_pool_returns_unit_vectors():
+    vectors = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32)
+
+    mean = pool(vectors, "mean")
+    assert mean.dtype == np.float32
+    assert np.allclose(mean, [2 ** -0.5, 2 ** -0.5, 0.0])
+    assert np.allclose(pool(vectors, "max"), mean)
+    assert np.allclose(pool(np.array([[1.0, 0.0], [-1.0, 0.0]]), "mean"), [0.0, 0.0])
+
+def test_pool_max_keeps_a_signal_present_in_one_window():
+    vectors = np.array([[1.0, 0.0], [1.0, 0.0], [1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    assert pool(vectors, "max")[1] > pool(vectors, "mean")[1]
+
+def test_pool_rejects_unknown_methods():
+    with pytest.raises(ValueError):
+        pool(np.ones((2, 2)), "median")
@@ -0,0 +1,44 @@
+import numpy as np
+from app.utils.embedding_cache import EmbeddingCache, text_key
+
+def _vectors(count, dimension=384, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, dimension)).astype(np.float32)
+
+def test_round_trip_is_keyed_by_version_and_normalised_text(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_mb=10)
+    vectors = _vectors(2)
+    keys = [text_key("hello  world"), text_key("other")]
+    cache.put_many("model:cpu", keys, vectors)
+
+    found = cache.get_many("model:cpu", [text_key("hello world"), text_key("missing")])
+    assert list(found) == [keys[0]]
+    assert np.allclose(found[keys[0]], vectors[0], atol=1e-2)
+    assert cache.get_many("other:cpu", keys) == {}
+    assert cache.get_many("model:cpu", keys, dimension=768) == {}
+
+def test_eviction_keeps_the_file_under_its_limit_and_drops_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_mb=0.25)
+    cache.check_every = 50
+    keys = [text_key(f"text {i}") for i in range(600)]
+
+    cache.put_many("v", keys[:50], _vectors(50, seed=1))
+    cache.get_many("v", keys[:1])  # the first entry is recently used
+    for start in range(50, 600, 50):
+        cache.put_many("v", keys[start:start + 50], _vectors(50, seed=start))
+
+    connection = cache._connect()
+    page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+    pages = connection.execute("PRAGMA page_count").fetchone()[0]
+    free = connection.execute("PRAGMA freelist_count").fetchone()[0]
+    remaining = connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    assert (pages - free) * page_size <= cache.max_bytes
+    assert remaining < 600
+    assert keys[-1] in cache.get_many("v", keys[-1:])
+    assert keys[1] not in cache.get_many("v", keys[1:2])
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_mb=0)
+    cache.put_many("v", [text_key("a")], _vectors(1))
+    assert cache.get_many("v", [text_key("a")]) == {}
+    assert not (tmp_path / "cache.sqlite3").exists()
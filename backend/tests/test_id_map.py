@@ -0,0 +1,66 @@
+import uuid
+import numpy as np
+from app.services.id_map import IdMap
+
+def _ids(count):
+    return [str(uuid.uuid4()) for _ in range(count)]
+
+def test_extend_grows_past_capacity_and_round_trips():
+    video_ids = _ids(10)
+    id_map = IdMap(capacity=2)
+    rows = id_map.extend(video_ids, ["u1"] * 5 + ["u2"] * 5)
+
+    assert rows.tolist() == list(range(10))
+    assert len(id_map) == 10
+    assert [id_map[row] for row in range(10)] == video_ids
+    assert id_map.gather(np.array([0, 9, 10, -1])) == [video_ids[0], video_ids[9], None, None]
+
+def test_lookup_returns_newest_row_and_skips_cleared_rows():
+    video_id, other = _ids(2)
+    id_map = IdMap()
+    first = id_map.append(video_id, "u1")
+    id_map.append(other, "u1")
+    second = id_map.append(video_id, "u1")
+
+    assert id_map.lookup(video_id) == second
+    id_map.clear(second)
+    assert id_map.lookup(video_id) == first
+    assert id_map.gather(np.array([second])) == [None]
+    assert id_map.cleared == 1
+
+def test_lookup_many_matches_lookup_across_sorted_part_and_tail():
+    video_ids = _ids(50)
+    id_map = IdMap()
+    id_map.max_unsorted_tail = 8
+    id_map.extend(video_ids)
+    id_map.lookup(video_ids[0])  # sorts the first 50 rows
+    id_map.extend(video_ids[:5])  # re-added videos land in the unsorted tail
+    id_map.clear(51)
+
+    queries = video_ids[:10] + [str(uuid.uuid4())]
+    expected = [id_map.lookup(video_id) for video_id in queries]
+    assert id_map.lookup_many(queries).tolist() == [-1 if row is None else row for row in expected]
+    assert id_map.lookup(video_ids[1]) == 1
+
+def test_rows_for_owner_excludes_other_owners_and_cleared_rows():
+    id_map = IdMap()
+    rows = id_map.extend(_ids(4), ["u1", "u2", "u1", None])
+    id_map.clear(int(rows[2]))
+
+    assert id_map.rows_for_owner("u1").tolist() == [0]
+    assert id_map.rows_for_owner("u2").tolist() == [1]
+    assert id_map.rows_for_owner("nobody").tolist() == []
+
+def test_save_and_load(tmp_path):
+    video_ids = _ids(3)
+    id_map = IdMap()
+    id_map.extend(video_ids, ["u1", "u2", "u1"])
+    id_map.clear(1)
+    id_map.save(str(tmp_path))
+
+    loaded = IdMap.load(str(tmp_path))
+    assert len(loaded) == 3
+    assert loaded.cleared == 1
+    assert loaded.lookup(video_ids[2]) == 2
+    assert loaded.lookup(video_ids[1]) is None
+    assert loaded.rows_for_owner("u1").tolist() == [0, 2]
@@ -0,0 +1,49 @@
+from app.services.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+def _index():
+    index = BM25Index()
+    index.add("cooking", {"title": tokenize("Pasta cooking basics"), "audio_transcription": tokenize("boil the water")})
+    index.add("travel", {"title": tokenize("Rome travel guide"), "audio_transcription": tokenize("pasta in rome is great")})
+    index.add("music", {"title": tokenize("Guitar lesson"), "audio_transcription": tokenize("strum the chords")})
+    return index
+
+def test_title_hits_outrank_transcript_hits():
+    results = _index().search(["pasta"])
+    assert [video_id for video_id, _ in results] == ["cooking", "travel"]
+    assert results[0][1] > results[1][1] > 0
+
+def test_rare_terms_weigh_more_and_k_limits_results():
+    index = _index()
+    assert [video_id for video_id, _ in index.search(["pasta", "guitar"], k=1)] == ["music"]
+    assert index.search(["unknown"]) == []
+
+def test_remove_and_replace():
+    index = _index()
+    index.remove("cooking")
+    assert len(index) == 2
+    assert [video_id for video_id, _ in index.search(["pasta"])] == ["travel"]
+
+    index.add("travel", {"title": tokenize("Paris travel guide")})
+    assert index.search(["pasta"]) == []
+    assert [video_id for video_id, _ in index.search(["paris"])] == ["travel"]
+
+def test_removals_are_compacted():
+    index = BM25Index()
+    for i in range(100):
+        index.add(f"v{i}", {"title": ["shared", f"term{i}"]})
+    for i in range(98):
+        index.remove(f"v{i}")
+
+    assert len(index.slots) < 100
+    assert "term0" not in index.postings
+    assert sorted(video_id for video_id, _ in index.search(["shared"])) == ["v98", "v99"]
+    assert [video_id for video_id, _ in index.search(["term99"])] == ["v99"]
+
+def test_reciprocal_rank_fusion_sums_ranks():
+    dense = [("a", 0.9), ("b", 0.8), ("c", 0.1)]
+    lexical = [("b", 12.0), ("d", 3.0)]
+    fused = dict(reciprocal_rank_fusion([dense, lexical], k=60))
+
+    assert fused["b"] == 1 / 62 + 1 / 61
+    assert fused["a"] == 1 / 61
+    assert [video_id for video_id, _ in reciprocal_rank_fusion([dense, lexical])][:2] == ["b", "a"]
@@ -0,0 +1,33 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.utils.onnx_embeddings import HUB_MODEL, INT8_FILE, PARITY_TEXTS, OnnxEncoder, parity
+
+class FixedEncoder:
+    def __init__(self, vectors):
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+
+    def encode(self, texts, convert_to_numpy=True):
+        return self.vectors[:len(texts)].copy()
+
+def test_parity_is_the_lowest_cosine_and_ignores_scale():
+    reference = FixedEncoder([[1, 0], [0, 1]])
+    candidate = FixedEncoder([[3, 0], [1, 1]])
+    assert parity(candidate, reference, ["a", "b"]) == pytest.approx(np.sqrt(0.5))
+
+def test_int8_model_matches_the_float_model():
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("transformers")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    directory = settings.EMBEDDING_ONNX_DIR
+    if not os.path.exists(os.path.join(directory, INT8_FILE)):
+        pytest.skip(f"No exported int8 model in {directory}; run python -m app.utils.onnx_embeddings")
+
+    encoder = OnnxEncoder(directory)
+    reference = sentence_transformers.SentenceTransformer(HUB_MODEL)
+
+    assert encoder.encode(PARITY_TEXTS).shape == (len(PARITY_TEXTS), 384)
+    assert parity(encoder, reference) >= settings.EMBEDDING_ONNX_MIN_COSINE
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import httpx
+import pytest
+from app.database.postgrest import PostgrestClient, PostgrestError
+
+def _client(handler):
+    return PostgrestClient("key", url="http://postgrest.test/rest/v1", transport=httpx.MockTransport(handler))
+
+def _send(builder, response=None):
+    """Execute a query against a transport that records the request."""
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        return response or httpx.Response(200, json=[])
+
+    result = asyncio.run(builder(_client(handler)).execute())
+    return sent[0], result
+
+def test_select_filters_order_and_range():
+    request, _ = _send(lambda db: (
+        db.table("videos")
+        .select("id, title", count="exact")
+        .eq("user_id", "u1")
+        .is_("deleted_at", None)
+        .not_.eq("platform", "tiktok")
+        .in_("id", ["a", "b,c"])
+        .order("created_at", desc=True)
+        .order("id", desc=True, nullsfirst=False)
+        .range(10, 19)
+    ))
+
+    assert request.method == "GET"
+    assert request.url.path == "/rest/v1/videos"
+    assert list(request.url.params.multi_items()) == [
+        ("select", "id,title"),
+        ("user_id", "eq.u1"),
+        ("deleted_at", "is.null"),
+        ("platform", "not.eq.tiktok"),
+        ("id", 'in.(a,"b,c")'),
+        ("offset", "10"),
+        ("limit", "10"),
+        ("order", "created_at.desc,id.desc.nullslast"),
+    ]
+    assert request.headers["Prefer"] == "count=exact"
+    assert request.headers["apikey"] == "key"
+    assert request.headers["Authorization"] == "Bearer key"
+
+def test_or_filters_are_wrapped_and_timestamps_are_url_encoded():
+    request, _ = _send(lambda db: (
+        db.table("videos").select("id").or_('created_at.lt."2024-01-01T00:00:00+00:00",id.lt.5')
+    ))
+    assert request.url.params["or"] == '(created_at.lt."2024-01-01T00:00:00+00:00",id.lt.5)'
+    assert b"%2B00%3A00" in request.url.query
+
+def test_multi_row_insert_names_the_union_of_columns():
+    request, _ = _send(lambda db: db.table("videos").upsert(
+        [{"id": 1, "url": "a"}, {"id": 2, "title": "b"}],
+        on_conflict="id",
+        ignore_duplicates=True,
+        returning=False
+    ))
+
+    assert request.method == "POST"
+    assert request.url.params["columns"] == "id,title,url"
+    assert request.url.params["on_conflict"] == "id"
+    assert request.headers["Prefer"] == "return=minimal,resolution=ignore-duplicates"
+    assert json.loads(request.content) == [{"id": 1, "url": "a"}, {"id": 2, "title": "b"}]
+
+def test_rpc_and_single():
+    request, _ = _send(lambda db: db.rpc("match_videos", {"match_count": 5}))
+    assert request.url.path == "/rest/v1/rpc/match_videos"
+    assert json.loads(request.content) == {"match_count": 5}
+
+    request, _ = _send(lambda db: db.table("videos").select("id").eq("id", 1).single())
+    assert request.headers["Accept"] == "application/vnd.pgrst.object+json"
+
+def test_count_is_read_from_content_range():
+    _, result = _send(
+        lambda db: db.table("videos").select("id", count="exact").limit(2),
+        httpx.Response(200, json=[{"id": 1}, {"id": 2}], headers={"Content-Range": "0-1/57"})
+    )
+    assert result.data == [{"id": 1}, {"id": 2}]
+    assert result.count == 57
+
+    _, result = _send(
+        lambda db: db.table("videos").select("id"),
+        httpx.Response(200, json=[], headers={"Content-Range": "*/*"})
+    )
+    assert result.count is None
+
+def test_error_responses_raise_postgrest_error():
+    with pytest.raises(PostgrestError) as error:
+        _send(
+            lambda db: db.table("videos").insert({"id": 1}),
+            httpx.Response(409, json={"code": "23505", "message": "duplicate key", "details": "Key (id)=(1) exists"})
+        )
+    assert error.value.status_code == 409
+    assert error.value.code == "23505"
+    assert error.value.message == "duplicate key"
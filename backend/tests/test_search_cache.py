@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from app.services.search_cache import SearchResultCache
+
+def _cache(ttl=60.0, size=10):
+    cache = SearchResultCache()
+    cache.ttl = ttl
+    cache.max_size = size
+    return cache
+
+def test_invalidating_a_user_misses_only_their_entries():
+    cache = _cache()
+    cache.put(cache.key("u1", "pasta", None, 1), [{"id": "a"}], 0.1)
+    cache.put(cache.key("u2", "pasta", None, 1), [{"id": "b"}], 0.1)
+
+    cache.invalidate_user("u1")
+    assert cache.get(cache.key("u1", "pasta", None, 1)) is None
+    assert cache.get(cache.key("u2", "pasta", None, 1)) == [{"id": "b"}]
+
+def test_results_computed_across_an_invalidation_are_not_stored():
+    cache = _cache()
+    key = cache.key("u1", "pasta", None, 1)
+    cache.invalidate_user("u1")
+    cache.put(key, [{"id": "stale"}], 0.1)
+    assert cache.get(cache.key("u1", "pasta", None, 1)) is None
+
+def test_entries_expire_and_lru_is_bounded():
+    cache = _cache(ttl=0.0)
+    key = cache.key("u1", "q", None, 1)
+    cache.put(key, [], 0.1)
+    assert cache.get(key) is None
+
+    cache = _cache(size=2)
+    keys = [cache.key("u1", query, None, 1) for query in ("a", "b", "c")]
+    for key in keys:
+        cache.put(key, [{"q": key[1]}], 0.1)
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == [{"q": "c"}]
+
+def test_concurrent_identical_searches_share_one_computation():
+    cache = _cache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [{"id": "a"}]
+
+    async def run():
+        key = cache.key("u1", "pasta", None, 1)
+        results = await asyncio.gather(*(cache.get_or_compute(key, compute) for _ in range(5)))
+        cached = await cache.get_or_compute(key, compute)
+        return results, cached
+
+    results, cached = asyncio.run(run())
+    assert calls == 1
+    assert results == [[{"id": "a"}]] * 5
+    assert cached == [{"id": "a"}]
+    assert cache.coalesced == 4 and cache.hits == 1
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    cache = _cache()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database down")
+
+    async def run():
+        key = cache.key("u1", "pasta", None, 1)
+        outcomes = await asyncio.gather(*(cache.get_or_compute(key, fail) for _ in range(3)), return_exceptions=True)
+        return key, outcomes
+
+    key, outcomes = asyncio.run(run())
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert cache.get(key) is None
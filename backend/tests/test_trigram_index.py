@@ -0,0 +1,55 @@
+import itertools
+import random
+from app.services.trigram_index import TrigramIndex, _UserVocabulary, bounded_edit_distance
+
+def _levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+def test_bounded_edit_distance_matches_full_distance_within_limit():
+    rng = random.Random(0)
+    words = ["".join(rng.choice("abcd") for _ in range(rng.randint(0, 7))) for _ in range(60)]
+    for a, b in itertools.product(words[:20], words[20:]):
+        for limit in range(4):
+            expected = _levenshtein(a, b)
+            assert bounded_edit_distance(a, b, limit) == (expected if expected <= limit else limit + 1)
+
+def test_bounded_edit_distance_examples():
+    assert bounded_edit_distance("recipe", "recpie", 2) == 2
+    assert bounded_edit_distance("kitten", "sitting", 2) == 3
+    assert bounded_edit_distance("same", "same", 0) == 0
+
+def _document(video_id, title, keywords=()):
+    return {"id": video_id, "user_id": "u1", "title": title, "keywords": list(keywords), "search_summary": ""}
+
+def test_expand_corrects_unknown_tokens_from_the_users_vocabulary():
+    index = TrigramIndex()
+    index.add_document(_document("v1", "Homemade lasagna recipe", ["italian"]))
+
+    corrected, terms = index.expand("u1", "lasagne recipe")
+    assert corrected == "lasagna recipe"
+    assert "lasagna" in terms and "lasagne" in terms
+    assert index.expand("u2", "lasagne") == ("lasagne", ["lasagne"])
+
+def test_short_tokens_are_not_corrected_and_removed_terms_are_forgotten():
+    index = TrigramIndex()
+    index.add_document(_document("v1", "Cat toys"))
+    index.add_document(_document("v2", "Guitar chords"))
+
+    assert index.expand("u1", "cta")[0] == "cta"
+    assert index.expand("u1", "guitr")[0] == "guitar"
+    index.remove_document("u1", "v2")
+    assert index.expand("u1", "guitr")[0] == "guitr"
+
+def test_re_added_terms_are_candidates_once():
+    vocabulary = _UserVocabulary()
+    vocabulary.add("v1", ["guitar"])
+    vocabulary.remove("v1")
+    vocabulary.add("v2", ["guitar"])
+
+    assert vocabulary.candidates("guitr", 1, 3) == [("guitar", 1)]
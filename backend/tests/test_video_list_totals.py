@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.video_management import VideoManagementService
+from app.utils.cursor import encode_cursor
+
+SECRET = "test-secret"
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_CURSOR_SECRET", SECRET)
+    return VideoManagementService()
+
+def listing_cursor(created_at, video_id):
+    return encode_cursor({"u": "user", "p": None, "d": False, "c": created_at, "i": video_id}, SECRET)
+
+@pytest.mark.parametrize("created_at,video_id", [
+    ('2024-01-01",id.gt.0', "00000000-0000-0000-0000-000000000001"),
+    ("2024-01-01T00:00:00+00:00", "1),or(user_id.neq.user"),
+    (None, "00000000-0000-0000-0000-000000000001"),
+])
+def test_cursor_values_are_validated(service, created_at, video_id):
+    with pytest.raises(ValueError):
+        asyncio.run(service.get_user_videos("user", cursor=listing_cursor(created_at, video_id)))
+
+def test_totals_are_bounded_lru(service):
+    service.TOTALS_CACHE_SIZE = 2
+    service._store_total(("a", None, False), 1)
+    service._store_total(("b", None, False), 2)
+    assert service._cached_total(("a", None, False)) == 1
+    service._store_total(("c", None, False), 3)
+
+    assert service._cached_total(("b", None, False)) is None
+    assert service._cached_total(("a", None, False)) == 1
+    assert service._cached_total(("c", None, False)) == 3
+
+def test_invalidate_totals_only_drops_that_user(service):
+    service._store_total(("a", None, False), 1)
+    service._store_total(("a", "youtube", True), 2)
+    service._store_total(("b", None, False), 3)
+
+    service.invalidate_totals("a")
+
+    assert service._cached_total(("a", None, False)) is None
+    assert service._cached_total(("a", "youtube", True)) is None
+    assert service._cached_total(("b", None, False)) == 3
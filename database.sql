@@ -31,7 +31,7 @@ CREATE TABLE video_analysis (
   audio_transcription TEXT,
   keywords TEXT[],
   metadata JSONB,
-  embedding vector(1536),
+  embedding vector(384),  -- legacy; tagged vectors live in video_embeddings (app/migrations/add_video_embeddings.sql)
   created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
   deleted_at TIMESTAMP WITH TIME ZONE DEFAULT NULL
 );
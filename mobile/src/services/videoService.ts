@@ -19,16 +19,18 @@ export interface VideoUpdate {
 
 export interface VideosResponse {
   videos: Video[];
-  total: number;
+  total: number | null;
   limit: number;
   offset: number;
+  next_cursor: string | null;
 }
 
 export const getVideos = async (
   token: string,
   platform?: string,
   limit: number = 50,
-  offset: number = 0
+  offset: number = 0,
+  cursor?: string
 ): Promise<VideosResponse> => {
   const params = new URLSearchParams({
     limit: limit.toString(),
@@ -38,6 +40,10 @@ export const getVideos = async (
   if (platform) {
     params.append('platform', platform);
   }
+
+  if (cursor) {
+    params.append('cursor', cursor);
+  }
   
   const response = await fetch(
     `${API_URL}/videos?${params.toString()}`,